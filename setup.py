@@ -41,7 +41,9 @@ setup(
     platforms='any',
     packages=find_packages(exclude=['tests', 'example']),
     include_package_data=True,
+    package_data={'sphinxcontrib.traceability': ['static/*']},
     install_requires=requires,
+    extras_require={'yaml': ['PyYAML']},
     namespace_packages=['sphinxcontrib'],
     keywords = ['traceability',
                 'requirements engineering',
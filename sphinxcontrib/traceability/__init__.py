@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Sphinx Traceability Extension
+
+Copyright (c) 2013-2023 Oscar Ciudad
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at
+your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+# The extension is imported only when it is set up or any of its names is
+# used, so that tools like the command line query tool (``__main__``)
+# start without importing Sphinx
+
+
+def setup(app):
+    from .extension import setup
+    return setup(app)
+
+
+_submodules = None
+
+
+def __getattr__(name):
+    # Directives, nodes and functions of the extension are available from
+    # the package, as when it was a single module. Submodules (listed once)
+    # are left to the import system
+    global _submodules
+    if _submodules is None:
+        from pkgutil import iter_modules
+        _submodules = set(module.name for module in iter_modules(__path__))
+    if name.startswith('__') or name in _submodules:
+        raise AttributeError('module %r has no attribute %r' %
+                             (__name__, name))
+    from . import extension
+    try:
+        return getattr(extension, name)
+    except AttributeError:
+        raise AttributeError('module %r has no attribute %r' %
+                             (__name__, name))
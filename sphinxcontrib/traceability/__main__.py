@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""Command line queries over a traceability snapshot
+
+Items are queried from the snapshot written at the end of a build (see
+``traceability_snapshot`` configuration variable), without importing
+Sphinx. Usage::
+
+  python -m sphinxcontrib.traceability -s SNAPSHOT show ID ...
+  python -m sphinxcontrib.traceability -s SNAPSHOT related ID [-r REL ...]
+  python -m sphinxcontrib.traceability -s SNAPSHOT list [-f FILTER]
+      [-t TYPE ...]
+  python -m sphinxcontrib.traceability -s SNAPSHOT coverage -r REL ...
+
+The snapshot path can also be set in ``TRACEABILITY_SNAPSHOT``
+environment variable.
+
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from .snapshot import Snapshot
+
+
+def show(snapshot, args, output):
+    records = []
+    for item_id in args.ids:
+        record = snapshot.get(item_id)
+        if record is None:
+            sys.stderr.write('undefined item: %s\n' % item_id)
+            return 1, records
+        records.append(record)
+
+    if not args.json:
+        for record in records:
+            output.write('%s %s\n' % (record['id'], record['caption']))
+            output.write('  type: %s\n' % record['type'])
+            output.write('  location: %s:%s\n' % (record['source'],
+                                                  record['lineno']))
+            if record.get('uri'):
+                output.write('  uri: %s\n' % record['uri'])
+            for name, value in sorted(record['data'].items()):
+                output.write('  %s: %s\n' % (name, value))
+            for rel, targets in sorted(record['relationships'].items()):
+                output.write('  %s: %s\n' % (rel, ' '.join(targets)))
+            for rel, targets in sorted(record.get('suspect', {}).items()):
+                output.write('  suspect %s: %s\n' % (rel, ' '.join(targets)))
+    return 0, records
+
+
+def related(snapshot, args, output):
+    try:
+        found = snapshot.related(args.id, args.relationships)
+    except KeyError:
+        sys.stderr.write('undefined item: %s\n' % args.id)
+        return 1, {}
+
+    if not args.json:
+        for rel, targets in sorted(found.items()):
+            for target in targets:
+                output.write('%s %s\n' % (rel, target))
+    return 0, found
+
+
+def list_items(snapshot, args, output):
+    records = list(snapshot.items(args.filter, args.types))
+    if not args.json:
+        for record in records:
+            output.write('%s %s\n' % (record['id'], record['caption']))
+    return 0, records
+
+
+def coverage(snapshot, args, output):
+    covered, uncovered = snapshot.coverage(args.relationships, args.filter,
+                                           args.types, args.target_filter)
+    total = len(covered) + len(uncovered)
+    percentage = 100.0 * len(covered) / total if total else 100.0
+    if not args.json:
+        output.write('%d of %d items covered (%.1f%%)\n' %
+                     (len(covered), total, percentage))
+        for item_id in uncovered:
+            output.write('uncovered: %s\n' % item_id)
+    status = 1 if args.min is not None and percentage < args.min else 0
+    return status, {'covered': covered, 'uncovered': uncovered,
+                    'percentage': percentage}
+
+
+def main(argv=None, output=sys.stdout):
+    parser = argparse.ArgumentParser(
+        prog='python -m sphinxcontrib.traceability',
+        description='Query the items of a traceability snapshot.')
+    parser.add_argument('-s', '--snapshot',
+                        default=os.environ.get('TRACEABILITY_SNAPSHOT'),
+                        help='snapshot file (default: TRACEABILITY_SNAPSHOT '
+                             'environment variable)')
+    parser.add_argument('--json', action='store_true',
+                        help='write results as JSON')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    command = commands.add_parser('show', help='show items')
+    command.add_argument('ids', nargs='+', metavar='id')
+    command.set_defaults(function=show)
+
+    command = commands.add_parser(
+        'related', help='list items related to an item, in both directions')
+    command.add_argument('id')
+    command.add_argument('-r', dest='relationships', nargs='+',
+                         metavar='relationship',
+                         help='relationships to follow (default: all)')
+    command.set_defaults(function=related)
+
+    def add_selection(command):
+        command.add_argument('-f', '--filter', default='',
+                             help='filter item identifiers must match '
+                                  '(regexp, prefix:, glob: or range:)')
+        command.add_argument('-t', '--type', dest='types', nargs='+',
+                             metavar='type', help='item directive names')
+
+    command = commands.add_parser('list', help='list items')
+    add_selection(command)
+    command.set_defaults(function=list_items)
+
+    command = commands.add_parser(
+        'coverage', help='count items related by some relationships')
+    add_selection(command)
+    command.add_argument('-r', dest='relationships', nargs='+', required=True,
+                         metavar='relationship')
+    command.add_argument('--target-filter',
+                         help='filter related item identifiers must match')
+    command.add_argument('--min', type=float, metavar='percentage',
+                         help='exit with status 1 below this coverage')
+    command.set_defaults(function=coverage)
+
+    args = parser.parse_args(argv)
+    if not args.snapshot:
+        parser.error('no snapshot given')
+    try:
+        snapshot = Snapshot(args.snapshot)
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+
+    with snapshot:
+        try:
+            status, result = args.function(snapshot, args, output)
+        except ValueError as exc:
+            parser.error(str(exc))
+    if args.json:
+        json.dump(result, output, indent=1, sort_keys=True)
+        output.write('\n')
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""Lazy storage of item contents
+
+Item contents are only needed while their item is rendered. Instead of
+keeping them in the environment, items store where their content is in
+the source file, and it is read back on demand through memory-mapped
+files.
+
+"""
+
+import mmap
+import os
+import zlib
+from collections import OrderedDict
+
+# Number of memory-mapped source files kept open
+OPEN_FILES = 16
+
+
+class SourceFile(object):
+    """
+    Memory-mapped source file with a lazily built index of line offsets.
+
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as source:
+            stat = os.fstat(source.fileno())
+            self.key = (stat.st_mtime_ns, stat.st_size)
+            if stat.st_size:
+                self.data = mmap.mmap(source.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+            else:
+                self.data = b''
+        self.offsets = [0]
+
+    def _index(self, line):
+        # Extend line offsets just up to the requested line
+        while len(self.offsets) <= line:
+            position = self.data.find(b'\n', self.offsets[-1])
+            if position < 0:
+                self.offsets.append(len(self.data))
+                break
+            self.offsets.append(position + 1)
+
+    def lines(self, start, end):
+        """
+        Return raw bytes of lines from ``start`` to ``end`` (zero based,
+        end excluded).
+
+        """
+        self._index(end)
+        start = min(start, len(self.offsets) - 1)
+        end = min(end, len(self.offsets) - 1)
+        return self.data[self.offsets[start]:self.offsets[end]]
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+
+_open_files = OrderedDict()
+
+
+def source_file(path):
+    """
+    Return an open :class:`SourceFile` for ``path``, reusing a recent
+    one if the file did not change.
+
+    """
+    stat = os.stat(path)
+    cached = _open_files.pop(path, None)
+    if cached is not None and cached.key != (stat.st_mtime_ns, stat.st_size):
+        cached.close()
+        cached = None
+    if cached is None:
+        cached = SourceFile(path)
+    _open_files[path] = cached
+    while len(_open_files) > OPEN_FILES:
+        _open_files.popitem(last=False)[1].close()
+    return cached
+
+
+class ItemContent(object):
+    """
+    Reference to the content of an item in its source file: a range of
+    lines, whose first ``indent`` columns are removed (as done by
+    docutils for directive contents). A checksum detects sources whose
+    contents differ from what was parsed.
+
+    Converting it to a string loads the content.
+
+    """
+    __slots__ = ('source', 'start', 'end', 'indent', 'tab_width',
+                 'encoding', 'checksum')
+
+    def __init__(self, source, start, end, indent, tab_width, encoding,
+                 checksum):
+        self.source = source
+        self.start = start
+        self.end = end
+        self.indent = indent
+        self.tab_width = tab_width
+        self.encoding = encoding
+        self.checksum = checksum
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def load(self):
+        """
+        Read the content back from its source file. ``None`` is returned
+        if the source changed or cannot be read.
+
+        """
+        try:
+            data = source_file(self.source).lines(self.start, self.end)
+        except (OSError, ValueError):
+            return None
+        lines = data.decode(self.encoding).splitlines()
+        text = '\n'.join(line.expandtabs(self.tab_width).rstrip()
+                         [self.indent:] for line in lines)
+        if _checksum(text) != self.checksum:
+            return None
+        return text
+
+    def __str__(self):
+        text = self.load()
+        return text if text is not None else ''
+
+    def __repr__(self):
+        return '<ItemContent %s:%d-%d>' % (self.source, self.start + 1,
+                                           self.end)
+
+
+def _checksum(text):
+    return zlib.crc32(text.encode('utf-8'))
+
+
+def _root_line(lines, index):
+    # Follow the chain of StringList slices up to the original input
+    while lines.parent is not None:
+        index += lines.parent_offset
+        lines = lines.parent
+    return lines.data[index]
+
+
+def store_content(content, settings):
+    """
+    Return the content to be stored for a directive ``content``
+    (``StringList``): an :class:`ItemContent` if it is a contiguous
+    range of lines of an existing source file, starting with the first
+    line of content, or a string otherwise.
+
+    """
+    text = '\n'.join(content)
+    if not content:
+        return text
+
+    source, start = content.items[0]
+    end = start + len(content)
+    if (not isinstance(source, str) or not os.path.isfile(source) or
+            content.items[-1] != (source, end - 1) or
+            any(item[0] != source for item in content.items)):
+        return text
+
+    # Indentation removed by docutils, taken from the first non blank line
+    indent = 0
+    for index, line in enumerate(content):
+        if line:
+            try:
+                indent = len(_root_line(content, index)) - len(line)
+            except (AttributeError, IndexError):
+                return text
+            break
+
+    tab_width = getattr(settings, 'tab_width', 8)
+    encoding = getattr(settings, 'input_encoding', None) or 'utf-8-sig'
+
+    # Lines of generated input (like harvested items) are all bound to
+    # the line of their directive, so a single line passes the checks
+    # above: its source line must be the first line of content too
+    first = ItemContent(source, start, start + 1, indent, tab_width,
+                        encoding, _checksum(content[0]))
+    if first.load() is None:
+        return text
+
+    return ItemContent(source, start, end, indent, tab_width, encoding,
+                       _checksum(text))
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""Long-running builds keeping the traceability index in memory
+
+A Sphinx application is kept running, and the documentation is built
+again each time a source file changes. Only the changed documents are
+read again: their items are removed from and added back to the items
+and relationship index kept in memory, and the documents with item
+lists or matrices are written again if any item changed.
+
+Usage::
+
+  python -m sphinxcontrib.traceability.daemon [options] sourcedir outputdir
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+
+class TraceDaemon(object):
+    """
+    Sphinx application kept running between builds of the same project.
+
+    """
+
+    def __init__(self, srcdir, outdir, buildername='html', doctreedir=None,
+                 confoverrides=None, interval=0.5, status=sys.stdout,
+                 warning=sys.stderr):
+        self.srcdir = os.path.abspath(srcdir)
+        self.outdir = os.path.abspath(outdir)
+        self.doctreedir = os.path.abspath(
+            doctreedir or os.path.join(self.outdir, '.doctrees'))
+        self.confpath = os.path.join(self.srcdir, 'conf.py')
+        self.buildername = buildername
+        self.confoverrides = confoverrides or {}
+        self.interval = interval
+        self.status = status
+        self.warning = warning
+        self.app = None
+        self.files = {}
+
+    def create_app(self):
+        """
+        Create the Sphinx application, loading the environment of the last
+        build if any.
+
+        """
+        # Imported here, so that the module is cheap to import
+        from sphinx.application import Sphinx
+
+        self.app = Sphinx(self.srcdir, self.srcdir, self.outdir,
+                          self.doctreedir, self.buildername,
+                          confoverrides=dict(self.confoverrides),
+                          status=self.status, warning=self.warning)
+        return self.app
+
+    def watched_files(self):
+        """
+        Return the paths of the files a build depends on: all files in the
+        source directory (but the output ones), link files, test reports
+        and the dependencies noted by documents, like the files of
+        ``item-harvest`` directives.
+
+        """
+        excluded = (self.outdir, self.doctreedir)
+        for root, dirs, files in os.walk(self.srcdir):
+            dirs[:] = [name for name in dirs if not name.startswith('.') and
+                       os.path.join(root, name) not in excluded]
+            for name in files:
+                yield os.path.join(root, name)
+        if self.app is not None:
+            for dependencies in self.app.env.dependencies.values():
+                for path in dependencies:
+                    yield os.path.join(self.srcdir, path)
+            for path in (self.app.config.traceability_link_files +
+                         self.app.config.traceability_test_results):
+                yield os.path.join(self.srcdir, path)
+
+    def snapshot(self):
+        """
+        Return the modification times of all watched files.
+
+        """
+        files = {}
+        for path in self.watched_files():
+            try:
+                files[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                pass
+        return files
+
+    def build(self):
+        """
+        Build the documentation, reusing the running application unless
+        the configuration changed. Returns the build time in seconds.
+
+        """
+        start = time.monotonic()
+        previous = self.files.get(self.confpath)
+        self.files = self.snapshot()
+        try:
+            if self.app is None or self.files.get(self.confpath) != previous:
+                self.create_app()
+            self.app.build()
+        except Exception as exc:
+            # The environment may be left half updated: start afresh, once
+            # any watched file changes (the files of the failed attempt are
+            # kept, without the dependencies of the dropped application)
+            self.app = None
+            self.files = dict((path, self.files[path])
+                              for path in self.watched_files()
+                              if path in self.files)
+            self.warning.write('traceability daemon: build failed: %s\n' %
+                               exc)
+        return time.monotonic() - start
+
+    def poll(self):
+        """
+        Build the documentation if any watched file changed since the last
+        build, or failed attempt. Returns ``True`` if it was built.
+
+        """
+        if self.files and self.snapshot() == self.files:
+            return False
+        elapsed = self.build()
+        self.status.write('traceability daemon: built in %.2f s\n' % elapsed)
+        return True
+
+    def run(self):
+        """
+        Build the documentation each time a watched file changes, until
+        interrupted.
+
+        """
+        try:
+            while True:
+                self.poll()
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m sphinxcontrib.traceability.daemon',
+        description='Build Sphinx documentation each time it changes, '
+                    'keeping the traceability index in memory.')
+    parser.add_argument('sourcedir')
+    parser.add_argument('outputdir')
+    parser.add_argument('-b', dest='builder', default='html',
+                        help='builder to use (default: html)')
+    parser.add_argument('-d', dest='doctreedir',
+                        help='directory for doctrees and the environment '
+                             '(default: OUTPUTDIR/.doctrees)')
+    parser.add_argument('-D', dest='define', action='append', default=[],
+                        metavar='setting=value',
+                        help='override a setting in the configuration file')
+    parser.add_argument('-i', '--interval', type=float, default=0.5,
+                        help='seconds between checks for changes '
+                             '(default: 0.5)')
+    args = parser.parse_args(argv)
+
+    confoverrides = {}
+    for define in args.define:
+        name, _, value = define.partition('=')
+        confoverrides[name] = value
+
+    TraceDaemon(args.sourcedir, args.outputdir, args.builder,
+                args.doctreedir, confoverrides, args.interval).run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Streaming export of tables to spreadsheet files
+
+Rows are written as they are produced, so exported tables are never
+held in memory. XLSX files are written without any third party
+package: a minimal workbook with a single sheet of inline strings.
+
+"""
+
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'content-types">'
+    '<Default Extension="rels" ContentType="application/'
+    'vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>')
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>')
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/'
+    'main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/'
+    'relationships">'
+    '<sheets><sheet name="%s" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>')
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>')
+
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/'
+    'main"><sheetData>')
+
+_SHEET_END = '</sheetData></worksheet>'
+
+# Characters not allowed in XML 1.0 documents
+_INVALID_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+_INVALID_SHEET_NAME = re.compile(r'[\[\]:*?/\\]')
+
+
+def _column_name(number):
+    name = ''
+    while number:
+        number, remainder = divmod(number - 1, 26)
+        name = chr(ord('A') + remainder) + name
+    return name
+
+
+def write_csv(path, rows):
+    """
+    Write ``rows`` (an iterable of sequences of strings) to a CSV file.
+
+    """
+    with open(path, 'w', newline='', encoding='utf-8') as output:
+        writer = csv.writer(output)
+        for row in rows:
+            writer.writerow(row)
+
+
+def write_xlsx(path, rows, sheet_name='Sheet1'):
+    """
+    Write ``rows`` (an iterable of sequences of strings) to the single
+    sheet of an XLSX workbook. The sheet is streamed into the zip file
+    row by row.
+
+    """
+    sheet_name = _INVALID_SHEET_NAME.sub(' ', sheet_name)[:31] or 'Sheet1'
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as workbook:
+        workbook.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        workbook.writestr('_rels/.rels', _ROOT_RELS)
+        workbook.writestr('xl/workbook.xml',
+                          _WORKBOOK % escape(sheet_name, {'"': '&quot;'}))
+        workbook.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        with workbook.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write(_SHEET_START.encode('utf-8'))
+            for number, row in enumerate(rows, start=1):
+                cells = ''.join(
+                    '<c r="%s%d" t="inlineStr"><is><t xml:space="preserve">'
+                    '%s</t></is></c>' % (_column_name(column), number,
+                                         escape(_INVALID_XML.sub('', value)))
+                    for column, value in enumerate(row, start=1))
+                sheet.write(('<row r="%d">%s</row>' %
+                             (number, cells)).encode('utf-8'))
+            sheet.write(_SHEET_END.encode('utf-8'))
+
+
+def export_rows(path, export_format, rows, title=None):
+    """
+    Write ``rows`` to ``path`` in ``export_format`` (one of
+    ``EXPORT_FORMATS``).
+
+    """
+    if export_format == 'csv':
+        write_csv(path, rows)
+    elif export_format == 'xlsx':
+        write_xlsx(path, rows, title or 'Sheet1')
+    else:
+        raise ValueError('unknown export format %r' % export_format)
@@ -0,0 +1,2372 @@
+# -*- coding: utf-8 -*-
+"""Sphinx Traceability Extension: directives, roles and event handlers
+
+"""
+
+from __future__ import print_function
+from docutils import nodes
+from docutils.parsers.rst import Directive, directives
+from docutils.statemachine import StringList
+from sphinx.roles import XRefRole
+from sphinx.util import logging
+from sphinx.util.nodes import make_refnode
+from sphinx.util.osutil import ensuredir, relative_uri
+from sphinx.builders.singlehtml import SingleFileHTMLBuilder
+from sphinx.errors import ConfigError
+try:
+    from sphinx.errors import NoUri
+except ImportError:
+    from sphinx.environment import NoUri
+from jinja2 import Environment, Template, meta
+from textwrap import dedent
+import os
+import re
+import weakref
+
+from . import harvest, tags
+from .content import store_content
+from .export import EXPORT_FORMATS, export_rows
+from .filters import id_filter, target_pattern
+from .pages import PAGE_BY, page_name, split_pages
+from .references import (COMPACT_FORMATS, depart_item_reference,
+                         html_visit_item_reference, item_reference,
+                         latex_visit_item_reference,
+                         text_visit_item_reference)
+from .pivot import ITEM_ATTRIBUTES, ItemColumns
+from .index import RelationshipIndex, find_cycles
+from .links import load_link_files
+from .results import RESULT_ATTRIBUTE, load_test_results, merge_result
+from .rules import compile_rules, evaluate_rules
+from .search import SEARCH_DIR, SEARCH_SCRIPT, sort_key, write_search_index
+from .snapshot import item_record, write_snapshot
+from .suspects import SuspectLinks, item_digest
+from .unresolved import UnresolvedReferences
+
+logger = logging.getLogger(__name__)
+
+# Default item template: its output (a definition list) is built as nodes
+# directly, instead of being rendered and parsed again
+DEFAULT_ITEM_TEMPLATE = """
+    {{ id }}
+    {%- if caption %}
+        **{{ caption }}**
+    {% endif %}
+        {{ content|indent(4) }}
+    """
+
+# -----------------------------------------------------------------------------
+# Declare new node types (based on others): item, item_list, item_matrix,
+# item_pivot, item_backlinks, item_search
+
+
+class item(nodes.General, nodes.Element):
+    pass
+
+
+class item_list(nodes.General, nodes.Element):
+    pass
+
+
+class item_matrix(nodes.General, nodes.Element):
+    pass
+
+
+class item_pivot(nodes.General, nodes.Element):
+    pass
+
+
+class item_backlinks(nodes.General, nodes.Element):
+    pass
+
+
+class item_search(nodes.General, nodes.Element):
+    pass
+
+
+# -----------------------------------------------------------------------------
+# Pending item cross reference node
+
+
+class pending_item_xref(nodes.Inline, nodes.Element):
+    """
+    Node for item cross-references that cannot be resolved without
+    complete information about all documents.
+
+    """
+    pass
+
+
+# -----------------------------------------------------------------------------
+# Directives
+
+
+class AnyOption(dict):
+    """
+    Directive option spec accepting any option besides its own ones, with
+    their values as given.
+
+    """
+
+    def __missing__(self, name):
+        return _as_given
+
+
+def _as_given(argument):
+    return argument
+
+
+class ItemOptions(object):
+    """
+    Relationships (with reverse relationships also as keys) and data
+    options of the items of an application, taken from its configuration.
+
+    """
+
+    def __init__(self, config):
+        self.relationships = {}
+        for rel, reverse in config.traceability_relationships.items():
+            self.relationships[rel] = reverse
+            self.relationships[reverse] = rel
+
+        self.data = list(config.traceability_data)
+        self.option_spec = dict((rel, directives.unchanged)
+                                for rel in self.relationships)
+        self.option_spec.update(config.traceability_data)
+
+        # Test results are a data attribute too
+        if (config.traceability_test_results and
+                RESULT_ATTRIBUTE not in self.data):
+            self.data.append(RESULT_ATTRIBUTE)
+
+    def convert(self, options):
+        """
+        Convert the relationship and data options of an item directive
+        (other options are returned as they are). ``ValueError`` is raised
+        for unknown options and invalid values.
+
+        """
+        converted = {}
+        for name, value in options.items():
+            if name in ItemDirective.option_spec:
+                converted[name] = value
+                continue
+            if name not in self.option_spec:
+                raise ValueError('unknown option: "%s"' % name)
+            try:
+                converted[name] = self.option_spec[name](value)
+            except (ValueError, TypeError) as exc:
+                raise ValueError('invalid option value: (option: "%s"; '
+                                 'value: %r)\n%s' % (name, value, exc))
+        return converted
+
+
+# Options of the items of every application, by configuration
+_item_options = weakref.WeakKeyDictionary()
+
+
+def item_options(config):
+    """
+    Returns the item options of the application of ``config``.
+
+    """
+    options = _item_options.get(config)
+    if options is None:
+        options = _item_options[config] = ItemOptions(config)
+    return options
+
+
+class ItemDirective(Directive):
+    """
+    Directive to declare items and their traceability relationships.
+
+    Syntax::
+
+      .. item:: item_id [item_caption]
+         :<<relationship>>:  other_item_id ...
+         ...
+
+         [item_content]
+
+    When run, for each item, two nodes will be returned:
+
+    * A target node
+    * A custom node generated from a template (by default: term & definition,
+      built directly, see ``item_nodes``)
+
+    Also ``traceability_all_items`` storage is filled with item information
+
+    """
+    # Required argument: id
+    required_arguments = 1
+    # Optional argument: caption (whitespace allowed)
+    optional_arguments = 1
+    final_argument_whitespace = True
+    # Options: the typical ones plus every relationship (and reverse)
+    # defined in env.config.traceability_relationships, and data options.
+    # These depend on the configuration of each application, so they are
+    # accepted as given here and converted by ``run``
+    option_spec = AnyOption({'class': directives.class_option})
+    # Content allowed
+    has_content = True
+
+    def run(self):
+        env = self.state.document.settings.env
+        caption = ''
+        messages = []
+
+        options = item_options(env.config)
+        try:
+            self.options = options.convert(self.options)
+        except ValueError as exc:
+            raise self.error('Error in "%s" directive:\n%s'
+                             % (self.name, exc))
+
+        targetid = self.arguments[0]
+        targetnode = nodes.target('', '', ids=[targetid])
+
+        # Location in the source file (harvested items are located in the
+        # file they were harvested from)
+        source, lineno = self.state_machine.get_source_and_line(self.lineno)
+
+        # Unless configured to keep it, content is stored as a reference to
+        # its source lines and loaded again only when needed
+        if env.config.traceability_item_content_in_memory:
+            content = '\n'.join(self.content)
+        else:
+            content = store_content(self.content,
+                                    self.state.document.settings)
+
+        # Item caption is the text following the mandatory id argument.
+        # Caption should be considered a line of text. Remove line breaks.
+        if len(self.arguments) > 1:
+            caption = self.arguments[1].replace('\n', ' ')
+
+        # Store item info
+        if targetid not in env.traceability_all_items:
+            env.traceability_all_items[targetid] = {
+                'id': targetid,
+                'type': self.name,
+                'class': self.options.get('class', []),
+                'docname': env.docname,
+                'source': source,
+                'lineno': lineno,
+                'target': targetnode,
+                'caption': caption,
+                'content': content,
+                'digest': item_digest(caption, '\n'.join(self.content))
+            }
+            env.traceability_doc_items.setdefault(env.docname, []).append(
+                targetid)
+            # Add relationships to item. All relationship data is a string of
+            # item ids separated by space. It is splitted in a list of item ids
+            for rel in list(options.relationships.keys()):
+                if rel in self.options:
+                    env.traceability_all_items[targetid][rel] = \
+                        self.options[rel].split()
+                else:
+                    env.traceability_all_items[targetid][rel] = []
+
+            # Add data options to item, as standad option_spec elements
+            for data in options.data:
+                if data in self.options:
+                    env.traceability_all_items[targetid][data] = \
+                        self.options[data]
+                    logger.verbose("%s.%s = %s" % 
+                          (targetid, data, self.options[data]))
+
+            # Add the result of the item tests, from test reports
+            results = getattr(env, 'traceability_results', None)
+            if (results and targetid in results and
+                    RESULT_ATTRIBUTE not in self.options):
+                env.traceability_all_items[targetid][RESULT_ATTRIBUTE] = \
+                    results[targetid]
+
+        else:
+            # Duplicate items not allowed. Duplicate will even not be shown
+            messages = [self.state.document.reporter.error(
+                'Traceability: duplicated item %s' % targetid,
+                line=self.lineno)]
+
+        # Render template. Content is at hand for this item, loaded for a
+        # duplicated one
+        item_info = env.traceability_all_items[targetid]
+        if item_info['content'] is content:
+            text = '\n'.join(self.content)
+        else:
+            text = item_content(item_info)
+        if (dedent(env.config.traceability_item_template) ==
+                dedent(DEFAULT_ITEM_TEMPLATE)):
+            return [targetnode] + messages + self.item_nodes(
+                item_info, content, text, not messages)
+
+        template = Template(dedent(env.config.traceability_item_template))
+        suspects = getattr(env, 'traceability_suspects', None)
+        rendered = template.render(**dict(
+            item_info, content=text,
+            suspect=suspects.get(targetid) if suspects is not None else {}))
+        # Backlinks are known once all documents are read: a placeholder
+        # follows the item
+        if env.config.traceability_backlinks and not messages:
+            rendered += '\n\n.. item-backlinks:: %s\n' % targetid
+        self.state_machine.insert_input(rendered.split('\n'),
+            self.state_machine.document.attributes['source'])
+
+        logger.verbose(rendered)
+
+        return [targetnode] + messages
+
+    def item_nodes(self, item_info, content, text, backlinks=True):
+        """
+        Build the nodes the default template renders for an item: a
+        definition list with the item identifier as term, and its caption
+        (strong) and parsed content as definition, or just a paragraph
+        with the item identifier if it has neither caption nor content.
+
+        """
+        if not item_info['caption'] and not text.strip():
+            paragraph = nodes.paragraph(item_info['id'], item_info['id'])
+            paragraph.source, paragraph.line = \
+                self.state_machine.get_source_and_line(self.lineno)
+            return self.item_backlinks_nodes(item_info, [paragraph],
+                                             backlinks)
+
+        definition = nodes.definition()
+        if item_info['caption']:
+            definition += nodes.paragraph('', '', nodes.strong(
+                item_info['caption'], item_info['caption']))
+        if item_info['content'] is content:
+            self.state.nested_parse(self.content, self.content_offset,
+                                    definition)
+        else:
+            self.state.nested_parse(
+                StringList(text.split('\n'),
+                           self.state_machine.document.attributes['source']),
+                0, definition)
+
+        definition_list = nodes.definition_list('', nodes.definition_list_item(
+            '', nodes.term(item_info['id'], item_info['id']), definition))
+        definition_list.source, definition_list.line = \
+            self.state_machine.get_source_and_line(self.lineno)
+        return self.item_backlinks_nodes(item_info, [definition_list],
+                                         backlinks)
+
+    def item_backlinks_nodes(self, item_info, result, backlinks=True):
+        """
+        Append the backlinks placeholder of an item to its nodes, in
+        ``result``, if backlinks are rendered.
+
+        """
+        env = self.state.document.settings.env
+        # Backlinks are known once all documents are read: a placeholder
+        # follows the item
+        if env.config.traceability_backlinks and backlinks:
+            item_backlinks_node = item_backlinks('')
+            item_backlinks_node['item'] = item_info['id']
+            env.traceability_list_docs.add(env.docname)
+            result.append(item_backlinks_node)
+        return result
+
+
+def filter_option(argument):
+    """
+    Item identifier filter (see ``filters`` module), checked to be valid.
+
+    """
+    argument = directives.unchanged(argument)
+    id_filter(argument)
+    return argument
+
+
+def attribute_option(argument):
+    """
+    Converts and validates an item attribute filter: the name of an item
+    attribute followed by the values of the items to be selected.
+
+    """
+    values = directives.unchanged_required(argument).split()
+    if len(values) < 2:
+        raise ValueError('attribute name and values expected')
+    return values
+
+
+def set_attribute_filter(directive, node, option):
+    """
+    Set the item attribute filter of a directive ``option`` in ``node``,
+    checking that the attribute exists.
+
+    """
+    env = directive.state.document.settings.env
+    node[option] = directive.options.get(option)
+    if node[option] and \
+            node[option][0] not in ITEM_ATTRIBUTES + tuple(
+                item_options(env.config).data):
+        raise directive.error('Unknown item attribute: %s' % node[option][0])
+
+
+def page_by_option(argument):
+    return directives.choice(argument, PAGE_BY)
+
+
+# Layouts of item matrices
+MATRIX_LAYOUTS = ('list', 'grid', 'relationships')
+
+
+def layout_option(argument):
+    return directives.choice(argument, MATRIX_LAYOUTS)
+
+
+# Gap modes of item matrices: sources related to no target, targets no
+# source is related to, and sources not related to any item at all
+MATRIX_GAPS = ('sources', 'targets', 'items')
+
+
+def gaps_option(argument):
+    return directives.choice(argument, MATRIX_GAPS)
+
+
+def set_pagination(node, options):
+    """
+    Sets pagination attributes of item list and matrix nodes from
+    ``page-size`` and ``page-by`` options. Nodes are only paginated if
+    ``page-size`` is set.
+
+    """
+    node['page-size'] = options.get('page-size')
+    node['page-by'] = options.get('page-by', 'count')
+
+
+class ItemListDirective(Directive):
+    """
+    Directive to generate a list of items.
+
+    Syntax::
+
+      .. item-list::
+         :filter: filter
+         :attribute: attribute value ...
+         :suspect:
+         :page-size: number
+         :page-by: count | prefix
+
+    """
+    required_arguments = 0
+    optional_arguments = 0
+    final_argument_whitespace = False
+    # Options
+    option_spec = {'class': directives.class_option,
+                   'filter': filter_option,
+                   'attribute': attribute_option,
+                   'suspect': directives.flag,
+                   'page-size': directives.positive_int,
+                   'page-by': page_by_option}
+    # Content disallowed
+    has_content = False
+
+    def run(self):
+        item_list_node = item_list('')
+
+        # Process ``filter`` option
+        if 'filter' in self.options:
+            item_list_node['filter'] = self.options['filter']
+        else:
+            item_list_node['filter'] = ''
+
+        # Process ``attribute`` option: attribute values of listed items
+        set_attribute_filter(self, item_list_node, 'attribute')
+
+        # Process ``suspect`` option: only items with suspect links
+        item_list_node['suspect'] = 'suspect' in self.options
+
+        set_pagination(item_list_node, self.options)
+
+        env = self.state.document.settings.env
+        env.traceability_list_docs.add(env.docname)
+
+        return [item_list_node]
+
+
+class ItemMatrixDirective(Directive):
+    """
+    Directive to generate a matrix of item cross-references, based on
+    a given set of relationship types.
+
+    Syntax::
+
+      .. item-matrix:: title
+         :target: filter
+         :source: filter
+         :target-attribute: attribute value ...
+         :source-attribute: attribute value ...
+         :type: <<relationship>> ...
+         :export: csv xlsx
+         :page-size: number
+         :page-by: count | prefix
+         :layout: list | grid | relationships
+         :coverage:
+         :hide-empty-rows:
+         :hide-empty-columns:
+         :gaps: sources | targets | items
+
+    """
+    # Optional argument: title (whitespace allowed)
+    optional_arguments = 1
+    final_argument_whitespace = True
+    # Options
+    option_spec = {'class': directives.class_option,
+                   'target': filter_option,
+                   'source': filter_option,
+                   'target-attribute': attribute_option,
+                   'source-attribute': attribute_option,
+                   'target-title': directives.unchanged,
+                   'source-title': directives.unchanged,
+                   'type': directives.unchanged,
+                   'export': directives.unchanged,
+                   'page-size': directives.positive_int,
+                   'page-by': page_by_option,
+                   'layout': layout_option,
+                   'coverage': directives.flag,
+                   'hide-empty-rows': directives.flag,
+                   'hide-empty-columns': directives.flag,
+                   'gaps': gaps_option}
+    # Content disallowed
+    has_content = False
+
+    def run(self):
+        item_matrix_node = item_matrix('')
+
+        # Process title (optional argument)
+        if len(self.arguments) > 0:
+            item_matrix_node['title'] = self.arguments[0]
+
+        # Process ``target`` & ``source`` options
+        for option in ('target', 'source'):
+            if option in self.options:
+                item_matrix_node[option] = self.options[option]
+            else:
+                item_matrix_node[option] = ''
+            set_attribute_filter(self, item_matrix_node, option + '-attribute')
+
+        # Process ``type`` option, given as a string with relationship types
+        # separated by space. It is converted to a list.
+        if 'type' in self.options:
+            item_matrix_node['type'] = self.options['type'].split()
+        else:
+            item_matrix_node['type'] = []
+
+        # Process titles
+        item_matrix_node['source-title'] = self.options.get('source-title',
+                                                            'Source')
+        item_matrix_node['target-title'] = self.options.get('target-title',
+                                                            'Target')
+
+        # Process ``export`` option: spreadsheet formats the matrix is also
+        # written to. Defaults to ``traceability_matrix_export``
+        env = self.state.document.settings.env
+        if 'export' in self.options:
+            item_matrix_node['export'] = self.options['export'].split()
+        else:
+            item_matrix_node['export'] = list(
+                env.config.traceability_matrix_export)
+        unknown = set(item_matrix_node['export']) - set(EXPORT_FORMATS)
+        if unknown:
+            raise self.error('Unknown export format(s): %s' %
+                             ', '.join(sorted(unknown)))
+
+        set_pagination(item_matrix_node, self.options)
+
+        # Process layout: a list of targets per source, a grid with one
+        # column per target, or a list of targets per source and
+        # relationship (optionally, with the coverage of relationships)
+        item_matrix_node['layout'] = self.options.get('layout', 'list')
+        item_matrix_node['coverage'] = 'coverage' in self.options
+        item_matrix_node['hide-empty-rows'] = 'hide-empty-rows' in self.options
+        item_matrix_node['hide-empty-columns'] = \
+            'hide-empty-columns' in self.options
+
+        # Process gap mode: only the items missing relationships are listed
+        item_matrix_node['gaps'] = self.options.get('gaps')
+
+        env.traceability_list_docs.add(env.docname)
+
+        return [item_matrix_node]
+
+
+class ItemPivotDirective(Directive):
+    """
+    Directive to generate a table of item counts, aggregated by item
+    attributes.
+
+    Syntax::
+
+      .. item-pivot:: title
+         :filter: filter
+         :rows: attribute
+         :columns: attribute
+         :links: <<relationship>> ...
+
+    """
+    # Optional argument: title (whitespace allowed)
+    optional_arguments = 1
+    final_argument_whitespace = True
+    # Options
+    option_spec = {'class': directives.class_option,
+                   'filter': filter_option,
+                   'rows': directives.unchanged_required,
+                   'columns': directives.unchanged_required,
+                   'links': directives.unchanged_required}
+    # Content disallowed
+    has_content = False
+
+    def run(self):
+        env = self.state.document.settings.env
+        item_pivot_node = item_pivot('')
+
+        # Process title (optional argument)
+        if len(self.arguments) > 0:
+            item_pivot_node['title'] = self.arguments[0]
+
+        item_pivot_node['filter'] = self.options.get('filter', '')
+
+        # Process ``rows`` & ``columns`` options: item attributes (type,
+        # docname or any data attribute)
+        options = item_options(env.config)
+        attributes = ITEM_ATTRIBUTES + tuple(options.data)
+        item_pivot_node['rows'] = self.options.get('rows', 'type')
+        item_pivot_node['columns'] = self.options.get('columns')
+        for option in ('rows', 'columns'):
+            if item_pivot_node[option] not in attributes + (None,):
+                raise self.error('Unknown item attribute: %s' %
+                                 item_pivot_node[option])
+
+        # Process ``links`` option: relationships whose links are counted,
+        # instead of items
+        item_pivot_node['links'] = self.options.get('links', '').split()
+        unknown = set(item_pivot_node['links']) - set(options.relationships)
+        if unknown:
+            raise self.error('Unknown relationship(s): %s' %
+                             ', '.join(sorted(unknown)))
+
+        env.traceability_list_docs.add(env.docname)
+
+        return [item_pivot_node]
+
+
+class ItemBacklinksDirective(Directive):
+    """
+    Directive to generate the links to an item from other items: its
+    relationships not declared by the item itself.
+
+    Syntax::
+
+      .. item-backlinks:: item_id
+
+    """
+    required_arguments = 1
+    optional_arguments = 0
+    final_argument_whitespace = False
+    # Content disallowed
+    has_content = False
+
+    def run(self):
+        env = self.state.document.settings.env
+        item_backlinks_node = item_backlinks('')
+        item_backlinks_node['item'] = self.arguments[0]
+
+        env.traceability_list_docs.add(env.docname)
+
+        return [item_backlinks_node]
+
+
+class ItemSearchDirective(Directive):
+    """
+    Directive to place a search box of items by identifier (HTML only).
+    Requires ``traceability_search`` configuration variable.
+
+    Syntax::
+
+      .. item-search::
+
+    """
+    required_arguments = 0
+    optional_arguments = 0
+    final_argument_whitespace = False
+    # Content disallowed
+    has_content = False
+
+    def run(self):
+        env = self.state.document.settings.env
+        if not env.config.traceability_search:
+            return [self.state.document.reporter.warning(
+                'Traceability: item-search requires traceability_search',
+                line=self.lineno)]
+        return [item_search('')]
+
+
+class ItemHarvestDirective(Directive):
+    """
+    Directive to declare the items found in docstrings of Python source
+    files. Sources are parsed, never imported.
+
+    Syntax::
+
+      .. item-harvest:: path ...
+         :pattern: glob
+         :directives: item ...
+
+    Paths are files or directories (scanned recursively for files
+    matching ``pattern``, ``*.py`` by default), relative to the current
+    document. Only directives named in ``directives`` (``item`` by
+    default) are harvested.
+
+    Harvested directives are inserted in the document as if they were
+    written there, so they are stored and rendered as any other item.
+
+    """
+    # Required argument: paths (space separated)
+    required_arguments = 1
+    optional_arguments = 0
+    final_argument_whitespace = True
+    # Options
+    option_spec = {'pattern': directives.unchanged,
+                   'directives': directives.unchanged}
+    # Content disallowed
+    has_content = False
+
+    def run(self):
+        env = self.state.document.settings.env
+        reporter = self.state.document.reporter
+        messages = []
+
+        names = self.options.get('directives', 'item').split()
+        paths = [env.relfn2path(path, env.docname)[1]
+                 for path in self.arguments[0].split()]
+        pattern = self.options.get('pattern', '*.py')
+        files = harvest.find_source_files(paths, pattern)
+        note_scanned_files(env, paths, pattern, files)
+
+        # Every generated line is bound to the source line of its item,
+        # so that parsing errors point to the harvested file
+        lines = StringList()
+        for path, items, error in harvest.harvest_items(
+                files, names, env.traceability_harvest_cache,
+                env.config.traceability_harvest_jobs):
+            env.note_dependency(path)
+            if error:
+                messages.append(reporter.warning(
+                    'Traceability: cannot harvest %s: %s' % (path, error),
+                    line=self.lineno))
+            for item_info in items:
+                for line in harvest.item_directive_lines(item_info):
+                    lines.append(line, path, item_info['lineno'] - 1)
+
+        logger.verbose('%s: %d lines harvested from %d files' %
+                       (env.docname, len(lines), len(files)))
+        if lines:
+            self.state_machine.insert_input(lines, self.state_machine.
+                                            document.attributes['source'])
+
+        return messages
+
+
+class ItemTagsDirective(Directive):
+    """
+    Directive to declare the items and relationships tagged in comments
+    of source files of any language (see ``tags`` module).
+
+    Syntax::
+
+      .. item-tags:: path ...
+         :pattern: glob
+         :prefix: text
+
+    """
+    required_arguments = 1
+    optional_arguments = 0
+    final_argument_whitespace = True
+    # Options
+    option_spec = {'pattern': directives.unchanged,
+                   'prefix': directives.unchanged}
+    # Content disallowed
+    has_content = False
+
+    def run(self):
+        env = self.state.document.settings.env
+        reporter = self.state.document.reporter
+        messages = []
+
+        names = tags.tag_names(item_options(env.config).relationships)
+        paths = [env.relfn2path(path, env.docname)[1]
+                 for path in self.arguments[0].split()]
+        pattern = self.options.get('pattern', '*')
+        files = harvest.find_source_files(paths, pattern)
+        note_scanned_files(env, paths, pattern, files)
+        prefix = self.options.get('prefix', '')
+
+        # Every generated line is bound to the source line of its tag
+        lines = StringList()
+        for path, tagged, error in harvest.harvest_items(
+                files, names, env.traceability_harvest_cache,
+                env.config.traceability_harvest_jobs, tags.scan_file):
+            env.note_dependency(path)
+            if error:
+                messages.append(reporter.warning(
+                    'Traceability: cannot scan %s: %s' % (path, error),
+                    line=self.lineno))
+            if not tagged:
+                continue
+            relpath = os.path.relpath(path, env.srcdir).replace(os.sep, '/')
+            for item_info in tags.tagged_items(tagged, prefix + relpath,
+                                               relpath):
+                for line in harvest.item_directive_lines(item_info):
+                    lines.append(line, path, item_info['lineno'] - 1)
+
+        logger.verbose('%s: %d lines from tags of %d files' %
+                       (env.docname, len(lines), len(files)))
+        if lines:
+            self.state_machine.insert_input(lines, self.state_machine.
+                                            document.attributes['source'])
+
+        return messages
+
+
+# -----------------------------------------------------------------------------
+# Event handlers
+
+def purge_items(app, env, docname):
+    """
+    Clean, if existing, ``item`` entries in ``traceability_all_items``
+    environment variable, for all the source docs being purged.
+
+    Purged items are kept in ``app.traceability_changes`` until the
+    relationship index is updated.
+
+    This function should be triggered upon ``env-purge-doc`` event.
+
+    """
+    for key in env.traceability_doc_items.pop(docname, []):
+        item_info = env.traceability_all_items.pop(key, None)
+        if item_info is not None:
+            app.traceability_changes.setdefault(key, item_info)
+    env.traceability_list_docs.discard(docname)
+    env.traceability_role_references.pop(docname, None)
+    env.traceability_scanned_files.pop(docname, None)
+
+
+def collect_item_references(app, doctree):
+    """
+    Record the targets (and lines) of the ``item`` role references of a
+    document, so that references to undefined items are reported for all
+    documents, not only the ones written by the build.
+
+    This function should be triggered upon ``doctree-read`` event.
+
+    """
+    env = app.builder.env
+    references = [(node['reftarget'], node.line)
+                  for node in doctree.traverse(pending_item_xref)]
+    if references:
+        env.traceability_role_references[env.docname] = references
+
+
+def process_item_nodes(app, doctree, fromdocname):
+    """
+    This function should be triggered upon ``doctree-resolved event``
+
+    Replace all item_list nodes with a list of the collected items.
+    Augment each item with a backlink to the original location.
+
+    """
+    env = app.builder.env
+
+    all_items = app.traceability_ids
+
+    # Item matrix:
+    # Create table with related items, printing their target references.
+    # Only source and target items matching respective filters shall be
+    # included
+    for index, node in enumerate(doctree.traverse(item_matrix), start = 1):
+        if node.get('gaps'):
+            sources = item_matrix_gaps(app, node)
+        else:
+            sources = item_matrix_sources(app, node)
+        if node.get('hide-empty-rows') and not node.get('gaps'):
+            sources = [source for source, targets in
+                       item_matrix_rows(app, node, sources) if targets]
+        pages = item_pages(app, node, sources)
+        if pages:
+            content = paginate(app, fromdocname, 'item-matrix', index, node,
+                               pages)
+        else:
+            content = [make_item_matrix(app, fromdocname, node, index,
+                                        sources)]
+
+        if node['export'] and app.builder.format == 'html':
+            content.append(export_item_matrix(app, fromdocname, node, index,
+                                              sources))
+        node.replace_self(content)
+
+    # Item backlinks:
+    # Create paragraphs with the items related to an item, by relationship
+    for node in doctree.traverse(item_backlinks):
+        node.replace_self(make_item_backlinks(app, fromdocname, node))
+
+    # Item search:
+    # Create search box, loading the item search index
+    for node in doctree.traverse(item_search):
+        if app.builder.format == 'html':
+            script = relative_uri(app.builder.get_target_uri(fromdocname),
+                                  '%s/%s' % (SEARCH_DIR.replace(os.sep, '/'),
+                                             SEARCH_SCRIPT))
+            node.replace_self(nodes.raw('', SEARCH_WIDGET % script,
+                                        format='html'))
+        else:
+            node.replace_self([])
+
+    # Item pivot:
+    # Create table with item counts by attribute values
+    for index, node in enumerate(doctree.traverse(item_pivot), start=1):
+        node.replace_self(make_item_pivot(app, node, index))
+
+    # Item list:
+    # Create list with target references. Only items matching list regexp
+    # shall be included
+    for index, node in enumerate(doctree.traverse(item_list), start = 1):
+        items = id_filter(node['filter']).select(all_items)
+        having = attribute_filter(app, node, 'attribute')
+        if having is not None:
+            items = [item_id for item_id in items if item_id in having]
+        if node.get('suspect'):
+            suspects = getattr(env, 'traceability_suspects', None) or ()
+            items = [item_id for item_id in items if item_id in suspects]
+        pages = item_pages(app, node, items)
+        if pages:
+            node.replace_self(paginate(app, fromdocname, 'item-list', index,
+                                       node, pages))
+        else:
+            node.replace_self(make_item_list(app, fromdocname, items))
+
+    # Resolve item cross references (from ``item`` role). The pending node
+    # is replaced, so its contents are moved to the reference, not copied
+    for node in doctree.traverse(pending_item_xref):
+        contnode = node[0]
+        new_node = None
+        # If target exists, try to create the reference
+        if node['reftarget'] in env.traceability_all_items:
+            item_info = env.traceability_all_items[node['reftarget']]
+            try:
+                new_node = make_refnode(app.builder,
+                                        fromdocname,
+                                        item_info['docname'],
+                                        item_info['target']['refid'],
+                                        contnode,
+                                        node['reftarget'])
+            except NoUri:
+                # ignore if no URI can be determined, e.g. for LaTeX output :(
+                pass
+
+        # Create a dummy reference if target reference fails (undefined
+        # items are reported by ``report_unresolved_references``)
+        if new_node is None:
+            new_node = make_refnode(app.builder,
+                                    fromdocname,
+                                    fromdocname,
+                                    'ITEM_NOT_FOUND',
+                                    contnode,
+                                    node['reftarget'] + '??')
+
+        node.replace_self(new_node)
+
+
+def collect_item_pages(app):
+    """
+    Yields sub-pages of paginated item lists and matrices, one by one, so
+    that each page is built from its own items only when it is written.
+
+    This function should be triggered upon ``html-collect-pages`` event.
+    Sphinx writes collected pages in the main process, after documents:
+    sub-pages are not written in parallel.
+
+    """
+    while app.traceability_pages:
+        page = app.traceability_pages.pop(0)
+        pagename = page['pagename']
+        node = page['node']
+
+        navigation = nodes.paragraph()
+        for number, text in ((page['page'] - 1, 'Previous'),
+                             (None, 'Up'),
+                             (page['page'] + 1, 'Next')):
+            if number is None:
+                target = page['docname']
+            elif 1 <= number <= page['pages']:
+                target = page_name(page['docname'], page['kind'],
+                                   page['index'], number)
+            else:
+                continue
+            if len(navigation):
+                navigation += nodes.Text(' | ')
+            navigation += nodes.reference(text, text, refuri=page_uri(
+                app, pagename, target))
+
+        if page['kind'] == 'item-matrix':
+            content = make_item_matrix(app, pagename, node, page['index'],
+                                       page['items'])
+        else:
+            content = make_item_list(app, pagename, page['items'])
+
+        body = nodes.container()
+        body += [nodes.paragraph('', '', nodes.strong(page['title'],
+                                                      page['title'])),
+                 navigation, content, navigation.deepcopy()]
+        fragment = app.builder.render_partial(body)['fragment']
+        yield pagename, {'title': page['title'], 'body': fragment}, \
+            'page.html'
+
+
+def update_available_item_relationships(app):
+    """
+    Update the relationships and data options of items from the
+    configuration of the application: both keys (relationships) and
+    values (reverse relationships) of ``traceability_relationships``
+    variable, and ``traceability_data`` options.
+
+    This handler should be called upon builder initialization, before
+    processing any directive.
+
+    Options are kept per application (see ``item_options``), so that
+    applications with different configurations can run in one process.
+
+    ``env.relationships`` and ``env.data`` are still set, as copies of the
+    options, for code reading them. They are deprecated: changing them has
+    no effect, use ``item_options`` instead.
+
+    """
+    options = _item_options[app.config] = ItemOptions(app.config)
+    env = app.builder.env
+    env.relationships = dict(options.relationships)
+    env.data = list(options.data)
+
+
+def initialize_environment(app):
+    """
+    Perform initializations needed before the build process starts.
+    """
+    env = app.builder.env
+
+    # Assure ``traceability_all_items`` will always be there.
+    if not hasattr(env, 'traceability_all_items'):
+        env.traceability_all_items = {}
+
+    # Per-file results of ``item-harvest`` directives
+    if not hasattr(env, 'traceability_harvest_cache'):
+        env.traceability_harvest_cache = {}
+
+    # Identifiers of the items defined in each document, so that documents
+    # are purged without walking all items
+    if not hasattr(env, 'traceability_doc_items'):
+        env.traceability_doc_items = {}
+        for key, item_info in env.traceability_all_items.items():
+            env.traceability_doc_items.setdefault(
+                item_info['docname'], []).append(key)
+
+    # Documents with item lists or matrices, which depend on all items
+    if not hasattr(env, 'traceability_list_docs'):
+        env.traceability_list_docs = set()
+
+    # Source files found by the scans (paths and pattern) of directives
+    # of each document
+    if not hasattr(env, 'traceability_scanned_files'):
+        env.traceability_scanned_files = {}
+
+    # Targets of the ``item`` role references of each document
+    if not hasattr(env, 'traceability_role_references'):
+        env.traceability_role_references = {}
+
+    # Relationships read from each link file
+    if not hasattr(env, 'traceability_link_cache'):
+        env.traceability_link_cache = {}
+
+    # Results read from each test report, and results of all items
+    if not hasattr(env, 'traceability_result_cache'):
+        env.traceability_result_cache = {}
+        env.traceability_results = None
+
+    # Digests of items and of the targets of their links when confirmed,
+    # loaded from the suspect link store once per application
+    suspects = getattr(app, 'traceability_suspects', None)
+    if suspects is None and app.config.traceability_suspect_relationships:
+        path = suspect_store_path(app)
+        try:
+            suspects = SuspectLinks.load(path)
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning('cannot read suspect link store %s: %s' %
+                           (path, exc), type='traceability',
+                           subtype='suspects')
+            suspects = SuspectLinks()
+    if not app.config.traceability_suspect_relationships:
+        suspects = None
+    app.traceability_suspects = env.traceability_suspects = suspects
+
+    update_available_item_relationships(app)
+
+    # Sub-pages of paginated item lists and matrices, pending to be written
+    app.traceability_pages = []
+
+    # Items purged since the relationship index was last updated, and
+    # documents read in the current build
+    app.traceability_changes = {}
+    app.traceability_read_docs = []
+
+
+def find_rescanned_documents(app, env, added, changed, removed):
+    """
+    Return the documents whose scanned source files (of ``item-harvest``
+    and ``item-tags`` directives) changed: files added or removed under
+    scanned directories are not dependencies of the documents yet.
+
+    This function should be triggered upon ``env-get-outdated`` event.
+
+    """
+    outdated = []
+    for docname, scans in env.traceability_scanned_files.items():
+        if docname in removed or docname in changed:
+            continue
+        for paths, pattern, files in scans:
+            if harvest.find_source_files(paths, pattern) != files:
+                outdated.append(docname)
+                break
+    return outdated
+
+
+def update_test_results(app, env, added, changed, removed):
+    """
+    Read the results of item tests from the JUnit XML reports in
+    ``traceability_test_results`` configuration variable, or take them
+    from the environment if reports did not change.
+
+    Documents of items whose results changed are returned to be read
+    again.
+
+    This function should be triggered upon ``env-get-outdated`` event.
+
+    """
+    results = None
+    if app.config.traceability_test_results:
+        pattern = app.config.traceability_test_result_pattern
+        paths = [os.path.join(app.srcdir, path)
+                 for path in app.config.traceability_test_results]
+        results = {}
+        cache = env.traceability_result_cache
+        for key in [key for key in cache if key[0] not in paths]:
+            del cache[key]
+        for path, digest, report, error in load_test_results(
+                paths, cache, re.compile(pattern) if pattern else None):
+            if error:
+                logger.warning('cannot read test report %s: %s' %
+                               (path, error), location=path,
+                               type='traceability', subtype='results')
+            for item_id, result in report.items():
+                merge_result(results, item_id, result)
+
+    previous = env.traceability_results or {}
+    env.traceability_results = results
+    results = results or {}
+    items = env.traceability_all_items
+    return sorted(set(items[item_id]['docname']
+                      for item_id in set(previous) | set(results)
+                      if item_id in items and
+                      previous.get(item_id) != results.get(item_id)))
+
+
+def reset_unresolved_references(app, env, docnames):
+    """
+    Start collecting the unresolved item references of a build, and
+    record the documents to be read.
+
+    This function should be triggered upon ``env-before-read-docs`` event.
+
+    """
+    app.traceability_unresolved = UnresolvedReferences(
+        app.config.traceability_unresolved_warnings)
+    app.traceability_read_docs = list(docnames)
+
+
+def report_unresolved_references(app, exception):
+    """
+    Summarize the unresolved item references of the build, in one warning
+    and, if ``traceability_unresolved_report`` is set, in a JSON file in
+    the output directory.
+
+    Relationships were checked when the environment was updated. Role
+    references of all documents, whether written by the build or not, are
+    merged here.
+
+    This function should be triggered upon ``build-finished`` event.
+
+    """
+    unresolved = getattr(app, 'traceability_unresolved', None)
+    if exception is not None or unresolved is None:
+        return
+
+    items = app.env.traceability_all_items
+    references = app.env.traceability_role_references
+    for docname in sorted(references):
+        for target, line in references[docname]:
+            if target not in items and unresolved.add(target, docname,
+                                                      'role'):
+                logger.warning('undefined item: %s' % target,
+                               location=(docname, line), type='ref',
+                               subtype='item')
+
+    if unresolved.total:
+        logger.warning(unresolved.summary(), type='ref', subtype='item')
+    if app.config.traceability_unresolved_report:
+        path = os.path.join(app.outdir,
+                            app.config.traceability_unresolved_report)
+        ensuredir(os.path.dirname(path))
+        unresolved.write(path)
+
+
+def write_item_snapshot(app, exception):
+    """
+    Write the snapshot of all items and their relationships queried by
+    the command line tool, if ``traceability_snapshot`` is set.
+
+    This function should be triggered upon ``build-finished`` event.
+
+    """
+    index = getattr(app, 'traceability_index', None)
+    if (exception is not None or index is None or
+            not app.config.traceability_snapshot):
+        return
+
+    env = app.builder.env
+    options = item_options(app.config)
+    suspects = env.traceability_suspects
+
+    def records():
+        for item_id, item_info in env.traceability_all_items.items():
+            try:
+                uri = '%s#%s' % (app.builder.get_target_uri(
+                    item_info['docname']), item_id)
+            except NoUri:
+                uri = None
+            yield item_id, item_record(
+                item_info, index.links.get(item_id, {}), options.data, uri,
+                suspects.get(item_id) if suspects is not None else None)
+
+    path = os.path.join(app.outdir, app.config.traceability_snapshot)
+    ensuredir(os.path.dirname(path))
+    write_snapshot(path, records(), options.relationships, options.data)
+
+
+def write_item_search_index(app, exception):
+    """
+    Write the index of items loaded by ``item-search`` boxes, if
+    ``traceability_search`` is set, in a single pass over all items.
+
+    This function should be triggered upon ``build-finished`` event.
+
+    """
+    index = getattr(app, 'traceability_index', None)
+    if (exception is not None or index is None or
+            not app.config.traceability_search or
+            app.builder.format != 'html'):
+        return
+
+    items = app.builder.env.traceability_all_items
+
+    def entries():
+        for item_id in sorted(items, key=sort_key):
+            item_info = items[item_id]
+            uri = app.builder.get_target_uri(item_info['docname'])
+            counts = {}
+            for rel, targets in sorted(index.links.get(item_id, {}).items()):
+                count = sum(1 for target in targets if target in items)
+                if count:
+                    counts[rel] = count
+            yield (item_id, item_info['caption'], item_info['type'],
+                   '%s#%s' % (uri.split('#')[0], item_id), counts)
+
+    write_search_index(app.outdir, entries(),
+                       app.config.traceability_search_shard_length)
+
+
+def build_relationship_index(app, env):
+    """
+    Build the relationship index of all items, once all documents are
+    read, and keep it in ``app.traceability_index``.
+
+    When the application is kept running between builds (see the
+    ``daemon`` module), the index of the previous build is updated
+    instead: items purged from the documents read are removed from it,
+    and the items read are added again.
+
+    Documents with item lists or matrices are returned to be written
+    again if any item changed.
+
+    This function should be triggered upon ``env-updated`` event, before
+    any other handler using the index.
+
+    """
+    items = env.traceability_all_items
+    changes = app.traceability_changes
+    app.traceability_changes = {}
+    added = [items[key] for docname in app.traceability_read_docs
+             for key in env.traceability_doc_items.get(docname, [])]
+
+    links = read_item_links(app, env)
+    indexed_links = getattr(app, 'traceability_links', [])
+    app.traceability_links = links
+    links_changed = [link[:2] for link in links] != \
+        [link[:2] for link in indexed_links]
+
+    relationships = item_options(app.config).relationships
+    index = getattr(app, 'traceability_index', None)
+    if (index is None or index.items is not items or
+            index.relationships != relationships):
+        index = app.traceability_index = RelationshipIndex(
+            items, relationships)
+        index_item_links(index, links)
+    else:
+        for item_info in changes.values():
+            index.remove_item(item_info)
+        for item_info in added:
+            index.add_item(item_info)
+        if links_changed:
+            index_item_links(index, indexed_links, -1)
+            index_item_links(index, links)
+
+    # Sorted identifiers of all items, which item filters and target
+    # patterns search, and their attributes, gathered again on first use
+    app.traceability_ids = sorted(items)
+    app.traceability_columns = None
+    index.expand_patterns(app.traceability_ids)
+
+    # Items read again just as they were do not change lists nor matrices
+    changed = links_changed or len(changes) != len(added) or any(
+        item_signature(env, item_info) !=
+        item_signature(env, changes.get(item_info['id']))
+        for item_info in added)
+    if changed:
+        return sorted(env.traceability_list_docs -
+                      set(app.traceability_read_docs))
+
+
+def read_item_links(app, env):
+    """
+    Read the link files in ``traceability_link_files`` configuration
+    variable, or take their relationships from the environment if they
+    did not change. Returns a list of ``(path, digest, records)``.
+
+    """
+    paths = [os.path.join(app.srcdir, path)
+             for path in app.config.traceability_link_files]
+    cache = env.traceability_link_cache
+    for path in set(cache) - set(paths):
+        del cache[path]
+
+    links = []
+    for path, digest, records, error in load_link_files(paths, cache):
+        if error:
+            logger.warning('cannot read link file %s: %s' % (path, error),
+                           location=path, type='traceability',
+                           subtype='links')
+        links.append((path, digest, records))
+    return links
+
+
+def index_item_links(index, links, count=1):
+    """
+    Index the relationships read from link files (a negative ``count``
+    removes them). Unknown relationships are reported by ``check_items``.
+
+    """
+    for path, digest, records in links:
+        for source, relationship, target, lineno in records:
+            if relationship not in index.relationships:
+                continue
+            if target_pattern(target) is None:
+                index.add(source, relationship, target, count)
+            else:
+                index.add_pattern(source, relationship, target, count)
+
+
+def update_suspect_links(app, env):
+    """
+    Flag the links of ``traceability_suspect_relationships`` whose target
+    item changed since they were confirmed, checking only the links of
+    items whose digest changed (see ``suspects`` module).
+
+    Documents of items whose suspect links changed are read again if the
+    item template shows them, and returned to be written again, along
+    with the documents with item lists.
+
+    This function should be triggered upon ``env-updated`` event, after
+    ``build_relationship_index``.
+
+    """
+    suspects = env.traceability_suspects
+    if suspects is None:
+        return
+
+    relationships = app.config.traceability_suspect_relationships
+    reverse = item_options(app.config).relationships
+    for rel in relationships:
+        if rel not in reverse:
+            raise ConfigError('traceability_suspect_relationships: unknown '
+                              'relationship %r' % rel)
+
+    items = env.traceability_all_items
+    flagged = suspects.update(items, app.traceability_index, relationships)
+    if not flagged:
+        return
+
+    docnames = set()
+    template = Environment().parse(env.config.traceability_item_template)
+    if 'suspect' in meta.find_undeclared_variables(template):
+        docnames.update(items[item_id]['docname'] for item_id in flagged
+                        if item_id in items)
+        # Items read again are rendered differently only: the index holds
+        # their relationships already
+        for docname in sorted(docnames):
+            app.emit('env-purge-doc', env, docname)
+            env.clear_doc(docname)
+            app.builder.read_doc(docname)
+            for key in env.traceability_doc_items.get(docname, []):
+                app.traceability_changes.pop(key, None)
+    return sorted(docnames | env.traceability_list_docs)
+
+
+def write_suspect_links(app, exception):
+    """
+    Write the suspect link store, confirming the links seen for the first
+    time in the build.
+
+    This function should be triggered upon ``build-finished`` event.
+
+    """
+    suspects = getattr(app, 'traceability_suspects', None)
+    index = getattr(app, 'traceability_index', None)
+    if exception is not None or suspects is None or index is None:
+        return
+    path = suspect_store_path(app)
+    ensuredir(os.path.dirname(path))
+    suspects.write(path, index, app.config.traceability_suspect_relationships)
+
+
+def suspect_store_path(app):
+    """
+    Returns the path of the suspect link store, relative to the source
+    directory if set in ``traceability_suspect_store``, else a file in the
+    doctree directory.
+
+    """
+    if app.config.traceability_suspect_store:
+        return os.path.join(app.srcdir, app.config.traceability_suspect_store)
+    return os.path.join(app.doctreedir, 'traceability_suspects.json')
+
+
+def check_items(app, env):
+    """
+    Check that all target items in relationships do exist (and that
+    target patterns match any item), as well as the items and
+    relationships of link files
+    """
+    items = env.traceability_all_items
+    unresolved = app.traceability_unresolved
+    relationships = item_options(app.config).relationships
+    expansions = app.traceability_index.expansions
+
+    for source in items:
+        for relationship in list(relationships.keys()):
+            for target in items[source][relationship]:
+                if target in expansions:
+                    if not expansions[target]:
+                        logger.warning('%s %s matches no item: %s' %
+                                       (source, relationship, target),
+                                       location=items[source]['docname'],
+                                       type='ref', subtype='item')
+                elif target not in items and unresolved.add(
+                        target, items[source]['docname'], 'relationship'):
+                    logger.error ( '%s %s undefined item: %s' %
+                                    (source, relationship, target),
+                                    location = items[source]['docname'],
+                                    type = 'ref',
+                                    subtype = 'item')
+
+    for path, digest, records in app.traceability_links:
+        docname = os.path.relpath(path, app.srcdir)
+        for source, relationship, target, lineno in records:
+            location = '%s:%d' % (path, lineno)
+            if relationship not in relationships:
+                logger.error('%s: unknown relationship %s' %
+                             (source, relationship), location=location,
+                             type='traceability', subtype='links')
+                continue
+            item_ids = (source, target)
+            if target in expansions:
+                if not expansions[target]:
+                    logger.warning('%s %s matches no item: %s' %
+                                   (source, relationship, target),
+                                   location=location, type='ref',
+                                   subtype='item')
+                item_ids = (source,)
+            for item_id in item_ids:
+                if item_id not in items and unresolved.add(
+                        item_id, docname, 'relationship'):
+                    logger.error('%s %s undefined item: %s' %
+                                 (source, relationship, item_id),
+                                 location=location, type='ref',
+                                 subtype='item')
+
+
+def check_cycles(app, env):
+    """
+    Check that relationships listed in ``traceability_acyclic_relationships``
+    configuration variable do not form cycles among items. Each cycle is
+    reported once, with the locations of all its items.
+    """
+    relationships = app.config.traceability_acyclic_relationships
+    if not relationships:
+        return
+
+    reverse = item_options(app.config).relationships
+    for rel in relationships:
+        if rel not in reverse:
+            raise ConfigError('traceability_acyclic_relationships: unknown '
+                              'relationship %r' % rel)
+        if reverse[rel] in relationships:
+            raise ConfigError('traceability_acyclic_relationships: %r and '
+                              'its reverse %r always form cycles' %
+                              (rel, reverse[rel]))
+
+    items = env.traceability_all_items
+    for cycle in find_cycles(app.traceability_index, relationships):
+        logger.warning('relationship cycle (%s): %s' % (
+            ', '.join(relationships),
+            ', '.join('%s (%s)' % (item_id,
+                                   item_location(env, items[item_id]))
+                      for item_id in cycle)),
+            location=item_location(env, items[cycle[0]], absolute=True),
+            type='traceability', subtype='cycle')
+
+
+def check_rules(app, env):
+    """
+    Check all items against the rules in ``traceability_rules``
+    configuration variable, in a single pass
+    """
+    if not app.config.traceability_rules:
+        return
+
+    try:
+        rules = compile_rules(app.config.traceability_rules,
+                              item_options(app.config).relationships)
+    except ValueError as exc:
+        raise ConfigError(str(exc))
+
+    for rule, item_info, violation in evaluate_rules(
+            rules, app.traceability_index):
+        message = '%s violates rule %s: %s' % (item_info['id'], rule.name,
+                                               violation)
+        if rule.message:
+            message += ' (%s)' % rule.message
+        log = logger.error if rule.severity == 'error' else logger.warning
+        log(message, location=item_location(env, item_info, absolute=True),
+            type='traceability', subtype='rule')
+
+
+# -----------------------------------------------------------------------------
+# Utility functions
+
+def note_scanned_files(env, paths, pattern, files):
+    """
+    Record the ``files`` found in ``paths`` for ``pattern`` by a directive
+    of the current document, checked by ``find_rescanned_documents``.
+
+    """
+    env.traceability_scanned_files.setdefault(env.docname, []).append(
+        (paths, pattern, files))
+
+
+def item_signature(env, item_info):
+    """
+    Return what item lists and matrices show of an item.
+
+    """
+    if item_info is None:
+        return None
+    options = item_options(env.config)
+    return (item_info['docname'], item_info['type'], item_info['caption'],
+            [item_info.get(rel, []) for rel in sorted(options.relationships)],
+            [item_info.get(data) for data in options.data])
+
+
+def item_location(env, item_info, absolute=False):
+    """
+    Returns the location of an item as ``source:line``. The source file
+    path is relative to the source directory unless ``absolute`` is set.
+
+    """
+    source = item_info.get('source') or env.doc2path(item_info['docname'])
+    if not absolute:
+        source = os.path.relpath(source, env.srcdir)
+    return '%s:%s' % (source, item_info['lineno'])
+
+
+def item_content(item_info):
+    """
+    Returns the content of an item as a string, reading it from its
+    source file if it is not kept in memory.
+
+    """
+    content = item_info['content']
+    if isinstance(content, str):
+        return content
+    text = content.load()
+    if text is None:
+        logger.warning('cannot load content of item %s, source changed' %
+                       item_info['id'],
+                       location='%s:%s' % (content.source, content.start + 1))
+        return ''
+    return text
+
+
+def item_matrix_rows(app, node, sources=None):
+    """
+    Yields a ``(source, targets)`` tuple for every source item of an
+    ``item_matrix`` node (or every item in ``sources``), with the sorted
+    list of its related targets, taken from the relationship index.
+
+    """
+    if sources is None:
+        sources = item_matrix_sources(app, node)
+    is_target = item_matrix_target(app, node)
+    for source in sources:
+        yield source, sorted(
+            target for target in
+            app.traceability_index.targets(source, node['type'])
+            if is_target(target))
+
+
+def attribute_filter(app, node, option):
+    """
+    Returns the set of items selected by the attribute filter of a node
+    ``option``, or ``None`` if it is not set.
+
+    """
+    if not node.get(option):
+        return None
+    return item_columns(app).having(node[option][0], node[option][1:])
+
+
+def item_matrix_sources(app, node):
+    """
+    Returns the sorted list of source items of an ``item_matrix`` node.
+
+    """
+    sources = id_filter(node['source']).select(app.traceability_ids)
+    having = attribute_filter(app, node, 'source-attribute')
+    if having is not None:
+        sources = [source for source in sources if source in having]
+    return sources
+
+
+def item_matrix_gaps(app, node):
+    """
+    Returns the sorted list of the items of an ``item_matrix`` node in gap
+    mode, computed as set differences on the relationship index, without
+    building the rows of the matrix:
+
+    * ``sources``: source items minus the items related to any target
+      by the reverse relationships of the matrix
+    * ``targets``: target items minus the items related to any source
+    * ``items``: source items minus the items with any relationship
+
+    """
+    index = app.traceability_index
+    sources = item_matrix_sources(app, node)
+    if node['gaps'] == 'items':
+        return [source for source in sources if not index.targets(source)]
+
+    is_target = item_matrix_target(app, node)
+    targets = [target for target in
+               id_filter(node['target']).select(app.traceability_ids)
+               if is_target(target)]
+    relationships = node['type'] or sorted(index.relationships)
+    if node['gaps'] == 'targets':
+        referenced = set()
+        for source in sources:
+            referenced.update(index.targets(source, relationships))
+        return [target for target in targets if target not in referenced]
+
+    reverse = set(index.relationships[rel] for rel in relationships)
+    referencing = set()
+    for target in targets:
+        referencing.update(index.targets(target, reverse))
+    return [source for source in sources if source not in referencing]
+
+
+def gap_title(node):
+    """
+    Returns the column title of an ``item_matrix`` node in gap mode.
+
+    """
+    if node['gaps'] == 'sources':
+        return '%s without %s' % (node['source-title'], node['target-title'])
+    if node['gaps'] == 'targets':
+        return '%s not referenced' % node['target-title']
+    return '%s without relationships' % node['source-title']
+
+
+def item_matrix_target(app, node):
+    """
+    Returns a function telling whether an item is a target of an
+    ``item_matrix`` node.
+
+    """
+    target_filter = id_filter(node['target'])
+    having = attribute_filter(app, node, 'target-attribute')
+    if having is None:
+        return target_filter.match
+    return lambda target: target in having and target_filter.match(target)
+
+
+def make_item_list(app, fromdocname, items):
+    """
+    Creates a bullet list with references to ``items``.
+
+    """
+    env = app.builder.env
+    content = nodes.bullet_list()
+    for item in items:
+        bullet_list_item = nodes.list_item()
+        bullet_list_item.append(
+            make_item_ref(app, env, fromdocname,
+                          env.traceability_all_items[item]))
+        content.append(bullet_list_item)
+    return content
+
+
+def make_item_matrix(app, fromdocname, node, index, sources):
+    """
+    Creates the table of an item matrix, with a row for each item in
+    ``sources``.
+
+    """
+    if node.get('gaps'):
+        return make_item_gaps(app, fromdocname, node, index, sources)
+    if node.get('layout') == 'grid':
+        return make_item_grid(app, fromdocname, node, index, sources)
+    if node.get('layout') == 'relationships':
+        return make_item_relationship_matrix(app, fromdocname, node, index,
+                                             sources)
+
+    env = app.builder.env
+    table = nodes.table()
+    if 'title' in node:
+        table += nodes.title('',node['title'])
+        table['ids'] = [f'item-matrix-{index}']
+    tgroup = nodes.tgroup()
+    left_colspec = nodes.colspec(colwidth=5)
+    right_colspec = nodes.colspec(colwidth=5)
+    tgroup += [left_colspec, right_colspec]
+    tgroup += nodes.thead('', nodes.row(
+        '',
+        nodes.entry('', nodes.paragraph('', node['source-title'])),
+        nodes.entry('', nodes.paragraph('', node['target-title']))))
+    tbody = nodes.tbody()
+    tgroup += tbody
+    table += tgroup
+
+    for source_item, target_items in item_matrix_rows(app, node, sources):
+        row = nodes.row()
+        left = nodes.entry()
+        left += make_item_ref(app, env, fromdocname,
+                              env.traceability_all_items[source_item])
+        right = nodes.entry()
+        for target_item in target_items:
+            right += make_item_ref(
+                app, env, fromdocname,
+                env.traceability_all_items[target_item])
+        row += left
+        row += right
+        tbody += row
+
+    return table
+
+
+def make_item_relationship_matrix(app, fromdocname, node, index, sources):
+    """
+    Creates the table of an item matrix in relationships layout: a row for
+    each item in ``sources``, with a column of related targets for each
+    relationship in ``type`` (all of them if not set) and, if ``coverage``
+    is set, the number of relationships with any target.
+
+    The targets of all relationships of a source are taken at once from
+    the relationship index.
+
+    """
+    env = app.builder.env
+    relationships = node['type'] or sorted(
+        item_options(env.config).relationships)
+    is_target = item_matrix_target(app, node)
+
+    table = nodes.table(classes=['item-matrix-relationships'])
+    if 'title' in node:
+        table += nodes.title('', node['title'])
+        table['ids'] = [f'item-matrix-{index}']
+    columns = len(relationships) + (2 if node.get('coverage') else 1)
+    tgroup = nodes.tgroup(cols=columns)
+    tgroup += [nodes.colspec(colwidth=5) for column in range(columns)]
+    header = nodes.row()
+    header += nodes.entry('', nodes.paragraph('', node['source-title']))
+    for relationship in relationships:
+        header += nodes.entry('', nodes.paragraph('', relationship))
+    if node.get('coverage'):
+        header += nodes.entry('', nodes.paragraph('', 'Coverage'))
+    tgroup += nodes.thead('', header)
+    tbody = nodes.tbody()
+    tgroup += tbody
+    table += tgroup
+
+    for source in sources:
+        related = app.traceability_index.targets_by_relationship(
+            source, relationships)
+        row = nodes.row()
+        row += nodes.entry('', make_item_ref(
+            app, env, fromdocname, env.traceability_all_items[source]))
+        covered = 0
+        for relationship in relationships:
+            targets = sorted(target for target in related[relationship]
+                             if is_target(target))
+            entry = nodes.entry()
+            for target in targets:
+                entry += make_item_ref(app, env, fromdocname,
+                                       env.traceability_all_items[target])
+            row += entry
+            covered += bool(targets)
+        if node.get('coverage'):
+            row += nodes.entry('', nodes.paragraph(
+                '', '%d/%d' % (covered, len(relationships))))
+        tbody += row
+
+    return table
+
+
+def make_item_gaps(app, fromdocname, node, index, items):
+    """
+    Creates the table of an item matrix in gap mode: a row for each item in
+    ``items``, as computed by ``item_matrix_gaps``.
+
+    """
+    env = app.builder.env
+    table = nodes.table(classes=['item-matrix-gaps'])
+    if 'title' in node:
+        table += nodes.title('', node['title'])
+        table['ids'] = [f'item-matrix-{index}']
+    tgroup = nodes.tgroup(cols=1)
+    tgroup += nodes.colspec(colwidth=10)
+    tgroup += nodes.thead('', nodes.row(
+        '', nodes.entry('', nodes.paragraph('', gap_title(node)))))
+    tbody = nodes.tbody()
+    tgroup += tbody
+    table += tgroup
+
+    for item_id in items:
+        tbody += nodes.row('', nodes.entry('', make_item_ref(
+            app, env, fromdocname, env.traceability_all_items[item_id])))
+
+    return table
+
+
+def make_item_grid(app, fromdocname, node, index, sources):
+    """
+    Creates the table of an item matrix in grid layout: a row for each
+    item in ``sources``, a column for each target item and a mark in the
+    cells of related items.
+
+    Only related pairs are taken from the relationship index, as a sparse
+    map of rows to their targets; empty cells are never looked up.
+
+    """
+    env = app.builder.env
+    adjacency = dict((source, set(targets)) for source, targets in
+                     item_matrix_rows(app, node, sources))
+    if node.get('hide-empty-columns'):
+        columns = sorted(set().union(*adjacency.values()))
+    else:
+        is_target = item_matrix_target(app, node)
+        columns = [target for target in
+                   id_filter(node['target']).select(app.traceability_ids)
+                   if is_target(target)]
+
+    table = nodes.table(classes=['item-matrix-grid'])
+    if 'title' in node:
+        table += nodes.title('', node['title'])
+        table['ids'] = [f'item-matrix-{index}']
+    tgroup = nodes.tgroup(cols=len(columns) + 1)
+    tgroup += nodes.colspec(colwidth=5)
+    tgroup += [nodes.colspec(colwidth=1) for column in columns]
+    header = nodes.row()
+    header += nodes.entry('', nodes.paragraph(
+        '', '%s / %s' % (node['source-title'], node['target-title'])))
+    for column in columns:
+        header += nodes.entry('', make_item_ref(
+            app, env, fromdocname, env.traceability_all_items[column],
+            with_caption=False))
+    tgroup += nodes.thead('', header)
+    tbody = nodes.tbody()
+    tgroup += tbody
+    table += tgroup
+
+    for source in sources:
+        row = nodes.row()
+        row += nodes.entry('', make_item_ref(
+            app, env, fromdocname, env.traceability_all_items[source]))
+        targets = adjacency[source]
+        for column in columns:
+            if column in targets:
+                row += nodes.entry('', nodes.paragraph('', 'x'))
+            else:
+                row += nodes.entry()
+        tbody += row
+
+    return table
+
+
+def make_item_backlinks(app, fromdocname, node):
+    """
+    Creates the backlinks of an item: a paragraph per relationship with
+    the related items, according to the relationship index, that are not
+    declared by the item itself.
+
+    """
+    env = app.builder.env
+    item_info = env.traceability_all_items.get(node['item'])
+    if item_info is None:
+        return []
+
+    index = app.traceability_index
+    related = index.targets_by_relationship(
+        node['item'], sorted(item_options(env.config).relationships))
+    container = nodes.container(classes=['item-backlinks'])
+    for relationship, targets in sorted(related.items()):
+        # Targets declared by the item, patterns as they were expanded
+        declared = set()
+        for target in item_info.get(relationship, []):
+            declared.update(index.expansions.get(target, [target]))
+        targets = sorted(targets - declared)
+        if not targets:
+            continue
+        para = nodes.paragraph()
+        para += nodes.strong('', relationship + ': ')
+        for position, target in enumerate(targets):
+            if position:
+                para += nodes.Text(', ')
+            para += make_item_ref(app, env, fromdocname,
+                                  env.traceability_all_items[target],
+                                  inline=True)
+        container += para
+    return [container] if len(container) else []
+
+
+SEARCH_WIDGET = '''<div class="item-search">
+<input type="search" placeholder="Item identifier" aria-label="Search items">
+<ul class="item-search-results"></ul>
+</div>
+<script src="%s"></script>
+'''
+
+
+def item_columns(app):
+    """
+    Returns the columnar store of item attributes of the build, built on
+    first use and shared by all item pivots.
+
+    """
+    columns = getattr(app, 'traceability_columns', None)
+    if columns is None or columns.index is not app.traceability_index:
+        columns = app.traceability_columns = ItemColumns(
+            app.traceability_index)
+    return columns
+
+
+def make_item_pivot(app, node, index):
+    """
+    Creates the table of an item pivot: item (or link) counts for every
+    value of the ``rows`` attribute and, if set, of the ``columns``
+    attribute, with totals.
+
+    """
+    counts = item_columns(app).pivot(node['rows'], node['columns'],
+                                     node['filter'], node['links'])
+    rows = sorted(set(row for row, column in counts))
+    columns = sorted(set(column for row, column in counts)) \
+        if node['columns'] else []
+
+    def entry(text):
+        return nodes.entry('', nodes.paragraph('', str(text)))
+
+    table = nodes.table(classes=['item-pivot'])
+    if 'title' in node:
+        table += nodes.title('', node['title'])
+        table['ids'] = [f'item-pivot-{index}']
+    tgroup = nodes.tgroup(cols=len(columns) + 2)
+    tgroup += [nodes.colspec(colwidth=1) for column in range(len(columns) + 2)]
+    header = nodes.row()
+    header += entry(node['rows'])
+    for column in columns:
+        header += entry(column)
+    header += entry('Total')
+    tgroup += nodes.thead('', header)
+    tbody = nodes.tbody()
+    tgroup += tbody
+    table += tgroup
+
+    column_totals = dict.fromkeys(columns, 0)
+    for row_value in rows:
+        row = nodes.row()
+        row += entry(row_value)
+        if columns:
+            for column in columns:
+                count = counts.get((row_value, column), 0)
+                column_totals[column] += count
+                row += entry(count)
+            row += entry(sum(counts.get((row_value, column), 0)
+                             for column in columns))
+        else:
+            row += entry(counts[(row_value, None)])
+        tbody += row
+
+    row = nodes.row()
+    row += entry('Total')
+    for column in columns:
+        row += entry(column_totals[column])
+    row += entry(sum(counts.values()))
+    tbody += row
+
+    return table
+
+
+def item_pages(app, node, items):
+    """
+    Returns the ``items`` of an item list or matrix node split into
+    pages, or ``None`` if the node is not paginated: no page size is
+    set, all items fit in one page or the builder cannot write extra
+    pages.
+
+    """
+    if (node.get('page-size') is None or app.builder.format != 'html' or
+            isinstance(app.builder, SingleFileHTMLBuilder)):
+        return None
+    pages = split_pages(items, node['page-size'], node['page-by'])
+    return pages if len(pages) > 1 else None
+
+
+def paginate(app, fromdocname, kind, index, node, pages):
+    """
+    Registers the ``pages`` of an item list or matrix node, to be written
+    by ``collect_item_pages``. Returns the nodes that replace it: a list
+    of links to every page.
+
+    """
+    attributes = dict(node.attributes)
+    title = node.get('title') or ('Item matrix' if kind == 'item-matrix'
+                                  else 'Item list')
+
+    content = nodes.bullet_list()
+    for page, page_items in enumerate(pages, start=1):
+        pagename = page_name(fromdocname, kind, index, page)
+        app.traceability_pages.append({
+            'pagename': pagename,
+            'docname': fromdocname,
+            'kind': kind,
+            'index': index,
+            'node': attributes,
+            'items': page_items,
+            'page': page,
+            'pages': len(pages),
+            'title': '%s (%d/%d)' % (title, page, len(pages)),
+        })
+        if len(page_items) > 1:
+            text = '%s ... %s (%d items)' % (page_items[0], page_items[-1],
+                                             len(page_items))
+        else:
+            text = '%s (1 item)' % page_items[0]
+        bullet_list_item = nodes.list_item()
+        bullet_list_item += nodes.paragraph('', '', nodes.reference(
+            text, text, refuri=page_uri(app, fromdocname, pagename)))
+        content += bullet_list_item
+
+    if 'title' in node:
+        return [nodes.paragraph('', '', nodes.strong(title, title)), content]
+    return [content]
+
+
+def page_uri(app, fromname, toname):
+    """
+    Returns the relative URI between two pages (documents or not).
+
+    """
+    return relative_uri(app.builder.get_target_uri(fromname),
+                        app.builder.get_target_uri(toname))
+
+
+def export_item_matrix(app, fromdocname, node, index, sources):
+    """
+    Write an item matrix to the spreadsheet formats in ``node['export']``,
+    with one row per related source and target of the items in
+    ``sources``, as selected for the table (sources without targets get
+    a row too). In relationships layout, rows also have the relationship
+    of their source and target. Rows are computed and written one by one.
+
+    Returns a paragraph linking to the written files.
+
+    """
+    items = app.builder.env.traceability_all_items
+    suspects = app.builder.env.traceability_suspects
+    directory = os.path.join(app.builder.outdir, '_traceability')
+    ensuredir(directory)
+    basename = '%s-item-matrix-%d' % (fromdocname.replace('/', '-'), index)
+    title = node.get('title', 'Item matrix')
+
+    relationships = None
+    if node.get('layout') == 'relationships':
+        relationships = node['type'] or sorted(
+            item_options(app.config).relationships)
+
+    def links():
+        # ``(source, [(relationship, target), ...])`` tuples, with empty
+        # relationships unless in relationships layout
+        if relationships is None:
+            for source, targets in item_matrix_rows(app, node, sources):
+                yield source, [('', target) for target in targets]
+            return
+        is_target = item_matrix_target(app, node)
+        for source in sources:
+            related = app.traceability_index.targets_by_relationship(
+                source, relationships)
+            yield source, [(relationship, target)
+                           for relationship in relationships
+                           for target in sorted(related[relationship])
+                           if is_target(target)]
+
+    def rows():
+        if node.get('gaps'):
+            yield gap_title(node), 'Caption'
+            for item_id in sources:
+                yield item_id, items[item_id]['caption']
+            return
+        # Links found suspect get a column of their own, if checked
+        header = (node['source-title'], 'Caption')
+        if relationships is not None:
+            header += ('Relationship',)
+        header += (node['target-title'], 'Caption')
+        yield header if suspects is None else header + ('Suspect',)
+        for source, targets in links():
+            caption = items[source]['caption']
+            suspect = set()
+            if suspects is not None:
+                suspect = set().union(*suspects.get(source).values())
+            for relationship, target in targets or [('', '')]:
+                row = (source, caption)
+                if relationships is not None:
+                    row += (relationship,)
+                row += (target, items[target]['caption'] if target else '')
+                if suspects is not None:
+                    row += ('yes' if target in suspect else '',)
+                yield row
+
+    para = nodes.paragraph('', 'Download: ')
+    for number, export_format in enumerate(node['export']):
+        filename = '%s.%s' % (basename, export_format)
+        export_rows(os.path.join(directory, filename), export_format, rows(),
+                    title)
+        uri = relative_uri(app.builder.get_target_uri(fromdocname),
+                           '_traceability/' + filename)
+        if number:
+            para += nodes.Text(', ')
+        para += nodes.reference(export_format.upper(),
+                                export_format.upper(), refuri=uri)
+
+    return para
+
+
+def make_item_ref(app, env, fromdocname, item_info, with_caption=True,
+                  inline=False):
+    """
+    Creates a reference node for an item, embedded in a paragraph unless
+    ``inline`` is set. Reference text adds also a caption if it exists,
+    unless ``with_caption`` is false.
+
+    Builders whose writers render compact references get a single
+    ``item_reference`` node instead of the reference and its emphasis.
+
+    """
+    id = item_info['target']['refid']
+
+    if with_caption and item_info['caption'] != '':
+        caption = ', ' + item_info['caption']
+    else:
+        caption = ''
+
+    try:
+        refuri = app.builder.get_relative_uri(fromdocname,
+                                              item_info['docname'])
+        refuri += '#' + id
+    except NoUri:
+        # ignore if no URI can be determined, e.g. for LaTeX output :(
+        refuri = None
+
+    if app.builder.format in COMPACT_FORMATS:
+        newnode = item_reference(id + caption, id + caption,
+                                 refdocname=item_info['docname'])
+    else:
+        newnode = nodes.reference('', '')
+        newnode['refdocname'] = item_info['docname']
+        newnode.append(nodes.emphasis(id + caption, id + caption))
+    if refuri is not None:
+        newnode['refuri'] = refuri
+    if inline:
+        return newnode
+
+    para = nodes.paragraph()
+    para += newnode
+    return para
+
+
+def are_related(env, source, target, relationships):
+    """
+    Returns ``True`` if ``source`` and ``target`` items are related
+    according a list, ``relationships``, of relationship types.
+    ``False`` is returned otherwise
+
+    If the list of relationship types is empty, all available
+    relationship types are to be considered.
+
+    """
+    reverse = item_options(env.config).relationships
+    if not relationships:
+        relationships = list(reverse.keys())
+
+    for rel in relationships:
+        if (target in env.traceability_all_items[source][rel] or
+            source in
+                env.traceability_all_items[target][reverse[rel]]):
+            return True
+
+    return False
+
+
+# -----------------------------------------------------------------------------
+# Extension setup
+
+def setup(app):
+
+    # Create default dictionaries. Should be filled in conf.py
+    app.add_config_value('traceability_relationships', {}, 'env')
+    app.add_config_value('traceability_data', {}, '')
+
+    # Number of processes scanning files for ``item-harvest`` directives.
+    # None means as many as CPUs
+    app.add_config_value('traceability_harvest_jobs', None, '')
+
+    # Keep item contents in the environment, instead of references to their
+    # source lines
+    app.add_config_value('traceability_item_content_in_memory', False, 'env')
+
+    # Rules checked on all items. See ``rules`` module
+    app.add_config_value('traceability_rules', [], '')
+
+    # Relationships that must not form cycles (only one direction of each)
+    app.add_config_value('traceability_acyclic_relationships', [], '')
+
+    # Spreadsheet formats every item matrix is exported to
+    app.add_config_value('traceability_matrix_export', [], 'env')
+
+    # Maximum number of undefined items whose references are reported
+    # individually, once each (None to report every reference), and file
+    # (relative to the output directory) the JSON report of all of them is
+    # written to
+    app.add_config_value('traceability_unresolved_warnings', None, '')
+    app.add_config_value('traceability_unresolved_report', None, '')
+
+    # File (relative to the output directory) the snapshot of items queried
+    # by ``python -m sphinxcontrib.traceability`` is written to
+    app.add_config_value('traceability_snapshot', None, '')
+
+    # Files of relationships generated by other tools (CSV, JSON lines or
+    # YAML), relative to the source directory
+    app.add_config_value('traceability_link_files', [], '')
+
+    # JUnit XML reports of item tests (relative to the source directory),
+    # and regexp finding the identifiers of tested items in test names
+    app.add_config_value('traceability_test_results', [], '')
+    app.add_config_value('traceability_test_result_pattern', None, '')
+
+    # Write the item index searched by ``item-search`` boxes (HTML only), in
+    # shards by the first characters of item identifiers
+    app.add_config_value('traceability_search', False, '')
+    app.add_config_value('traceability_search_shard_length', 2, '')
+
+    # Relationships whose links become suspect when their target item
+    # changes, and file (relative to the source directory) the digests
+    # of items are kept in (by default, in the doctree directory)
+    app.add_config_value('traceability_suspect_relationships', [], '')
+    app.add_config_value('traceability_suspect_store', None, '')
+
+    # Render the links to every item from other items after it
+    app.add_config_value('traceability_backlinks', False, 'env')
+
+    # Customizable templates
+    app.add_config_value('traceability_item_template',
+                         DEFAULT_ITEM_TEMPLATE, 'env')
+
+    app.add_node(item_matrix)
+    app.add_node(item_list)
+    app.add_node(item)
+    app.add_node(item_pivot)
+    app.add_node(item_backlinks)
+    app.add_node(item_search)
+    app.add_node(item_reference,
+                 html=(html_visit_item_reference, depart_item_reference),
+                 latex=(latex_visit_item_reference, depart_item_reference),
+                 text=(text_visit_item_reference, depart_item_reference))
+
+    app.add_directive('item', ItemDirective)
+    app.add_directive('item-list', ItemListDirective)
+    app.add_directive('item-matrix', ItemMatrixDirective)
+    app.add_directive('item-pivot', ItemPivotDirective)
+    app.add_directive('item-backlinks', ItemBacklinksDirective)
+    app.add_directive('item-search', ItemSearchDirective)
+    app.add_directive('item-harvest', ItemHarvestDirective)
+    app.add_directive('item-tags', ItemTagsDirective)
+
+    app.connect('doctree-read', collect_item_references)
+    app.connect('doctree-resolved', process_item_nodes)
+    app.connect('html-collect-pages', collect_item_pages)
+    app.connect('env-purge-doc', purge_items)
+    app.connect('env-get-outdated', find_rescanned_documents)
+    app.connect('env-get-outdated', update_test_results)
+    app.connect('env-before-read-docs', reset_unresolved_references)
+    app.connect('build-finished', report_unresolved_references)
+    app.connect('build-finished', write_item_snapshot)
+    app.connect('build-finished', write_item_search_index)
+    app.connect('build-finished', write_suspect_links)
+    app.connect('builder-inited', initialize_environment)
+    app.connect('env-updated', build_relationship_index)
+    app.connect('env-updated', update_suspect_links)
+    app.connect('env-updated', check_items)
+    app.connect('env-updated', check_cycles)
+    app.connect('env-updated', check_rules)
+
+    app.add_role('item', XRefRole(nodeclass=pending_item_xref,
+                                  innernodeclass=nodes.emphasis,
+                                  warn_dangling=True))
+
+    # Items are collected in the environment of the reading process, so
+    # reading is serial. Writing can be parallel, but sub-pages are
+    # written one by one (see ``collect_item_pages``)
+    return {'parallel_read_safe': False, 'parallel_write_safe': True}
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""Item identifier filters
+
+Item lists, matrices and pivots select items with filters on their
+identifiers. Besides regular expressions (matched at the start of
+identifiers), filters can be written as:
+
+* ``prefix:TEXT``: identifiers starting with ``TEXT``
+* ``glob:PATTERN``: identifiers matching a shell-style ``PATTERN``
+* ``range:FIRST..LAST``: identifiers made of a common prefix and a
+  number between those of ``FIRST`` and ``LAST`` (like
+  ``range:SRS_0010..SRS_0100``)
+
+Regular expressions starting with any of these forms (which selected
+identifiers starting with ``prefix:``, ``glob:`` or ``range:`` before
+these forms were added) are read as these forms.
+
+Targets of relationships can be written as patterns too, either globs
+(``REQ-CAN-*``) or ranges (``REQ_0010..REQ_0100``), see
+``target_pattern``.
+
+All filters have a literal prefix every selected identifier starts with
+(the text before any special character, for regular expressions), so
+that they are answered from a sorted list of identifiers with a binary
+search, checking only identifiers with that prefix.
+
+"""
+
+import fnmatch
+import re
+from bisect import bisect_left
+from functools import lru_cache
+
+_SPECIAL = re.compile(r'[\\.^$*+?{}\[\]|()]')
+_GLOB_SPECIAL = re.compile(r'[*?\[]')
+_NUMBERED = re.compile(r'^(.*?)(\d+)$')
+
+
+def literal_prefix(pattern):
+    """
+    Return the literal text any identifier matching regexp ``pattern``
+    (with ``re.match``) starts with.
+
+    """
+    if '|' in pattern:
+        return ''
+    if pattern.startswith('^'):
+        pattern = pattern[1:]
+    special = _SPECIAL.search(pattern)
+    if special is None:
+        return pattern
+    prefix = pattern[:special.start()]
+    # A quantifier applies to the last literal character
+    if special.group() in '*?{' and prefix:
+        prefix = prefix[:-1]
+    return prefix
+
+
+class IdFilter(object):
+    """
+    Compiled identifier filter. ``ValueError`` is raised for invalid
+    expressions.
+
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+        kind, _, argument = expression.partition(':')
+        if kind == 'prefix':
+            self.prefix = argument
+            self.match = self._match_prefix
+        elif kind == 'glob':
+            special = _GLOB_SPECIAL.search(argument)
+            self.prefix = argument[:special.start()] if special else argument
+            self.regexp = re.compile(fnmatch.translate(argument))
+            self.match = self._match_regexp
+        elif kind == 'range':
+            first, separator, last = argument.partition('..')
+            first, last = _NUMBERED.match(first), _NUMBERED.match(last)
+            if not separator or not first or not last or \
+                    first.group(1) != last.group(1):
+                raise ValueError('invalid range %r: FIRST..LAST expected, '
+                                 'with the same prefix and trailing numbers'
+                                 % argument)
+            self.prefix = first.group(1)
+            self.low = int(first.group(2))
+            self.high = int(last.group(2))
+            self.match = self._match_range
+        else:
+            try:
+                self.regexp = re.compile(expression)
+            except re.error as exc:
+                raise ValueError('invalid regexp %r: %s' % (expression, exc))
+            self.prefix = literal_prefix(expression)
+            self.match = self._match_regexp
+
+    def _match_prefix(self, item_id):
+        return item_id.startswith(self.prefix)
+
+    def _match_regexp(self, item_id):
+        return self.regexp.match(item_id) is not None
+
+    def _match_range(self, item_id):
+        number = item_id[len(self.prefix):]
+        return (item_id.startswith(self.prefix) and number.isdigit() and
+                self.low <= int(number) <= self.high)
+
+    def positions(self, ids):
+        """
+        Yield the positions of the identifiers selected in ``ids``, a
+        sorted list.
+
+        """
+        position = bisect_left(ids, self.prefix)
+        while position < len(ids) and ids[position].startswith(self.prefix):
+            if self.match(ids[position]):
+                yield position
+            position += 1
+
+    def select(self, ids):
+        """
+        Return the identifiers selected in ``ids``, a sorted list.
+
+        """
+        return [ids[position] for position in self.positions(ids)]
+
+
+@lru_cache(maxsize=256)
+def id_filter(expression):
+    """
+    Return the compiled filter of ``expression``, reusing it if it was
+    already compiled.
+
+    """
+    return IdFilter(expression)
+
+
+def target_pattern(token):
+    """
+    Return the filter expression of a relationship target written as a
+    pattern: a glob (``REQ-CAN-*``) or a valid range (``REQ_0010..REQ_0100``).
+    ``None`` is returned for item identifiers.
+
+    """
+    if '..' in token:
+        expression = 'range:' + token
+    elif _GLOB_SPECIAL.search(token):
+        expression = 'glob:' + token
+    else:
+        return None
+    try:
+        id_filter(expression)
+    except ValueError:
+        return None
+    return expression
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""Static harvesting of item directives from source code
+
+Item directives written in Python docstrings are extracted by parsing
+the source files (``ast``), so modules are never imported. Parsing
+results are cached per file and stale files can be scanned in
+parallel by a process pool.
+
+"""
+
+import ast
+import fnmatch
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+# Below this number of stale files a process pool costs more than it saves
+PARALLEL_THRESHOLD = 32
+
+DIRECTIVE_RE = re.compile(r'^(?P<indent>\s*)\.\.\s+(?P<name>[\w\-]+)::'
+                          r'(?:\s+(?P<args>.*))?$')
+OPTION_RE = re.compile(r'^:(?P<name>[^:\s][^:]*):(?:\s+(?P<value>.*))?$')
+
+DOCSTRING_OWNERS = (ast.Module, ast.ClassDef, ast.FunctionDef,
+                    ast.AsyncFunctionDef)
+
+
+# -----------------------------------------------------------------------------
+# Directive parsing
+
+def _indentation(line):
+    return len(line) - len(line.lstrip())
+
+
+def _dedent(lines):
+    indent = min([_indentation(line) for line in lines if line.strip()] or
+                 [0])
+    return [line[indent:] for line in lines]
+
+
+def _strip_blank(lines):
+    while lines and not lines[0].strip():
+        lines = lines[1:]
+    while lines and not lines[-1].strip():
+        lines = lines[:-1]
+    return lines
+
+
+def parse_item_directives(lines, names, lineno=1):
+    """
+    Extract item directives named as any of ``names`` from a list of
+    reStructuredText ``lines``. ``lineno`` is the line number of the
+    first line in its source file.
+
+    A list of dictionaries is returned, one per directive, with keys
+    ``name``, ``id``, ``caption``, ``options`` (list of name/value
+    pairs), ``content`` (list of lines) and ``lineno``.
+
+    """
+    found = []
+    index = 0
+    while index < len(lines):
+        match = DIRECTIVE_RE.match(lines[index])
+        if not match or match.group('name') not in names:
+            index += 1
+            continue
+
+        # Directive block: following lines indented deeper than the
+        # directive itself (blank lines included)
+        indent = len(match.group('indent'))
+        end = index + 1
+        while end < len(lines) and (not lines[end].strip() or
+                                    _indentation(lines[end]) > indent):
+            end += 1
+        block = _dedent(lines[index + 1:end])
+
+        # Arguments and options end at the first blank line. Options start
+        # at the first field marker
+        arguments = [match.group('args') or '']
+        options = []
+        position = 0
+        while position < len(block) and block[position].strip():
+            line = block[position]
+            option = OPTION_RE.match(line)
+            if option:
+                options.append([option.group('name'),
+                                option.group('value') or ''])
+            elif options and _indentation(line) > 0:
+                options[-1][1] += '\n' + line.strip()
+            else:
+                arguments.append(line)
+            position += 1
+
+        words = ' '.join(arguments).split()
+        if words:
+            found.append({
+                'name': match.group('name'),
+                'id': words[0],
+                'caption': ' '.join(words[1:]),
+                'options': [tuple(option) for option in options],
+                'content': _strip_blank(_dedent(block[position:])),
+                'lineno': lineno + index,
+            })
+        index = end
+
+    return found
+
+
+def _docstring_lines(node):
+    """
+    Return the raw lines of a node docstring, keeping its line layout.
+
+    """
+    if not (node.body and isinstance(node.body[0], ast.Expr) and
+            isinstance(node.body[0].value, ast.Constant) and
+            isinstance(node.body[0].value.value, str)):
+        return None, None
+    expr = node.body[0]
+    lines = expr.value.value.expandtabs().split('\n')
+    # First line starts right after the opening quotes. Remaining lines
+    # keep their common indentation, which is removed here
+    return [lines[0].strip()] + _dedent(lines[1:]), expr.lineno
+
+
+def scan_python_source(data, names, filename='<unknown>'):
+    """
+    Extract item directives from the docstrings of Python source
+    ``data`` (bytes). Nothing is imported or executed.
+
+    """
+    tree = ast.parse(data, filename=filename)
+    found = []
+    for node in ast.walk(tree):
+        if isinstance(node, DOCSTRING_OWNERS):
+            lines, lineno = _docstring_lines(node)
+            if lines:
+                found.extend(parse_item_directives(lines, names, lineno))
+    return sorted(found, key=lambda directive: directive['lineno'])
+
+
+# -----------------------------------------------------------------------------
+# File scanning and caching
+
+def _scan_file(args):
+    """
+    Scan a single file. Runs in worker processes, so it only takes and
+    returns plain picklable data: ``(path, digest, items, error)``.
+    Items are ``None`` if file contents match ``known_digest``.
+
+    """
+    path, names, known_digest = args
+    try:
+        with open(path, 'rb') as source:
+            data = source.read()
+    except OSError as exc:
+        return path, None, [], str(exc)
+
+    digest = hashlib.sha1(data).hexdigest()
+    if digest == known_digest:
+        return path, digest, None, None
+
+    # Cheap test before parsing: most modules declare no item at all
+    if not any((name + '::').encode() in data for name in names):
+        return path, digest, [], None
+
+    try:
+        return path, digest, scan_python_source(data, names, path), None
+    except (SyntaxError, ValueError) as exc:
+        return path, digest, [], str(exc)
+
+
+def find_source_files(paths, pattern):
+    """
+    Expand files and directories (recursively) in ``paths`` to the
+    sorted list of files whose name matches ``pattern``.
+
+    """
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, filenames in os.walk(path):
+                dirs[:] = [d for d in dirs if not d.startswith('.')]
+                for filename in fnmatch.filter(filenames, pattern):
+                    files.add(os.path.join(root, filename))
+        else:
+            files.add(path)
+    return sorted(files)
+
+
+def harvest_items(files, names, cache, jobs=None, scanner=_scan_file):
+    """
+    Return a list of ``(path, items, error)`` tuples for ``files``.
+
+    ``cache`` is a dictionary, updated in place, mapping paths (and
+    directive names) to ``(mtime, size, digest, items)``. Files whose
+    modification time and size did not change are not read at all, and
+    files whose contents did not change are not parsed again. Remaining
+    files are scanned by a pool of ``jobs`` processes (CPU count by
+    default) when there are enough of them.
+
+    """
+    names = tuple(names)
+    results = {}
+    stale = []
+    for path in files:
+        try:
+            stat = os.stat(path)
+        except OSError as exc:
+            results[path] = ([], str(exc))
+            continue
+        cached = cache.get((path, names))
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            results[path] = (cached[3], None)
+        else:
+            stale.append((path, stat))
+
+    tasks = [(path, names, cache[(path, names)][2]
+              if (path, names) in cache else None)
+             for path, stat in stale]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(tasks) >= PARALLEL_THRESHOLD:
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            scanned = list(pool.map(scanner, tasks, chunksize=chunksize))
+    else:
+        scanned = [scanner(task) for task in tasks]
+
+    for (path, stat), (_, digest, items, error) in zip(stale, scanned):
+        if items is None:
+            items = cache[(path, names)][3]
+        if digest is not None and error is None:
+            cache[(path, names)] = (stat.st_mtime_ns, stat.st_size, digest,
+                                    items)
+        else:
+            cache.pop((path, names), None)
+        results[path] = (items, error)
+
+    return [(path,) + results[path] for path in files]
+
+
+# -----------------------------------------------------------------------------
+# reStructuredText generation
+
+def item_directive_lines(item):
+    """
+    Render a harvested item back to reStructuredText directive lines,
+    to be parsed by the regular item directives.
+
+    """
+    lines = ['.. %s:: %s %s' % (item['name'], item['id'], item['caption'])]
+    for name, value in item['options']:
+        value_lines = value.split('\n')
+        lines.append('   :%s: %s' % (name, value_lines[0]))
+        lines.extend('      ' + line for line in value_lines[1:])
+    if item['content']:
+        lines.append('')
+        lines.extend(('   ' + line).rstrip() for line in item['content'])
+    lines.append('')
+    return lines
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""Build-wide relationship index
+
+Relationships are stored in items only in the direction they were
+declared. The index holds them in both directions, so that all the
+items related to a given one are found without walking every other
+item.
+
+Targets may be written as patterns (see ``filters.target_pattern``):
+relationships to patterns are kept by pattern, and expanded once per
+pattern against the sorted identifiers of all items, whatever the
+number of items related to it.
+
+"""
+
+from .filters import id_filter, target_pattern
+
+
+class RelationshipIndex(object):
+    """
+    Index of relationships between items, built in one pass over all
+    items. Every relationship from ``source`` to ``target`` is also
+    indexed as its reverse relationship from ``target`` to ``source``.
+
+    ``relationships`` maps every relationship to its reverse one, as
+    ``item_options(config).relationships`` does.
+
+    Relationships are counted, as they may be declared in both
+    directions, so that items can be removed and added again when their
+    documents change, without building the whole index again.
+
+    Relationships to target patterns are counted by pattern, source and
+    relationship in ``pattern_links``, along with the items each pattern
+    matched when last expanded, in ``expansions``.
+
+    """
+
+    def __init__(self, items, relationships):
+        self.items = items
+        self.relationships = relationships
+        self.links = {}
+        self.pattern_links = {}
+        self.expansions = {}
+        for item_info in items.values():
+            self.add_item(item_info)
+        if self.pattern_links:
+            self.expand_patterns(sorted(items))
+
+    def _link(self, source, relationship, target, count):
+        targets = self.links.setdefault(source, {}).setdefault(
+            relationship, {})
+        count += targets.get(target, 0)
+        if count > 0:
+            targets[target] = count
+        else:
+            targets.pop(target, None)
+
+    def add(self, source, relationship, target, count=1):
+        """
+        Index a relationship, along with its reverse relationship. A
+        negative ``count`` removes it.
+
+        """
+        self._link(source, relationship, target, count)
+        self._link(target, self.relationships[relationship], source, count)
+
+    def add_item(self, item_info, count=1):
+        """
+        Index all relationships declared by an item.
+
+        """
+        for relationship in self.relationships:
+            for target in item_info.get(relationship, ()):
+                if target_pattern(target) is None:
+                    self.add(item_info['id'], relationship, target, count)
+                else:
+                    self.add_pattern(item_info['id'], relationship, target,
+                                     count)
+
+    def add_pattern(self, source, relationship, pattern, count=1):
+        """
+        Index a relationship to the items matching a target ``pattern``,
+        as last expanded (new patterns are expanded by the next call to
+        ``expand_patterns``). A negative ``count`` removes it.
+
+        """
+        for target in self.expansions.get(pattern, ()):
+            self.add(source, relationship, target, count)
+        sources = self.pattern_links.setdefault(pattern, {})
+        count += sources.get((source, relationship), 0)
+        if count > 0:
+            sources[(source, relationship)] = count
+        else:
+            sources.pop((source, relationship), None)
+            if not sources:
+                del self.pattern_links[pattern]
+                self.expansions.pop(pattern, None)
+
+    def expand_patterns(self, ids):
+        """
+        Expand every target pattern against ``ids``, the sorted list of
+        all item identifiers, and update the relationships to the items
+        whose matching changed since the last expansion.
+
+        """
+        for pattern, sources in self.pattern_links.items():
+            matched = id_filter(target_pattern(pattern)).select(ids)
+            expanded = self.expansions.get(pattern)
+            if matched == expanded:
+                continue
+            expanded = expanded or []
+            added = set(matched).difference(expanded)
+            removed = set(expanded).difference(matched)
+            for (source, relationship), count in sources.items():
+                for target in added:
+                    self.add(source, relationship, target, count)
+                for target in removed:
+                    self.add(source, relationship, target, -count)
+            self.expansions[pattern] = matched
+
+    def remove_item(self, item_info):
+        """
+        Remove all relationships declared by an item from the index.
+
+        """
+        self.add_item(item_info, -1)
+
+    def targets(self, source, relationships=None):
+        """
+        Return the set of existing items related to ``source`` according
+        to any of ``relationships`` (all of them if not given).
+
+        """
+        links = self.links.get(source, {})
+        if relationships:
+            found = set()
+            for relationship in relationships:
+                found.update(links.get(relationship, ()))
+        else:
+            found = set().union(*links.values())
+        return {target for target in found if target in self.items}
+
+    def targets_by_relationship(self, source, relationships):
+        """
+        Return a dictionary with the set of existing items related to
+        ``source`` according to each of ``relationships``.
+
+        """
+        links = self.links.get(source, {})
+        return dict((relationship,
+                     {target for target in links.get(relationship, ())
+                      if target in self.items})
+                    for relationship in relationships)
+
+    def are_related(self, source, target, relationships=None):
+        """
+        Return ``True`` if ``source`` and ``target`` are related according
+        to any of ``relationships`` (all of them if not given).
+
+        """
+        links = self.links.get(source, {})
+        for relationship in relationships or links:
+            if target in links.get(relationship, ()):
+                return True
+        return False
+
+
+def strongly_connected_components(nodes, successors):
+    """
+    Return the strongly connected components of a directed graph, as
+    lists of nodes, using an iterative version of Tarjan's algorithm
+    (linear in nodes plus edges).
+
+    ``successors`` is a function returning the nodes a node points to.
+
+    """
+    order = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    for root in nodes:
+        if root in order:
+            continue
+        order[root] = lowlink[root] = len(order)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors(root)))]
+        while work:
+            node, pending = work[-1]
+            for successor in pending:
+                if successor not in order:
+                    order[successor] = lowlink[successor] = len(order)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(successors(successor))))
+                    break
+                elif successor in on_stack:
+                    lowlink[node] = min(lowlink[node], order[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == order[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+    return components
+
+
+def find_cycles(index, relationships):
+    """
+    Return the relationship cycles among indexed items, following the
+    given ``relationships`` from source to target. Each cycle is a
+    sorted list of item identifiers: a strongly connected component with
+    more than one item, or an item related to itself.
+
+    """
+    def successors(item_id):
+        return index.targets(item_id, relationships)
+
+    cycles = []
+    for component in strongly_connected_components(sorted(index.items),
+                                                   successors):
+        if len(component) > 1 or component[0] in successors(component[0]):
+            cycles.append(sorted(component))
+    return sorted(cycles)
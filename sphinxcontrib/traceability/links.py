@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""Relationships read from link files
+
+Relationships generated by other tools (like the tests validating each
+requirement) can be kept out of the documents, in the link files listed
+in ``traceability_link_files``. Every record of a link file declares one
+or more relationships, with ``source``, ``relationship`` and ``target``
+fields (several targets may be separated by whitespace). The format is
+given by the file extension:
+
+* ``.csv``: a header row naming the fields (other columns are ignored)
+* ``.jsonl``: one JSON object per line
+* ``.yaml`` or ``.yml``: a list of mappings (requires PyYAML)
+
+CSV and JSON lines files are read record by record, never as a whole.
+Records read are cached per file, by modification time and size first,
+then by contents hash, so unchanged files are neither read nor parsed
+again.
+
+"""
+
+import csv
+import hashlib
+import json
+import os
+
+LINK_FIELDS = ('source', 'relationship', 'target')
+
+# Size of the blocks files are hashed by
+BLOCK_SIZE = 1 << 16
+
+
+class LinkFileError(Exception):
+    pass
+
+
+def _csv_rows(stream):
+    reader = csv.DictReader(stream)
+    missing = [field for field in LINK_FIELDS
+               if field not in (reader.fieldnames or ())]
+    if missing:
+        raise LinkFileError('missing columns: %s' % ', '.join(missing))
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _jsonl_rows(stream):
+    for lineno, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield lineno, json.loads(line)
+        except ValueError as exc:
+            raise LinkFileError('line %d: %s' % (lineno, exc))
+
+
+def _yaml_rows(stream):
+    try:
+        import yaml
+    except ImportError:
+        raise LinkFileError('PyYAML is required to read YAML link files')
+    loader = yaml.SafeLoader(stream)
+    try:
+        node = loader.get_single_node()
+        if node is None:
+            return
+        if not isinstance(node, yaml.SequenceNode):
+            raise LinkFileError('a list of records expected')
+        for record in node.value:
+            yield (record.start_mark.line + 1,
+                   loader.construct_object(record, deep=True))
+    except yaml.YAMLError as exc:
+        raise LinkFileError(str(exc))
+    finally:
+        loader.dispose()
+
+
+LINK_FORMATS = {
+    '.csv': _csv_rows,
+    '.jsonl': _jsonl_rows,
+    '.yaml': _yaml_rows,
+    '.yml': _yaml_rows,
+}
+
+
+def read_link_file(path):
+    """
+    Return the relationships declared in a link file, as a list of
+    ``(source, relationship, target, lineno)`` tuples.
+
+    ``LinkFileError`` is raised for unknown formats and invalid records,
+    ``OSError`` if the file cannot be read.
+
+    """
+    rows = LINK_FORMATS.get(os.path.splitext(path)[1].lower())
+    if rows is None:
+        raise LinkFileError('unknown format, expected one of: %s' %
+                            ', '.join(sorted(LINK_FORMATS)))
+
+    records = []
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        for lineno, row in rows(stream):
+            if not isinstance(row, dict) or \
+                    not all(row.get(field) for field in LINK_FIELDS):
+                raise LinkFileError('line %d: %s expected' % (
+                    lineno, ', '.join(LINK_FIELDS)))
+            targets = row['target']
+            if isinstance(targets, str):
+                targets = targets.split()
+            for target in targets:
+                records.append((str(row['source']).strip(),
+                                str(row['relationship']).strip(),
+                                str(target), lineno))
+    return records
+
+
+def file_digest(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as stream:
+        for block in iter(lambda: stream.read(BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_link_files(paths, cache):
+    """
+    Return a list of ``(path, digest, records, error)`` tuples for link
+    files in ``paths``. ``digest`` is ``None`` for files that could not
+    be read, along with the ``error`` message.
+
+    ``cache`` is a dictionary, updated in place, mapping paths to
+    ``(mtime, size, digest, records)``. Files whose modification time
+    and size did not change are not read at all, and files whose
+    contents did not change are not parsed again.
+
+    """
+    results = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            cached = cache.get(path)
+            if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                digest, records = cached[2:]
+            else:
+                digest = file_digest(path)
+                if cached and cached[2] == digest:
+                    records = cached[3]
+                else:
+                    records = read_link_file(path)
+                cache[path] = (stat.st_mtime_ns, stat.st_size, digest,
+                               records)
+        except (OSError, LinkFileError) as exc:
+            cache.pop(path, None)
+            results.append((path, None, [], str(exc)))
+        else:
+            results.append((path, digest, records, None))
+    return results
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Pagination of item lists and matrices
+
+Oversized ``item-list`` and ``item-matrix`` outputs are split into
+sub-pages, either by count or by identifier prefix, computed from the
+already filtered item identifiers.
+
+"""
+
+import re
+
+PAGE_BY = ('count', 'prefix')
+
+_TRAILING_NUMBER = re.compile(r'\d+$')
+
+
+def id_prefix(item_id):
+    """
+    Return the prefix of an item identifier: everything but its
+    trailing number (``SRS_`` for ``SRS_0001``).
+
+    """
+    return _TRAILING_NUMBER.sub('', item_id)
+
+
+def split_pages(item_ids, page_size, page_by='count'):
+    """
+    Split a sorted list of item identifiers into pages of at most
+    ``page_size`` identifiers. When paginating by ``prefix``, each page
+    holds identifiers with the same prefix only.
+
+    """
+    if page_by == 'prefix':
+        groups = []
+        for item_id in item_ids:
+            prefix = id_prefix(item_id)
+            if not groups or id_prefix(groups[-1][-1]) != prefix:
+                groups.append([])
+            groups[-1].append(item_id)
+    else:
+        groups = [item_ids]
+
+    pages = []
+    for group in groups:
+        for start in range(0, len(group), page_size):
+            pages.append(group[start:start + page_size])
+    return pages
+
+
+def page_name(docname, kind, index, page):
+    """
+    Return the name of a sub-page of the ``index``-th ``kind`` node
+    (``item-list`` or ``item-matrix``) of a document.
+
+    """
+    return '%s-%s-%d-page-%d' % (docname, kind, index, page)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""Aggregation of item counts by attribute
+
+Item attributes are stored by column: one list of values per attribute,
+in the order of the sorted item identifiers. Columns (and the items
+selected by each filter) are built on first use and shared by all the
+pivot tables of a build, so that many pivots cost at most one scan of
+the items per attribute.
+
+"""
+
+from .filters import id_filter
+
+# Attributes every item has, besides data attributes
+ITEM_ATTRIBUTES = ('type', 'docname')
+
+# Value of attributes an item does not have, and of flag attributes it
+# has
+NO_VALUE = '(none)'
+FLAG_VALUE = 'yes'
+
+
+def _value(item_info, name):
+    value = item_info.get(name, '')
+    if value is None:
+        return FLAG_VALUE
+    if value == '' or value == []:
+        return NO_VALUE
+    if isinstance(value, (list, tuple)):
+        return ' '.join(value)
+    return str(value)
+
+
+class ItemColumns(object):
+    """
+    Columnar store of item attributes, and of the number of related items
+    per relationship, taken from a relationship index.
+
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.ids = sorted(index.items)
+        self.columns = {}
+        self.links = {}
+        self.selections = {}
+        self.matches = {}
+
+    def column(self, name):
+        """
+        Return the values of attribute ``name`` of all items.
+
+        """
+        if name not in self.columns:
+            items = self.index.items
+            self.columns[name] = [_value(items[item_id], name)
+                                  for item_id in self.ids]
+        return self.columns[name]
+
+    def link_counts(self, relationship):
+        """
+        Return the number of existing items related to every item by
+        ``relationship``.
+
+        """
+        if relationship not in self.links:
+            self.links[relationship] = [
+                len(self.index.targets(item_id, [relationship]))
+                for item_id in self.ids]
+        return self.links[relationship]
+
+    def select(self, filter):
+        """
+        Return the positions of the items whose identifier matches
+        ``filter`` (see ``filters`` module).
+
+        """
+        if filter not in self.selections:
+            self.selections[filter] = list(
+                id_filter(filter).positions(self.ids))
+        return self.selections[filter]
+
+    def having(self, name, values):
+        """
+        Return the set of identifiers of the items whose attribute ``name``
+        has any of ``values``.
+
+        """
+        key = (name, tuple(values))
+        if key not in self.matches:
+            values = set(values)
+            self.matches[key] = set(
+                item_id for item_id, value in zip(self.ids, self.column(name))
+                if value in values)
+        return self.matches[key]
+
+    def pivot(self, rows, columns=None, filter='', relationships=()):
+        """
+        Aggregate the items matching ``filter`` by the values of attribute
+        ``rows`` and, if given, of attribute ``columns``. Items are counted,
+        or their links by any of ``relationships`` if given.
+
+        Returns a dictionary of counts by ``(row value, column value)``
+        (``None`` as column value if there are no columns).
+
+        """
+        row_values = self.column(rows)
+        column_values = self.column(columns) if columns else None
+        counts = [self.link_counts(relationship)
+                  for relationship in relationships]
+
+        table = {}
+        for position in self.select(filter):
+            key = (row_values[position],
+                   column_values[position] if column_values else None)
+            if counts:
+                value = sum(count[position] for count in counts)
+            else:
+                value = 1
+            table[key] = table.get(key, 0) + value
+        return table
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Compact item references
+
+Item lists and matrices may hold many thousands of item references.
+Instead of a reference holding an emphasis node holding a text node for
+every one of them, builders whose writers are known (HTML, LaTeX and
+text) get a single ``item_reference`` node per reference (in a paragraph
+of its own, as before, so that lists are still written as compact
+lists), written straight to the output by the visitors below with the
+same markup the standard nodes are written with.
+
+"""
+
+from docutils import nodes
+
+# Formats of the builders with writers of compact references
+COMPACT_FORMATS = ('html', 'latex', 'text')
+
+
+class item_reference(nodes.Inline, nodes.TextElement):
+    """
+    Reference to an item, written as an emphasized link. ``refuri`` is
+    not set if the item cannot be linked.
+
+    """
+    pass
+
+
+def html_visit_item_reference(self, node):
+    # As a reference with ``refuri`` is written by Sphinx HTML writers
+    text = '<em>%s</em>' % self.encode(node.astext())
+    if 'refuri' in node:
+        self.body.append('<a class="reference external" href="%s">%s</a>' %
+                         (self.attval(node['refuri']), text))
+    else:
+        self.body.append('<a class="reference internal">%s</a>' % text)
+    raise nodes.SkipNode
+
+
+def latex_visit_item_reference(self, node):
+    text = r'\sphinxstyleemphasis{%s}' % self.encode(node.astext())
+    uri = node.get('refuri', '')
+    if uri.startswith('%'):
+        # Reference to a label inside a document, as LaTeX writer does
+        text = '%s\\sphinxcrossref{%s}}}' % (
+            self.hyperlink(uri[1:].replace('#', ':')), text)
+    self.body.append(text)
+    raise nodes.SkipNode
+
+
+def text_visit_item_reference(self, node):
+    self.add_text('*%s*' % node.astext())
+    raise nodes.SkipNode
+
+
+def depart_item_reference(self, node):
+    pass
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""Test results read from JUnit XML reports
+
+Test cases of the JUnit XML reports listed in ``traceability_test_results``
+(as written by most test runners) are mapped to item identifiers: the
+name of every test case is the identifier of the item it tests, unless
+``traceability_test_result_pattern`` is set, a regular expression whose
+matches (or ``id`` groups) in ``classname.name`` of test cases are the
+identifiers of the items tested.
+
+The result of the tests of an item is ``failed`` if any of them failed
+(or had an error), else ``passed`` if any of them passed, else
+``skipped``.
+
+Reports are parsed incrementally and every test case (and test suite) is
+dropped as soon as it is read, so memory does not grow with the size of
+reports. Results are cached per report, by modification time and size
+first, then by contents hash, so unchanged reports are neither read nor
+parsed again.
+
+"""
+
+import os
+from xml.etree import ElementTree
+
+from .links import file_digest
+
+# Data attribute of items holding their test result
+RESULT_ATTRIBUTE = 'result'
+
+PASSED = 'passed'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+# Result of an item with several test cases: the one ranked higher
+_RANK = {SKIPPED: 0, PASSED: 1, FAILED: 2}
+
+
+def testcase_result(element):
+    """
+    Return the result of a ``testcase`` element.
+
+    """
+    for child in element:
+        if child.tag in ('failure', 'error'):
+            return FAILED
+        if child.tag == 'skipped':
+            return SKIPPED
+    return PASSED
+
+
+def testcase_ids(element, pattern=None):
+    """
+    Return the identifiers of the items tested by a ``testcase`` element,
+    found by compiled regular expression ``pattern`` if given.
+
+    """
+    name = element.get('name', '')
+    if pattern is None:
+        return [name] if name else []
+    classname = element.get('classname')
+    text = '%s.%s' % (classname, name) if classname else name
+    group = 'id' if 'id' in pattern.groupindex else 0
+    return [match.group(group) for match in pattern.finditer(text)]
+
+
+def merge_result(results, item_id, result):
+    """
+    Record ``result`` of a test of ``item_id`` in ``results``, unless a
+    result ranked higher is already recorded.
+
+    """
+    if _RANK[result] > _RANK.get(results.get(item_id), -1):
+        results[item_id] = result
+
+
+def read_junit_report(path, pattern=None):
+    """
+    Return the results of the items tested in a JUnit XML report, as a
+    dictionary. ``ElementTree.ParseError`` is raised for invalid reports.
+
+    """
+    results = {}
+    parents = []
+    for event, element in ElementTree.iterparse(path, ('start', 'end')):
+        if event == 'start':
+            parents.append(element)
+            continue
+        parents.pop()
+        if element.tag == 'testcase':
+            result = testcase_result(element)
+            for item_id in testcase_ids(element, pattern):
+                merge_result(results, item_id, result)
+        if element.tag in ('testcase', 'testsuite'):
+            element.clear()
+            if parents:
+                parents[-1].remove(element)
+    return results
+
+
+def load_test_results(paths, cache, pattern=None):
+    """
+    Return a list of ``(path, digest, results, error)`` tuples for JUnit
+    XML reports in ``paths``. ``digest`` is ``None`` for reports that
+    could not be read, along with the ``error`` message.
+
+    ``cache`` is a dictionary, updated in place, mapping paths (and
+    patterns) to ``(mtime, size, digest, results)``. Reports whose
+    modification time and size did not change are not read at all, and
+    reports whose contents did not change are not parsed again.
+
+    """
+    outcomes = []
+    for path in paths:
+        key = (path, pattern.pattern if pattern is not None else None)
+        try:
+            stat = os.stat(path)
+            cached = cache.get(key)
+            if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                digest, results = cached[2:]
+            else:
+                digest = file_digest(path)
+                if cached and cached[2] == digest:
+                    results = cached[3]
+                else:
+                    results = read_junit_report(path, pattern)
+                cache[key] = (stat.st_mtime_ns, stat.st_size, digest,
+                              results)
+        except (OSError, ElementTree.ParseError) as exc:
+            cache.pop(key, None)
+            outcomes.append((path, None, {}, str(exc)))
+        else:
+            outcomes.append((path, digest, results, None))
+    return outcomes
@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""Trace snapshots of git revisions
+
+Items of past revisions are extracted statically from the documentation
+sources stored in git, without checking revisions out nor building them:
+item directives are parsed from reStructuredText sources (and from the
+docstrings of Python sources), as ``item-harvest`` does. Extraction
+results are kept in a local cache addressed by git blob hash, so files
+are only parsed the first time their contents are seen: snapshots of
+many revisions cost about the size of the changes between them.
+
+Relationships and data names are read from ``conf.py`` of each revision
+without executing it (literal ``traceability_relationships`` and keys of
+``traceability_data``). Items generated by other means (templates,
+``item-harvest`` paths, other extensions) are not seen.
+
+Usage::
+
+  python -m sphinxcontrib.traceability.revisions [options] snapshot REV ...
+  python -m sphinxcontrib.traceability.revisions [options] diff REV1 REV2
+
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import posixpath
+import re
+import subprocess
+import sys
+
+from . import harvest
+from .index import RelationshipIndex
+from .snapshot import item_record, write_snapshot
+
+# Version of extraction results, part of cache keys
+CACHE_VERSION = 1
+
+SOURCE_SUFFIXES = ('.rst', '.py')
+
+
+class GitError(Exception):
+    pass
+
+
+def git(repository, *args, **kwargs):
+    """
+    Run a git command in ``repository`` and return its output (bytes).
+
+    """
+    try:
+        return subprocess.run(('git', '-C', repository) + args, check=True,
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                              **kwargs).stdout
+    except (OSError, subprocess.CalledProcessError) as exc:
+        message = getattr(exc, 'stderr', None) or str(exc)
+        if isinstance(message, bytes):
+            message = message.decode('utf-8', 'replace')
+        raise GitError('git %s: %s' % (' '.join(args), message.strip()))
+
+
+def list_blobs(repository, revision, srcdir):
+    """
+    Return ``(path, blob)`` tuples of the source files of ``srcdir`` at
+    ``revision`` (paths relative to ``srcdir``).
+
+    """
+    srcdir = srcdir.strip('/')
+    output = git(repository, 'ls-tree', '-r', '-z', '--full-tree',
+                 revision, '--', srcdir or '.')
+    blobs = []
+    for entry in output.split(b'\0'):
+        if not entry:
+            continue
+        info, path = entry.decode('utf-8').split('\t', 1)
+        mode, kind, blob = info.split()
+        if kind == 'blob':
+            if srcdir:
+                path = posixpath.relpath(path, srcdir)
+            blobs.append((path, blob))
+    return sorted(blobs)
+
+
+def read_blobs(repository, blobs):
+    """
+    Yield ``(blob, data)`` for every blob hash in ``blobs``, read by a
+    single git process.
+
+    """
+    if not blobs:
+        return
+    process = subprocess.Popen(('git', '-C', repository, 'cat-file',
+                                '--batch'), stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE)
+    try:
+        for blob in blobs:
+            process.stdin.write(blob.encode('ascii') + b'\n')
+            process.stdin.flush()
+            header = process.stdout.readline().split()
+            if len(header) != 3:
+                raise GitError('cannot read blob %s' % blob)
+            data = process.stdout.read(int(header[2]))
+            process.stdout.read(1)
+            yield blob, data
+    finally:
+        process.stdin.close()
+        process.wait()
+
+
+def read_configuration(data):
+    """
+    Return relationships (both directions) and data names declared in
+    the ``conf.py`` source ``data``, without executing it.
+
+    """
+    relationships = {}
+    data_names = []
+    try:
+        tree = ast.parse(data)
+    except SyntaxError:
+        return relationships, data_names
+    for node in tree.body:
+        if not (isinstance(node, ast.Assign) and len(node.targets) == 1 and
+                isinstance(node.targets[0], ast.Name)):
+            continue
+        name = node.targets[0].id
+        if name == 'traceability_relationships':
+            try:
+                declared = ast.literal_eval(node.value)
+            except ValueError:
+                continue
+            # Invalid values are reported, and defaults (no relationships)
+            # are used, as Sphinx does for settings of another type
+            if not isinstance(declared, dict) or not all(
+                    isinstance(name, str) for name in
+                    list(declared) + list(declared.values())):
+                sys.stderr.write('warning: traceability_relationships is '
+                                 'not a dictionary of relationship names, '
+                                 'ignored\n')
+                continue
+            for rel, reverse in declared.items():
+                relationships[rel] = reverse
+                relationships[reverse] = rel
+        elif name == 'traceability_data' and isinstance(node.value,
+                                                        ast.Dict):
+            data_names = [key.value for key in node.value.keys
+                          if isinstance(key, ast.Constant)]
+    return relationships, data_names
+
+
+class ExtractionCache(object):
+    """
+    Content-addressed cache of item directives extracted from files, by
+    blob hash.
+
+    """
+
+    def __init__(self, directory, names):
+        key = hashlib.sha1(json.dumps(
+            [CACHE_VERSION, sorted(names)]).encode('utf-8')).hexdigest()
+        self.directory = os.path.join(directory, key[:12])
+        self.names = names
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, blob, kind):
+        return os.path.join(self.directory, blob[:2],
+                            '%s%s.json' % (blob[2:], kind))
+
+    def get(self, blob, kind):
+        try:
+            with open(self.path(blob, kind), encoding='utf-8') as cached:
+                return json.load(cached)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, blob, kind, items):
+        path = self.path(blob, kind)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = '%s.%d.tmp' % (path, os.getpid())
+        with open(temporary, 'w', encoding='utf-8') as cached:
+            json.dump(items, cached)
+        os.replace(temporary, path)
+
+    def extract(self, repository, files):
+        """
+        Return the items of every ``(path, blob)`` in ``files``, as a
+        dictionary by blob hash, parsing only blobs not in the cache.
+
+        """
+        results = {}
+        missing = {}
+        for path, blob in files:
+            kind = os.path.splitext(path)[1]
+            if blob in results:
+                continue
+            items = self.get(blob, kind)
+            if items is None:
+                missing[blob] = kind
+            else:
+                self.hits += 1
+                results[blob] = items
+        for blob, data in read_blobs(repository, sorted(missing)):
+            self.misses += 1
+            items = extract_items(data, missing[blob], self.names)
+            self.put(blob, missing[blob], items)
+            results[blob] = items
+        return results
+
+
+def extract_items(data, kind, names):
+    """
+    Extract item directives from the contents of a source file.
+
+    """
+    try:
+        if kind == '.py':
+            return harvest.scan_python_source(data, names)
+        return harvest.parse_item_directives(
+            data.decode('utf-8-sig').splitlines(), names)
+    except (SyntaxError, ValueError):
+        return []
+
+
+def revision_items(repository, revision, srcdir, cache):
+    """
+    Return the items of ``revision``, as the extension stores them
+    (without contents), and its relationships and data names.
+
+    """
+    blobs = list_blobs(repository, revision, srcdir)
+    relationships, data_names = {}, []
+    for path, blob in blobs:
+        if path == 'conf.py':
+            data = dict(read_blobs(repository, [blob]))[blob]
+            relationships, data_names = read_configuration(data)
+
+    files = [(path, blob) for path, blob in blobs
+             if path.endswith(SOURCE_SUFFIXES) and path != 'conf.py']
+    extracted = cache.extract(repository, files)
+
+    items = {}
+    for path, blob in files:
+        docname = os.path.splitext(path)[0]
+        for directive in extracted[blob]:
+            if directive['id'] in items:
+                continue
+            options = dict(directive['options'])
+            item_info = {
+                'id': directive['id'],
+                'type': directive['name'],
+                'docname': docname,
+                'source': posixpath.join(srcdir, path) if srcdir else path,
+                'lineno': directive['lineno'],
+                'caption': directive['caption'],
+            }
+            for rel in relationships:
+                item_info[rel] = options.get(rel, '').split()
+            for name in data_names:
+                if name in options:
+                    item_info[name] = options[name]
+            items[directive['id']] = item_info
+    return items, relationships, data_names
+
+
+def write_revision_snapshot(path, items, relationships, data_names):
+    index = RelationshipIndex(items, relationships)
+    write_snapshot(path, ((item_id, item_record(
+        item_info, index.links.get(item_id, {}), data_names))
+        for item_id, item_info in items.items()), relationships, data_names)
+
+
+def compare_items(old, new, relationships):
+    """
+    Yield ``(change, item_id, details)`` tuples for items added (``+``),
+    removed (``-``) or changed (``~``) from ``old`` to ``new``.
+
+    """
+    for item_id in sorted(set(old) | set(new)):
+        if item_id not in new:
+            yield '-', item_id, ''
+        elif item_id not in old:
+            yield '+', item_id, ''
+        else:
+            changes = []
+            for key in sorted(set(old[item_id]) | set(new[item_id])):
+                if key in ('source', 'lineno', 'docname'):
+                    continue
+                before = old[item_id].get(key)
+                after = new[item_id].get(key)
+                if key in relationships:
+                    added = sorted(set(after or []) - set(before or []))
+                    removed = sorted(set(before or []) - set(after or []))
+                    changes.extend('%s +%s' % (key, target)
+                                   for target in added)
+                    changes.extend('%s -%s' % (key, target)
+                                   for target in removed)
+                elif before != after:
+                    changes.append('%s: %r -> %r' % (key, before, after))
+            if changes:
+                yield '~', item_id, '; '.join(changes)
+
+
+def main(argv=None, output=sys.stdout):
+    parser = argparse.ArgumentParser(
+        prog='python -m sphinxcontrib.traceability.revisions',
+        description='Snapshot and compare the items of git revisions.')
+    parser.add_argument('-C', dest='repository', default='.',
+                        help='git repository (default: current directory)')
+    parser.add_argument('-s', '--srcdir', default='',
+                        help='documentation source directory, relative to '
+                             'the repository root (default: root)')
+    parser.add_argument('--cache', default=os.path.join(
+                            '.traceability-cache', 'revisions'),
+                        help='extraction cache directory')
+    parser.add_argument('--directives', nargs='+', default=['item'],
+                        metavar='name', help='item directive names')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    command = commands.add_parser('snapshot',
+                                  help='write snapshots of revisions')
+    command.add_argument('revisions', nargs='+', metavar='revision')
+    command.add_argument('-o', dest='outdir', default='.',
+                         help='directory snapshots are written to')
+
+    command = commands.add_parser('diff',
+                                  help='compare the items of two revisions')
+    command.add_argument('revisions', nargs=2, metavar='revision')
+
+    args = parser.parse_args(argv)
+    cache = ExtractionCache(args.cache, args.directives)
+    try:
+        if args.command == 'snapshot':
+            os.makedirs(args.outdir, exist_ok=True)
+            for revision in args.revisions:
+                items, relationships, data_names = revision_items(
+                    args.repository, revision, args.srcdir, cache)
+                path = os.path.join(args.outdir, '%s.snapshot' %
+                                    re.sub(r'[^\w.\-]', '_', revision))
+                write_revision_snapshot(path, items, relationships,
+                                        data_names)
+                output.write('%s: %d items -> %s\n' % (revision, len(items),
+                                                       path))
+        else:
+            old, relationships, _ = revision_items(
+                args.repository, args.revisions[0], args.srcdir, cache)
+            new, new_relationships, _ = revision_items(
+                args.repository, args.revisions[1], args.srcdir, cache)
+            relationships = dict(relationships, **new_relationships)
+            for change, item_id, details in compare_items(old, new,
+                                                          relationships):
+                output.write(('%s %s %s' % (change, item_id, details))
+                             .rstrip() + '\n')
+    except GitError as exc:
+        parser.error(str(exc))
+
+    sys.stderr.write('%d files parsed, %d taken from the cache\n' %
+                     (cache.misses, cache.hits))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
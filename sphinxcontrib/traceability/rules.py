@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""Declarative traceability rules
+
+Rules are declared in the ``traceability_rules`` configuration variable
+as a list of dictionaries. Each rule selects items and constrains
+them:
+
+* ``name``: rule name used in reports (its position by default)
+* ``filter``: regexp items identifiers must match for the rule to apply
+* ``type``: item directive name(s) the rule applies to
+* ``relationship``: relationship the cardinality and target
+  constraints refer to
+* ``min`` / ``max``: number of items related through ``relationship``
+* ``target_type``: directive name(s) allowed for related items
+* ``target_filter``: regexp related items identifiers must match
+* ``attributes``: dictionary of item data/attribute names and regexps
+  their values must match
+* ``severity``: ``warning`` (default) or ``error``
+* ``message``: text to add to violation reports
+
+All rules are evaluated together in a single pass over the items.
+
+"""
+
+import re
+
+RULE_KEYS = ('name', 'filter', 'type', 'relationship', 'min', 'max',
+             'target_type', 'target_filter', 'attributes', 'severity',
+             'message')
+SEVERITIES = ('warning', 'error')
+
+
+def _names(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return frozenset(value.split())
+    return frozenset(value)
+
+
+class Rule(object):
+    """
+    A compiled traceability rule.
+
+    """
+
+    def __init__(self, spec, position, relationships):
+        unknown = sorted(set(spec) - set(RULE_KEYS))
+        if unknown:
+            raise ValueError('unknown keys %s' % ', '.join(unknown))
+
+        self.name = spec.get('name', str(position))
+        self.filter = re.compile(spec.get('filter', ''))
+        self.types = _names(spec.get('type'))
+        self.relationship = spec.get('relationship')
+        self.min = spec.get('min')
+        self.max = spec.get('max')
+        self.target_types = _names(spec.get('target_type'))
+        target_filter = spec.get('target_filter')
+        self.target_filter = re.compile(target_filter) \
+            if target_filter is not None else None
+        self.attributes = [(name, re.compile(pattern)) for name, pattern
+                           in sorted(spec.get('attributes', {}).items())]
+        self.severity = spec.get('severity', 'warning')
+        self.message = spec.get('message')
+
+        if self.severity not in SEVERITIES:
+            raise ValueError('unknown severity %r' % self.severity)
+        needs_relationship = (self.min is not None or self.max is not None or
+                              self.target_types is not None or
+                              self.target_filter is not None)
+        if needs_relationship and self.relationship is None:
+            raise ValueError('relationship required by cardinality or '
+                             'target constraints')
+        if (self.relationship is not None and
+                self.relationship not in relationships):
+            raise ValueError('unknown relationship %r' % self.relationship)
+
+    def applies_to(self, item_id):
+        return self.filter.match(item_id) is not None
+
+    def check(self, item_info, index):
+        """
+        Return the list of violations of the rule by an item.
+
+        """
+        violations = []
+
+        # Flag attributes are set with a ``None`` value: only values set
+        # are matched
+        for name, pattern in self.attributes:
+            value = item_info.get(name)
+            if name not in item_info:
+                violations.append('attribute %s is missing' % name)
+            elif value is not None and not pattern.match(str(value)):
+                violations.append('attribute %s = %r does not match %r' %
+                                  (name, value, pattern.pattern))
+
+        if self.relationship is None:
+            return violations
+
+        targets = index.targets(item_info['id'], [self.relationship])
+        if self.min is not None and len(targets) < self.min:
+            violations.append('%s has %d items, at least %d required' %
+                              (self.relationship, len(targets), self.min))
+        if self.max is not None and len(targets) > self.max:
+            violations.append('%s has %d items, at most %d allowed' %
+                              (self.relationship, len(targets), self.max))
+        for target in sorted(targets):
+            target_info = index.items[target]
+            if (self.target_types is not None and
+                    target_info['type'] not in self.target_types):
+                violations.append('%s %s is of type %s' %
+                                  (self.relationship, target,
+                                   target_info['type']))
+            if (self.target_filter is not None and
+                    not self.target_filter.match(target)):
+                violations.append('%s %s does not match %r' %
+                                  (self.relationship, target,
+                                   self.target_filter.pattern))
+
+        return violations
+
+
+def compile_rules(specs, relationships):
+    """
+    Compile rule specifications. ``ValueError`` is raised for invalid
+    ones.
+
+    """
+    rules = []
+    for position, spec in enumerate(specs, start=1):
+        try:
+            rules.append(Rule(spec, position, relationships))
+        except (ValueError, re.error) as exc:
+            raise ValueError('traceability rule %s: %s' %
+                             (spec.get('name', position), exc))
+    return rules
+
+
+def evaluate_rules(rules, index):
+    """
+    Evaluate all ``rules`` in a single pass over the indexed items.
+
+    Yields ``(rule, item_info, violation)`` tuples.
+
+    """
+    # Rules are dispatched by item type, so that each item is only
+    # checked against the rules that may apply to it
+    by_type = {}
+    any_type = []
+    for rule in rules:
+        if rule.types is None:
+            any_type.append(rule)
+        else:
+            for item_type in rule.types:
+                by_type.setdefault(item_type, []).append(rule)
+
+    for item_id in sorted(index.items):
+        item_info = index.items[item_id]
+        for rule in by_type.get(item_info['type'], []) + any_type:
+            if rule.applies_to(item_id):
+                for violation in rule.check(item_info, index):
+                    yield rule, item_info, violation
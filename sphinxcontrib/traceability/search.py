@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Client-side item search index
+
+The index of items searched by the ``item-search`` widget is written in
+shards, by the first characters of item identifiers (case insensitive),
+so that browsers only load the shards of the identifiers being searched.
+Shards are scripts rather than JSON files, so they are also loaded from
+local files.
+
+Items are written in one pass, in identifier order: each shard is
+written at once and never held in memory.
+
+"""
+
+import json
+import os
+import shutil
+
+# Directory of the index, relative to the output directory
+SEARCH_DIR = os.path.join('_traceability', 'search')
+
+SEARCH_SCRIPT = 'search.js'
+
+_STATIC = os.path.join(os.path.dirname(__file__), 'static', SEARCH_SCRIPT)
+
+
+def sort_key(item_id):
+    """
+    Key item identifiers are sorted by in the index, keeping the items of
+    every shard together.
+
+    """
+    return item_id.lower(), item_id
+
+
+def shard_key(item_id, length):
+    return item_id[:length].lower()
+
+
+def shard_file(key):
+    return 'shard-%s.js' % key.encode('utf-8').hex()
+
+
+def _script(function, *args):
+    return 'traceabilitySearch.%s(%s);\n' % (
+        function, ', '.join(json.dumps(arg, separators=(',', ':'))
+                            for arg in args))
+
+
+def write_search_index(outdir, entries, length=2):
+    """
+    Write the search index of ``entries``, ``(id, caption, type, uri,
+    counts)`` tuples (``counts`` maps relationships to their number of
+    related items) sorted by :func:`sort_key` of their identifiers, to
+    ``SEARCH_DIR`` in ``outdir``, along with the search script. Returns
+    the number of shards.
+
+    """
+    directory = os.path.join(outdir, SEARCH_DIR)
+    os.makedirs(directory, exist_ok=True)
+    shutil.copyfile(_STATIC, os.path.join(directory, SEARCH_SCRIPT))
+    for name in os.listdir(directory):
+        if name.startswith('shard-'):
+            os.remove(os.path.join(directory, name))
+
+    shards = {}
+    output = None
+    key = None
+    try:
+        for entry in entries:
+            entry_key = shard_key(entry[0], length)
+            if entry_key != key:
+                if output is not None:
+                    output.write(']);\n')
+                    output.close()
+                key = entry_key
+                shards[key] = shard_file(key)
+                output = open(os.path.join(directory, shards[key]), 'w',
+                              encoding='utf-8')
+                output.write('traceabilitySearch.add(%s, [\n' %
+                             json.dumps(key))
+            else:
+                output.write(',\n')
+            output.write(json.dumps(list(entry), separators=(',', ':')))
+        if output is not None:
+            output.write(']);\n')
+    finally:
+        if output is not None:
+            output.close()
+
+    with open(os.path.join(directory, 'index.js'), 'w',
+              encoding='utf-8') as index:
+        index.write(_script('init', {'length': length, 'shards': shards}))
+    return len(shards)
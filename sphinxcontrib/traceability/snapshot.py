@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""Persisted snapshots of items and relationships
+
+A snapshot is written at the end of a build, so that items can be
+queried without building the documentation nor loading the Sphinx
+environment. Only the standard library is used here.
+
+A snapshot file is made of:
+
+* a magic string, and the format version and header length (``<II``)
+* a JSON header: relationships, data names and number of items
+* the item index: one ``<QI`` entry (offset and length of the item
+  record) per item, sorted by item identifier
+* item records: the item identifier, a tab and a JSON object with its
+  attributes and all its relationships (in both directions)
+
+Files are memory-mapped, so a query only reads the records it needs:
+looking an item up is a binary search over the index.
+
+"""
+
+import json
+import mmap
+import os
+import struct
+
+from .filters import id_filter
+
+MAGIC = b'TRACESNP'
+VERSION = 1
+
+_HEADER = struct.Struct('<II')
+_ENTRY = struct.Struct('<QI')
+
+# Item attributes kept in snapshots, besides relationships and data
+ATTRIBUTES = ('type', 'caption', 'docname', 'source', 'lineno')
+
+
+def item_record(item_info, links, data_names, uri=None, suspect=None):
+    """
+    Return the snapshot record of an item, with the relationships in
+    ``links`` (relationship to item identifiers, as in a relationship
+    index) and its ``suspect`` links, if any (see ``suspects`` module).
+
+    """
+    record = dict((name, item_info.get(name)) for name in ATTRIBUTES)
+    record['data'] = dict((name, item_info[name]) for name in data_names
+                          if item_info.get(name) is not None)
+    record['relationships'] = dict((rel, sorted(targets)) for rel, targets
+                                   in sorted(links.items()) if targets)
+    if uri is not None:
+        record['uri'] = uri
+    if suspect:
+        record['suspect'] = suspect
+    return record
+
+
+def write_snapshot(path, records, relationships, data_names):
+    """
+    Write a snapshot of ``records`` (an iterable of ``(item_id, record)``
+    tuples) to ``path``. The file is replaced at once, so that queries
+    running meanwhile read either the previous snapshot or the new one.
+
+    """
+    records = sorted(records, key=lambda record: record[0])
+    header = {
+        'relationships': relationships,
+        'data': list(data_names),
+        'count': len(records),
+    }
+    header_data = json.dumps(header, sort_keys=True).encode('utf-8')
+    index_offset = len(MAGIC) + _HEADER.size + len(header_data)
+
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as output:
+        output.write(MAGIC)
+        output.write(_HEADER.pack(VERSION, len(header_data)))
+        output.write(header_data)
+        output.write(b'\0' * (_ENTRY.size * len(records)))
+        entries = []
+        offset = index_offset + _ENTRY.size * len(records)
+        for item_id, record in records:
+            data = b'%s\t%s\n' % (item_id.encode('utf-8'), json.dumps(
+                record, sort_keys=True, default=str).encode('utf-8'))
+            output.write(data)
+            entries.append(_ENTRY.pack(offset, len(data)))
+            offset += len(data)
+        output.seek(index_offset)
+        output.write(b''.join(entries))
+    os.replace(temporary, path)
+
+
+class Snapshot(object):
+    """
+    Read only, memory-mapped snapshot of items.
+
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as source:
+            self.data = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        start = len(MAGIC) + _HEADER.size
+        if self.data[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError('%s is not a traceability snapshot' % path)
+        version, length = _HEADER.unpack(self.data[len(MAGIC):start])
+        if version != VERSION:
+            self.close()
+            raise ValueError('unsupported snapshot version %d' % version)
+        header = json.loads(self.data[start:start + length].decode('utf-8'))
+        self.relationships = header['relationships']
+        self.data_names = header['data']
+        self.count = header['count']
+        self.index_offset = start + length
+
+    def close(self):
+        self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def _entry(self, position):
+        return _ENTRY.unpack_from(self.data,
+                                  self.index_offset + position * _ENTRY.size)
+
+    def _id(self, position):
+        offset, length = self._entry(position)
+        end = self.data.find(b'\t', offset, offset + length)
+        return self.data[offset:end].decode('utf-8')
+
+    def _record(self, position):
+        offset, length = self._entry(position)
+        item_id, _, record = self.data[offset:offset + length].partition(
+            b'\t')
+        record = json.loads(record.decode('utf-8'))
+        record['id'] = item_id.decode('utf-8')
+        return record
+
+    def _find(self, item_id):
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._id(middle) < item_id:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def ids(self):
+        """
+        Iterate over all item identifiers, in order.
+
+        """
+        for position in range(self.count):
+            yield self._id(position)
+
+    def get(self, item_id):
+        """
+        Return the record of an item, or ``None`` if it does not exist.
+
+        """
+        position = self._find(item_id)
+        if position < self.count and self._id(position) == item_id:
+            return self._record(position)
+        return None
+
+    def __contains__(self, item_id):
+        position = self._find(item_id)
+        return position < self.count and self._id(position) == item_id
+
+    def items(self, filter=None, types=None):
+        """
+        Iterate over the records of the items whose identifier matches
+        ``filter`` (see ``filters`` module) and, if given, whose type is one
+        of ``types``. Identifiers starting with the literal prefix of
+        ``filter`` are searched only.
+
+        """
+        id_matcher = id_filter(filter or '')
+        prefix = id_matcher.prefix
+        for position in range(self._find(prefix), self.count):
+            item_id = self._id(position)
+            if not item_id.startswith(prefix):
+                break
+            if id_matcher.match(item_id):
+                record = self._record(position)
+                if not types or record['type'] in types:
+                    yield record
+
+    def related(self, item_id, relationships=None):
+        """
+        Return a dictionary of the items related to ``item_id`` by each of
+        ``relationships`` (all of them if not given), in both directions.
+
+        """
+        record = self.get(item_id)
+        if record is None:
+            raise KeyError(item_id)
+        found = record['relationships']
+        if relationships:
+            found = dict((rel, found.get(rel, [])) for rel in relationships)
+        return found
+
+    def coverage(self, relationships, filter=None, types=None,
+                 target_filter=None):
+        """
+        Return the lists of covered and uncovered identifiers of the items
+        selected by ``filter`` and ``types`` (as in :meth:`items`). An item
+        is covered if it is related to an existing item by any of
+        ``relationships``, whose identifier matches ``target_filter`` if
+        given.
+
+        """
+        target_matcher = id_filter(target_filter or '')
+        covered = []
+        uncovered = []
+        for record in self.items(filter, types):
+            targets = [target for rel in relationships
+                       for target in record['relationships'].get(rel, [])]
+            if any(target_matcher.match(target) and target in self
+                   for target in targets):
+                covered.append(record['id'])
+            else:
+                uncovered.append(record['id'])
+        return covered, uncovered
@@ -0,0 +1,113 @@
+/*
+ * Item search widget of sphinxcontrib-traceability.
+ *
+ * Items are searched by identifier prefix (case insensitive). Only the
+ * shards of the item index whose key matches the prefix being searched
+ * are loaded, each one once.
+ */
+(function () {
+  'use strict';
+
+  var MAX_RESULTS = 50;
+
+  if (window.traceabilitySearch) {
+    window.traceabilitySearch.bind();
+    return;
+  }
+
+  var base = document.currentScript.src.replace(/[^\/]*$/, '');
+  var root = base + '../../';
+  var search = window.traceabilitySearch = {
+    length: 2,
+    shards: null,
+    entries: {},
+    requested: {},
+    widgets: []
+  };
+
+  function load(file) {
+    if (search.requested[file]) {
+      return;
+    }
+    search.requested[file] = true;
+    var element = document.createElement('script');
+    element.src = base + file;
+    document.head.appendChild(element);
+  }
+
+  function render(widget) {
+    var query = widget.input.value.trim().toLowerCase();
+    var results = widget.results;
+    var count = 0;
+    results.innerHTML = '';
+    if (!query || !search.shards) {
+      return;
+    }
+
+    var prefix = query.slice(0, search.length);
+    var keys = Object.keys(search.shards).filter(function (key) {
+      return key.slice(0, prefix.length) === prefix;
+    }).sort();
+    keys.forEach(function (key) {
+      var entries = search.entries[key];
+      if (!entries) {
+        load(search.shards[key]);
+        return;
+      }
+      entries.forEach(function (entry) {
+        if (count >= MAX_RESULTS ||
+            entry[0].toLowerCase().slice(0, query.length) !== query) {
+          return;
+        }
+        var item = document.createElement('li');
+        var link = document.createElement('a');
+        var details = [entry[2]];
+        link.href = root + entry[3];
+        link.textContent = entry[0] + (entry[1] ? ', ' + entry[1] : '');
+        Object.keys(entry[4]).forEach(function (relationship) {
+          details.push(relationship + ': ' + entry[4][relationship]);
+        });
+        item.appendChild(link);
+        item.appendChild(document.createTextNode(
+          ' (' + details.join(', ') + ')'));
+        results.appendChild(item);
+        count += 1;
+      });
+    });
+  }
+
+  search.update = function () {
+    search.widgets.forEach(render);
+  };
+
+  search.init = function (manifest) {
+    search.length = manifest.length;
+    search.shards = manifest.shards;
+    search.update();
+  };
+
+  search.add = function (key, entries) {
+    search.entries[key] = entries;
+    search.update();
+  };
+
+  search.bind = function () {
+    var elements = document.querySelectorAll('div.item-search');
+    Array.prototype.forEach.call(elements, function (element) {
+      if (element.traceabilitySearch) {
+        return;
+      }
+      var widget = element.traceabilitySearch = {
+        input: element.querySelector('input'),
+        results: element.querySelector('ul')
+      };
+      widget.input.addEventListener('input', function () {
+        render(widget);
+      });
+      search.widgets.push(widget);
+    });
+  };
+
+  search.bind();
+  load('index.js');
+})();
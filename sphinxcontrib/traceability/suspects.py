@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""Suspect links
+
+A link (a relationship from a source item to a target item, for the
+relationships listed in ``traceability_suspect_relationships``) becomes
+suspect when its target item changes after the link was last confirmed:
+the source item may need a review.
+
+The digest of every item (a hash of its caption and content) is kept,
+along with the digest its targets had when each link was confirmed, in
+a JSON store written at the end of every build. Links are confirmed
+when they are first seen, and whenever their source item changes.
+
+Links are only checked again for the items whose digest changed since
+the previous build: as targets (their links become suspect, or not
+anymore) and as sources (their links are confirmed).
+
+"""
+
+import hashlib
+import json
+
+VERSION = 1
+
+
+def item_digest(caption, content):
+    """
+    Return the digest of an item, from its caption and content.
+
+    """
+    digest = hashlib.sha1(caption.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(content.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class SuspectLinks(object):
+    """
+    Digests of items, and of the targets of their links when the links
+    were confirmed (``confirmed[source][relationship][target]``), and the
+    suspect links found comparing both.
+
+    """
+
+    def __init__(self, digests=None, confirmed=None):
+        self.digests = dict(digests or {})
+        self.confirmed = confirmed or {}
+        self.suspects = {}
+        for source, links in self.confirmed.items():
+            for rel, targets in links.items():
+                for target, digest in targets.items():
+                    if self.digests.get(target, digest) != digest:
+                        self._flag(source, rel, target, True)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a store written by ``write``, or return an empty one if
+        there is none. ``ValueError`` is raised for invalid stores.
+
+        """
+        try:
+            with open(path, encoding='utf-8') as stream:
+                data = json.load(stream)
+        except FileNotFoundError:
+            return cls()
+        if not isinstance(data, dict) or data.get('version') != VERSION:
+            raise ValueError('unknown suspect link store format')
+        return cls(data['items'], data['links'])
+
+    def _flag(self, source, rel, target, suspect):
+        if suspect:
+            self.suspects.setdefault(source, {}).setdefault(
+                rel, set()).add(target)
+            return
+        targets = self.suspects.get(source, {}).get(rel)
+        if targets is not None and target in targets:
+            targets.discard(target)
+            if not targets:
+                del self.suspects[source][rel]
+                if not self.suspects[source]:
+                    del self.suspects[source]
+
+    def __contains__(self, source):
+        return source in self.suspects
+
+    def get(self, source):
+        """
+        Return the suspect links of a source item, as a dictionary of
+        relationships to sorted lists of target items.
+
+        """
+        return dict((rel, sorted(targets)) for rel, targets in
+                    self.suspects.get(source, {}).items())
+
+    def update(self, items, index, relationships):
+        """
+        Check the links of ``relationships`` of the items whose digest
+        changed, according to the relationship ``index``. Returns the set
+        of source items whose suspect links changed.
+
+        """
+        flags = {}
+
+        def flag(source, rel, target, suspect):
+            if source not in flags:
+                flags[source] = self.get(source)
+            self._flag(source, rel, target, suspect)
+
+        changed = set(item_id for item_id in set(self.digests) | set(items)
+                      if self.digests.get(item_id) !=
+                      items.get(item_id, {}).get('digest'))
+        for item_id in changed:
+            digest = items.get(item_id, {}).get('digest')
+
+            # Links from a changed item are confirmed: it was reviewed
+            if item_id in self.suspects:
+                flags.setdefault(item_id, self.get(item_id))
+                del self.suspects[item_id]
+            self.confirmed.pop(item_id, None)
+            if digest is not None:
+                links = {}
+                for rel, targets in index.targets_by_relationship(
+                        item_id, relationships).items():
+                    if targets:
+                        links[rel] = dict((target, items[target].get(
+                            'digest')) for target in targets)
+                self.confirmed[item_id] = links
+                self.digests[item_id] = digest
+            else:
+                self.digests.pop(item_id, None)
+
+            # Links to a changed item become suspect, unless their source
+            # changed too. Links seen for the first time are confirmed
+            reverse = index.links.get(item_id, {})
+            for rel in relationships:
+                for source in reverse.get(index.relationships[rel], ()):
+                    if source in changed or source not in items:
+                        continue
+                    confirmed = self.confirmed.setdefault(
+                        source, {}).setdefault(rel, {})
+                    if digest is None:
+                        confirmed.pop(item_id, None)
+                        flag(source, rel, item_id, False)
+                    elif item_id not in confirmed:
+                        confirmed[item_id] = digest
+                    else:
+                        flag(source, rel, item_id,
+                             confirmed[item_id] != digest)
+
+        # Suspect links removed since are not suspect anymore, nor
+        # confirmed if added again
+        for source in list(self.suspects):
+            for rel, targets in list(self.suspects[source].items()):
+                for target in list(targets):
+                    if (source not in items or target not in items or
+                            not index.are_related(source, target, [rel])):
+                        flag(source, rel, target, False)
+                        self.confirmed.get(source, {}).get(rel, {}).pop(
+                            target, None)
+
+        return set(source for source, suspects in flags.items()
+                   if suspects != self.get(source))
+
+    def write(self, path, index, relationships):
+        """
+        Write the store to ``path``, unless it did not change. Links not
+        recorded yet are confirmed, and links removed are dropped.
+
+        """
+        confirmed = {}
+        for source in sorted(self.digests):
+            recorded = self.confirmed.get(source, {})
+            links = {}
+            for rel, targets in index.targets_by_relationship(
+                    source, relationships).items():
+                if targets:
+                    links[rel] = dict(
+                        (target, recorded.get(rel, {}).get(
+                            target, self.digests.get(target)))
+                        for target in targets)
+            if links:
+                confirmed[source] = links
+        self.confirmed = confirmed
+
+        data = json.dumps({'version': VERSION, 'items': self.digests,
+                           'links': confirmed}, indent=1, sort_keys=True)
+        try:
+            with open(path, encoding='utf-8') as stream:
+                if stream.read() == data:
+                    return
+        except OSError:
+            pass
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(data)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""Item tags in source code comments
+
+Implementation traces can be written as tags in comments of source files
+of any language, instead of item directives::
+
+  /* @item SW_PARSER Header parser */
+  int parse_header(...)  // @implements REQ_12 REQ_13
+
+  # @validates REQ_12
+
+``@item ID caption`` declares an item located at the tag. Relationship
+tags (``@`` followed by any relationship name) add relationships to the
+last item declared in the file, or, before any ``@item`` tag, to an item
+standing for the whole file, identified by its path.
+
+Tags are only recognized after a comment start (``#``, ``//``, ``/*``,
+``*``, ``--``, ``;``, ``%`` or ``<!--``). Files are scanned (and cached)
+by the machinery of ``harvest`` module, so only stale files are read and
+they are scanned by a process pool when there are many of them.
+
+"""
+
+import hashlib
+import re
+
+TAG_RE = re.compile(r'(?:#|//|/\*|\*|--|;|%|<!--)\s*@(?P<tag>[\w\-]+)'
+                    r'(?:[ \t]+(?P<args>.*?))?\s*(?:\*/|-->)?\s*$')
+
+ITEM_TAG = 'item'
+
+
+def tag_names(relationships):
+    """
+    Return the names of tags (with their ``@`` marker) for the given
+    relationships, as scanned by ``scan_file``.
+
+    """
+    return ('@' + ITEM_TAG,) + tuple('@' + rel
+                                     for rel in sorted(relationships))
+
+
+def scan_tags(text, names):
+    """
+    Return ``(lineno, tag, arguments)`` tuples for the tags in comments of
+    a source ``text`` whose name (with ``@`` marker) is one of ``names``.
+
+    """
+    tags = []
+    for lineno, line in enumerate(text.splitlines(), 1):
+        if '@' not in line:
+            continue
+        match = TAG_RE.search(line)
+        if match and '@' + match.group('tag') in names:
+            tags.append((lineno, match.group('tag'),
+                         match.group('args') or ''))
+    return tags
+
+
+def scan_file(args):
+    """
+    Scan a single file for tags, as ``harvest.harvest_items`` scanner.
+    Runs in worker processes: ``(path, digest, tags, error)`` is returned,
+    tags being ``None`` if file contents match ``known_digest``.
+
+    """
+    path, names, known_digest = args
+    try:
+        with open(path, 'rb') as source:
+            data = source.read()
+    except OSError as exc:
+        return path, None, [], str(exc)
+
+    digest = hashlib.sha1(data).hexdigest()
+    if digest == known_digest:
+        return path, digest, None, None
+
+    # Cheap test before decoding: most files have no tags at all
+    if not any(name.encode() in data for name in names):
+        return path, digest, [], None
+
+    return path, digest, scan_tags(data.decode('utf-8', 'replace'),
+                                   names), None
+
+
+def tagged_items(tags, file_id, file_caption=''):
+    """
+    Return the items declared by the ``tags`` of a file, as the item
+    dictionaries of ``harvest`` module. Relationship tags before any
+    ``@item`` tag belong to an item ``file_id``.
+
+    """
+    items = []
+    current = None
+    for lineno, tag, arguments in tags:
+        if tag == ITEM_TAG:
+            item_id, _, caption = arguments.partition(' ')
+            if not item_id:
+                continue
+            current = {'name': 'item', 'id': item_id,
+                       'caption': caption.strip(), 'options': [],
+                       'content': [], 'lineno': lineno}
+            items.append(current)
+            continue
+        if current is None:
+            current = {'name': 'item', 'id': file_id,
+                       'caption': file_caption, 'options': [],
+                       'content': [], 'lineno': lineno}
+            items.append(current)
+        options = dict(current['options'])
+        if tag in options:
+            options[tag] += ' ' + arguments
+        else:
+            options[tag] = arguments
+        current['options'] = sorted(options.items())
+    return items
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Aggregation of unresolved item references
+
+References to undefined items (relationship targets and ``item`` role
+targets) are counted per missing item during the build, so that a
+compact summary and a machine-readable report can be produced once at
+the end. Unless a limit of undefined items is set, every reference is
+reported individually, as usual.
+
+"""
+
+import json
+
+
+class UnresolvedReferences(object):
+    """
+    Unresolved item references of a build, grouped by missing item.
+
+    ``limit`` is the maximum number of undefined items to be reported
+    individually, each one once (``None`` to report every reference).
+
+    """
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.missing = {}
+        self.total = 0
+        self.reported = 0
+
+    def add(self, target, docname, kind):
+        """
+        Record a reference of a ``kind`` (``relationship`` or ``role``)
+        from document ``docname`` to undefined item ``target``.
+
+        Returns ``True`` if the reference is to be reported individually.
+
+        """
+        entry = self.missing.get(target)
+        first = entry is None
+        if first:
+            entry = self.missing[target] = {'count': 0, 'documents': {},
+                                            'kinds': set()}
+        entry['count'] += 1
+        entry['documents'][docname] = entry['documents'].get(docname, 0) + 1
+        entry['kinds'].add(kind)
+        self.total += 1
+
+        # With a limit, only the first reference to each of the first
+        # undefined items, so that no item hides the others
+        if self.limit is None or (first and len(self.missing) <= self.limit):
+            self.reported += 1
+            return True
+        return False
+
+    def most_referenced(self, number):
+        """
+        Return up to ``number`` ``(target, count)`` tuples of the most
+        referenced undefined items.
+
+        """
+        ranked = sorted(self.missing.items(),
+                        key=lambda entry: (-entry[1]['count'], entry[0]))
+        return [(target, entry['count']) for target, entry in
+                ranked[:number]]
+
+    def summary(self, number=10):
+        """
+        Return a one line summary of unresolved references.
+
+        """
+        text = '%d unresolved item references to %d undefined items' % (
+            self.total, len(self.missing))
+        if self.reported < self.total:
+            text += ' (%d not reported individually)' % (
+                self.total - self.reported)
+        text += '; most referenced: ' + ', '.join(
+            '%s (%d)' % entry for entry in self.most_referenced(number))
+        return text
+
+    def report(self):
+        """
+        Return the report as a JSON serializable dictionary.
+
+        """
+        return {
+            'total': self.total,
+            'undefined_items': len(self.missing),
+            'missing': dict(
+                (target, {'count': entry['count'],
+                          'kinds': sorted(entry['kinds']),
+                          'documents': dict(sorted(
+                              entry['documents'].items()))})
+                for target, entry in sorted(self.missing.items())),
+        }
+
+    def write(self, path):
+        """
+        Write the report to a JSON file.
+
+        """
+        with open(path, 'w', encoding='utf-8') as output:
+            json.dump(self.report(), output, indent=1)
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+#
+# Build configuration for items harvested from source code docstrings,
+# without importing the documented modules.
+
+extensions = ['sphinxcontrib.traceability']
+
+source_suffix = '.rst'
+master_doc = 'index'
+
+project = u'Example'
+copyright = u'2013, Oscar Ciudad'
+version = '0.0'
+release = '0.0'
+
+exclude_patterns = ['_build']
+
+latex_documents = [
+  ('index', 'Example.tex', u'Example Documentation',
+   u'Oscar Ciudad', 'manual'),
+]
+
+epub_title = u'Example'
+epub_author = u'Oscar Ciudad'
+epub_publisher = u'Oscar Ciudad'
+epub_copyright = u'2013, Oscar Ciudad'
+
+traceability_relationships = {
+    'fulfills': 'fulfilled_by',
+    'depends_on': 'impacts_on',
+    'implements': 'implemented_by',
+    'realizes': 'realized_by',
+    'validates': 'validated_by',
+    'trace': 'backtrace'
+}
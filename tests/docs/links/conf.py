@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+#
+# Build configuration with relationships read from link files.
+
+extensions = ['sphinxcontrib.traceability']
+
+source_suffix = '.rst'
+master_doc = 'index'
+
+project = u'Example'
+copyright = u'2013, Oscar Ciudad'
+version = '0.0'
+release = '0.0'
+
+exclude_patterns = ['_build']
+
+traceability_relationships = {
+    'validated_by': 'validates',
+    'implements': 'implemented_by'
+}
+
+traceability_link_files = ['links/tests.csv', 'links/reviews.jsonl',
+                           'links/design.yaml']
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+#
+# Build configuration with wildcard and range targets of relationships.
+
+extensions = ['sphinxcontrib.traceability']
+
+source_suffix = '.rst'
+master_doc = 'index'
+
+project = u'Example'
+copyright = u'2013, Oscar Ciudad'
+version = '0.0'
+release = '0.0'
+
+exclude_patterns = ['_build']
+
+traceability_relationships = {
+    'validates': 'validated_by'
+}
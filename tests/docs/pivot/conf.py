@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+#
+# Build configuration for item pivots.
+
+from docutils.parsers.rst import directives
+
+extensions = ['sphinxcontrib.traceability']
+
+source_suffix = '.rst'
+master_doc = 'index'
+
+project = u'Example'
+copyright = u'2013, Oscar Ciudad'
+version = '0.0'
+release = '0.0'
+
+exclude_patterns = ['_build']
+
+traceability_relationships = {
+    'validated_by': 'validates'
+}
+
+traceability_data = {
+    'status': directives.unchanged,
+    'functional': directives.flag,
+}
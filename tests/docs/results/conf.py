@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+#
+# Build configuration with item test results from JUnit XML reports.
+
+extensions = ['sphinxcontrib.traceability']
+
+source_suffix = '.rst'
+master_doc = 'index'
+
+project = u'Example'
+copyright = u'2013, Oscar Ciudad'
+version = '0.0'
+release = '0.0'
+
+exclude_patterns = ['_build']
+
+traceability_relationships = {
+    'validated_by': 'validates'
+}
+
+traceability_test_results = ['reports/junit.xml']
+traceability_test_result_pattern = r'(?P<id>TST_\d+)'
+
+traceability_item_template = """
+    {{ id }}
+        {{ caption }} ({{ result|default('not run') }})
+    """
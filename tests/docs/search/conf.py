@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+#
+# Build configuration for the item search index.
+
+extensions = ['sphinxcontrib.traceability']
+
+source_suffix = '.rst'
+master_doc = 'index'
+
+project = u'Example'
+copyright = u'2013, Oscar Ciudad'
+version = '0.0'
+release = '0.0'
+
+exclude_patterns = ['_build']
+
+traceability_relationships = {
+    'validated_by': 'validates'
+}
+
+traceability_search = True
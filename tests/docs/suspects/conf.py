@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+#
+# Build configuration flagging suspect links.
+
+extensions = ['sphinxcontrib.traceability']
+
+source_suffix = '.rst'
+master_doc = 'index'
+
+project = u'Example'
+copyright = u'2013, Oscar Ciudad'
+version = '0.0'
+release = '0.0'
+
+exclude_patterns = ['_build']
+
+traceability_relationships = {
+    'implements': 'implemented_by'
+}
+
+traceability_suspect_relationships = ['implements']
+
+traceability_item_template = """
+    {{ id }}
+        {{ caption }}
+        {%- for rel, targets in suspect.items() %}
+        (suspect {{ rel }}: {{ targets|join(', ') }})
+        {%- endfor %}
+    """
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+#
+# Build configuration for items tagged in source code comments.
+
+extensions = ['sphinxcontrib.traceability']
+
+source_suffix = '.rst'
+master_doc = 'index'
+
+project = u'Example'
+copyright = u'2013, Oscar Ciudad'
+version = '0.0'
+release = '0.0'
+
+exclude_patterns = ['_build']
+
+traceability_relationships = {
+    'implements': 'implemented_by',
+    'validates': 'validated_by'
+}
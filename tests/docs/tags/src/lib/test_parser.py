@@ -0,0 +1,5 @@
+# @validates REQ_1
+
+
+def test_parse_header():
+    assert True  # @validates REQ_2
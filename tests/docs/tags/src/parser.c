@@ -0,0 +1,15 @@
+#include "parser.h"
+
+/* @item SW_PARSER Header parser */
+int parse_header(const char *text)  /* @implements REQ_1 */
+{
+    return 0;  // @implements REQ_2
+}
+
+/*
+ * @item SW_ERRORS Error reporting
+ * @implements REQ_2
+ */
+void report(void);
+
+/* Not a tag: contact@example.com */
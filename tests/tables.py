@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+"""Tables of built HTML pages, found by their title"""
+
+import re
+
+
+def table(html, title):
+    return html.split('<span class="caption-text">%s</span>' % title)[1] \
+        .split('</table>')[0]
+
+
+def table_rows(html, title):
+    return [[re.sub('<.*?>', '', cell).strip() for cell in
+             re.findall(r'<t[hd][^>]*>(.*?)</t[hd]>', row, re.S)]
+            for row in re.findall(r'<tr[^>]*>(.*?)</tr>', table(html, title),
+                                  re.S)]
@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
 
-from sphinx_testing import with_app
+import os
+import re
+
+from sphinx_testing import TestApp, with_app
+
+from sphinxcontrib.traceability import (ItemDirective, item_content,
+                                        item_options)
+from sphinxcontrib.traceability.extension import DEFAULT_ITEM_TEMPLATE
 
 
 @with_app(buildername='html', srcdir='tests/docs/basic/')
@@ -26,3 +33,90 @@ def test_build_epub(app, status, warning):
 @with_app(buildername='json', srcdir='tests/docs/basic/')
 def test_build_json(app, status, warning):
     app.builder.build_all()
+
+
+@with_app(buildername='html', srcdir='tests/docs/basic/')
+def test_item_content(app, status, warning):
+    app.builder.build_all()
+    item_info = app.env.traceability_all_items['r001']
+    assert not isinstance(item_info['content'], str)
+    assert item_content(item_info).startswith('This is one item\n\n- More')
+
+
+@with_app(buildername='html', srcdir='tests/docs/basic/',
+          confoverrides={'traceability_item_content_in_memory': True})
+def test_item_content_in_memory(app, status, warning):
+    app.builder.build_all()
+    item_info = app.env.traceability_all_items['SRS_0002']
+    assert item_info['content'] == 'The systems will say goodbye'
+
+
+@with_app(buildername='html', srcdir='tests/docs/basic/',
+          confoverrides={'traceability_backlinks': True})
+def test_backlinks(app, status, warning):
+    app.builder.build_all()
+    with open(os.path.join(app.outdir, 'SSS.html'), encoding='utf-8') as html:
+        html = re.sub('<.*?>', '', html.read())
+    assert 'traced_by: SRS_0001, Software saying hello' in html
+    # Relationships declared by the item itself are not repeated
+    with open(os.path.join(app.outdir, 'SRS.html'), encoding='utf-8') as html:
+        assert 'trace: ' not in re.sub('<.*?>', '', html.read())
+
+
+def test_item_options_per_application():
+    # Both applications are initialized before any of them is built
+    basic = TestApp(buildername='html', srcdir='tests/docs/basic/')
+    pivot = TestApp(buildername='html', srcdir='tests/docs/pivot/')
+    try:
+        assert set(ItemDirective.option_spec) == {'class'}
+        assert 'trace' in item_options(basic.config).relationships
+        assert 'trace' not in item_options(pivot.config).relationships
+
+        pivot.builder.build_all()
+        basic.builder.build_all()
+        assert pivot.env.traceability_all_items['REQ_1']['functional'] is None
+        assert basic.env.traceability_all_items['SRS_0001']['trace'] == [
+            'SYS_0001']
+
+        # Deprecated aliases of the options of each application
+        assert basic.env.relationships['trace'] == 'traced_by'
+        assert basic.env.relationships['traced_by'] == 'trace'
+        assert 'trace' not in pivot.env.relationships
+        assert pivot.env.data == item_options(pivot.config).data
+
+        options = item_options(pivot.config)
+        assert options.convert({'status': 'draft', 'class': ['x']}) == {
+            'status': 'draft', 'class': ['x']}
+        for invalid in ({'trace': 'SSS_0001'}, {'functional': 'yes'}):
+            try:
+                options.convert(invalid)
+            except ValueError:
+                pass
+            else:
+                assert False, 'ValueError not raised for %r' % invalid
+    finally:
+        basic.cleanup()
+        pivot.cleanup()
+
+
+def test_default_template_nodes():
+    # Items of the default template are built as nodes directly, just as
+    # the same template rendered as text and parsed again, whatever their
+    # shape (items without caption nor content are paragraphs)
+    for srcdir, docname in (('tests/docs/basic/', 'SRS'),
+                            ('tests/docs/items/', 'index')):
+        pages = []
+        for template in (DEFAULT_ITEM_TEMPLATE, DEFAULT_ITEM_TEMPLATE + '\n'):
+            app = TestApp(buildername='html', srcdir=srcdir, confoverrides={
+                'traceability_item_template': template,
+                'traceability_backlinks': True})
+            try:
+                app.builder.build_all()
+                with open(os.path.join(app.outdir, docname + '.html'),
+                          encoding='utf-8') as html:
+                    pages.append(html.read())
+            finally:
+                app.cleanup()
+        assert pages[0] == pages[1]
+    assert '<p id="A_1">A_1</p>' in pages[0]
+    assert '<dt>A_3</dt>' in pages[0]
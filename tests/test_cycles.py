@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+
+from sphinx_testing import with_app
+
+from sphinxcontrib.traceability.index import strongly_connected_components
+
+
+@with_app(buildername='html', srcdir='tests/docs/cycles/')
+def test_build_html(app, status, warning):
+    app.builder.build_all()
+    warnings = warning.getvalue()
+    assert ('relationship cycle (implements): CYC_A (index.rst:4), '
+            'CYC_B (index.rst:7), CYC_C (index.rst:10), '
+            'CYC_D (index.rst:13)') in warnings
+    assert 'relationship cycle (implements): SELF (index.rst:17)' in warnings
+    assert 'TREE_' not in warnings
+
+
+def test_strongly_connected_components():
+    graph = {1: [2], 2: [3], 3: [1, 4], 4: [5], 5: [4], 6: []}
+    components = strongly_connected_components(sorted(graph), graph.get)
+    assert sorted(sorted(component) for component in components) == \
+        [[1, 2, 3], [4, 5], [6]]
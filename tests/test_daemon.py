@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import shutil
+import tempfile
+
+from sphinxcontrib.traceability.daemon import TraceDaemon
+from sphinxcontrib.traceability.index import RelationshipIndex
+
+
+def edit(path, old, new):
+    with open(path) as source:
+        text = source.read()
+    with open(path, 'w') as source:
+        source.write(text.replace(old, new))
+    # Make sure the change is seen, whatever the file system resolution
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10 ** 9))
+
+
+def test_incremental_builds():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        srcdir = os.path.join(tmpdir, 'src')
+        shutil.copytree('tests/docs/daemon', srcdir)
+        daemon = TraceDaemon(srcdir, os.path.join(tmpdir, 'out'),
+                             status=io.StringIO(), warning=io.StringIO())
+        assert daemon.poll()
+        app = daemon.app
+        index = app.traceability_index
+        assert index.targets('REQ_1') == {'DES_1'}
+        assert not daemon.poll()
+
+        # Only the changed document is read, the index is updated and the
+        # document with the list and the matrix is written again
+        edit(os.path.join(srcdir, 'design.rst'), ':implements: REQ_1',
+             ':implements: REQ_2')
+        assert daemon.poll()
+        assert daemon.app is app
+        assert app.traceability_index is index
+        assert index.targets('REQ_1') == set()
+        assert index.targets('REQ_2') == {'DES_1'}
+        assert app.traceability_read_docs == ['design']
+        with open(os.path.join(tmpdir, 'out', 'lists.html')) as html:
+            page = html.read()
+        assert 'REQ_2' in page.split('Implementation')[1]
+
+        # Items whose contents changed only do not write lists again (the
+        # document with the toctree is always written again)
+        edit(os.path.join(srcdir, 'design.rst'), ':implements: REQ_2\n',
+             ':implements: REQ_2\n\n   Rationale.\n')
+        written = []
+        app.connect('doctree-resolved',
+                    lambda app, doctree, docname: written.append(docname))
+        assert daemon.poll()
+        assert sorted(written) == ['design', 'index']
+
+        # Changing the configuration starts a new application
+        edit(os.path.join(srcdir, 'conf.py'), 'version', 'release')
+        assert daemon.poll()
+        assert daemon.app is not app
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def test_failed_builds():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        srcdir = os.path.join(tmpdir, 'src')
+        shutil.copytree('tests/docs/daemon', srcdir)
+        warning = io.StringIO()
+        daemon = TraceDaemon(srcdir, os.path.join(tmpdir, 'out'),
+                             status=io.StringIO(), warning=warning)
+        assert daemon.poll()
+
+        # Errors in the configuration are reported, and the build is
+        # attempted again only once a watched file changes
+        edit(os.path.join(srcdir, 'conf.py'), 'version', 'version =')
+        assert daemon.poll()
+        assert daemon.app is None
+        assert 'traceability daemon: build failed' in warning.getvalue()
+        assert not daemon.poll()
+
+        edit(os.path.join(srcdir, 'conf.py'), 'version =', 'version')
+        assert daemon.poll()
+        assert daemon.app.traceability_index.targets('REQ_1') == {'DES_1'}
+        assert not daemon.poll()
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def test_index_updates():
+    relationships = {'implements': 'implemented_by',
+                     'implemented_by': 'implements'}
+    items = {
+        'A': {'id': 'A', 'implements': ['B'], 'implemented_by': []},
+        'B': {'id': 'B', 'implements': [], 'implemented_by': ['A']},
+    }
+    index = RelationshipIndex(items, relationships)
+    assert index.targets('B') == {'A'}
+
+    # Relationships declared in both directions remain while any of their
+    # declarations does
+    index.remove_item(items['A'])
+    assert index.targets('B') == {'A'}
+    index.remove_item(items['B'])
+    assert index.targets('B') == set()
+    assert not index.are_related('A', 'B')
+    index.add_item(items['A'])
+    assert index.are_related('B', 'A', ['implemented_by'])
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+import csv
+import os
+import zipfile
+
+from sphinx_testing import with_app
+
+from .tables import table_rows
+
+
+def exported_rows(app, basename):
+    with open(os.path.join(app.outdir, '_traceability', basename + '.csv'),
+              encoding='utf-8') as exported:
+        return list(csv.reader(exported))
+
+
+@with_app(buildername='html', srcdir='tests/docs/basic/')
+def test_build_html(app, status, warning):
+    app.builder.build_all()
+    basename = os.path.join(app.outdir, '_traceability', 'index-item-matrix-4')
+
+    with open(basename + '.csv', encoding='utf-8') as exported:
+        rows = list(csv.reader(exported))
+    assert rows == [['Source', 'Caption', 'Target', 'Caption'],
+                    ['SRS_0001', 'Software saying hello',
+                     'SYS_0001', 'Saying hello'],
+                    ['SRS_0002', 'Software saying goodbye', '', '']]
+
+    with zipfile.ZipFile(basename + '.xlsx') as workbook:
+        sheet = workbook.read('xl/worksheets/sheet1.xml').decode('utf-8')
+    assert sheet.count('<row ') == 3
+    assert 'Software saying hello' in sheet
+
+    with open(os.path.join(app.outdir, 'index.html'),
+              encoding='utf-8') as page:
+        assert '_traceability/index-item-matrix-4.xlsx' in page.read()
+
+
+@with_app(buildername='html', srcdir='tests/docs/basic/')
+def test_export_as_rendered(app, status, warning):
+    app.builder.build_all()
+    with open(os.path.join(app.outdir, 'index.html'),
+              encoding='utf-8') as html:
+        html = html.read()
+
+    # Sources without targets are left out of both
+    rows = exported_rows(app, 'index-item-matrix-10')
+    assert [['%s, %s' % (row[0], row[1]), '%s, %s' % (row[2], row[3])]
+            for row in rows[1:]] == \
+        table_rows(html, 'SRS to SSS, related only')[1:]
+
+    # One column per relationship in tables, one row per link in exports
+    rows = exported_rows(app, 'index-item-matrix-11')
+    assert rows[0] == ['Source', 'Caption', 'Relationship', 'Target',
+                       'Caption']
+    rendered = table_rows(html, 'By relationship, exported')
+    relationships = rendered[0][1:]
+    exported = []
+    for source, caption, relationship, target, target_caption in rows[1:]:
+        if not exported or exported[-1][0] != '%s, %s' % (source, caption):
+            exported.append(['%s, %s' % (source, caption)] +
+                            [''] * len(relationships))
+        if relationship:
+            exported[-1][relationships.index(relationship) + 1] = \
+                '%s, %s' % (target, target_caption)
+    assert exported == rendered[1:]
+
+
+@with_app(buildername='latex', srcdir='tests/docs/basic/')
+def test_build_latex(app, status, warning):
+    app.builder.build_all()
+    assert not os.path.exists(os.path.join(app.outdir, '_traceability'))
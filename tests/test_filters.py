@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+from sphinxcontrib.traceability.filters import id_filter, literal_prefix
+
+IDS = sorted(['SRS_0001', 'SRS_0010', 'SRS_0100', 'SRS_0100a', 'SRS_1000',
+              'SYS_0001', 'TST_CAN_01', 'TST_LIN_01'])
+
+
+def test_literal_prefix():
+    assert literal_prefix('SRS_') == 'SRS_'
+    assert literal_prefix('^SRS_00[0-9]') == 'SRS_00'
+    assert literal_prefix('SRS_0*1') == 'SRS_'
+    assert literal_prefix('SRS_\\d') == 'SRS_'
+    assert literal_prefix('SRS|SYS') == ''
+    assert literal_prefix('(?i)srs') == ''
+
+
+def test_filters():
+    assert id_filter('').select(IDS) == IDS
+    assert id_filter('^S[YR]S_0001').select(IDS) == ['SRS_0001', 'SYS_0001']
+    assert id_filter('SRS_01').select(IDS) == ['SRS_0100', 'SRS_0100a']
+    assert id_filter('prefix:TST_').select(IDS) == [
+        'TST_CAN_01', 'TST_LIN_01']
+    assert id_filter('glob:TST_*_01').select(IDS) == [
+        'TST_CAN_01', 'TST_LIN_01']
+    # Escaped colons keep regular expressions apart from other forms
+    assert id_filter(r'glob\:TST').select(['TST', 'glob:TST']) == [
+        'glob:TST']
+    assert id_filter('prefix:glob:').select(['TST', 'glob:TST']) == [
+        'glob:TST']
+    assert id_filter('glob:SRS_0?10').select(IDS) == ['SRS_0010']
+    assert id_filter('range:SRS_10..SRS_0100').select(IDS) == \
+        ['SRS_0010', 'SRS_0100']
+    assert list(id_filter('prefix:SYS').positions(IDS)) == [5]
+    for expression in ('range:SRS_1..SYS_2', 'range:SRS_1', '[unclosed'):
+        try:
+            id_filter(expression)
+        except ValueError:
+            pass
+        else:
+            assert False, expression
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import shutil
+import tempfile
+
+from sphinx_testing import with_app
+
+from sphinxcontrib.traceability import harvest, item_content
+from sphinxcontrib.traceability.daemon import TraceDaemon
+
+
+@with_app(buildername='html', srcdir='tests/docs/harvest/')
+def test_build_html(app, status, warning):
+    app.builder.build_all()
+    assert 'SW_REQ_001' in app.env.traceability_all_items
+    assert 'SW_TEST_006' in app.env.traceability_all_items
+    assert (app.env.traceability_all_items['SW_REQ_003']['implements'] ==
+            ['SW_REQ_001'])
+
+
+@with_app(buildername='latex', srcdir='tests/docs/harvest/')
+def test_build_latex(app, status, warning):
+    app.builder.build_all()
+
+
+@with_app(buildername='epub', srcdir='tests/docs/harvest/')
+def test_build_epub(app, status, warning):
+    app.builder.build_all()
+
+
+def test_new_source_files():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        srcdir = os.path.join(tmpdir, 'src')
+        shutil.copytree('tests/docs/daemon', srcdir)
+        with open(os.path.join(srcdir, 'design.rst'), 'a') as rst:
+            rst.write('\n.. item-harvest:: code\n')
+        os.mkdir(os.path.join(srcdir, 'code'))
+        daemon = TraceDaemon(srcdir, os.path.join(tmpdir, 'out'),
+                             status=io.StringIO(), warning=io.StringIO())
+        assert daemon.poll()
+
+        # Files added to scanned directories make documents be read again
+        with open(os.path.join(srcdir, 'code', 'new.py'), 'w') as code:
+            code.write('"""\n.. item:: SW_NEW New module\n"""\n')
+        assert daemon.poll()
+        assert daemon.app.traceability_read_docs == ['design']
+        assert 'SW_NEW' in daemon.app.env.traceability_all_items
+        assert not daemon.poll()
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def test_single_line_content():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        srcdir = os.path.join(tmpdir, 'src')
+        shutil.copytree('tests/docs/daemon', srcdir)
+        with open(os.path.join(srcdir, 'design.rst'), 'a') as rst:
+            rst.write('\n.. item-harvest:: code.py\n')
+        with open(os.path.join(srcdir, 'code.py'), 'w') as code:
+            code.write('"""\n.. item:: SW_ONE Module\n\n'
+                       '   Only line.\n"""\n')
+        warning = io.StringIO()
+        daemon = TraceDaemon(srcdir, os.path.join(tmpdir, 'out'),
+                             status=io.StringIO(), warning=warning)
+        daemon.poll()
+
+        # Harvested lines are bound to the directive line, not to the
+        # content line: content is kept as text
+        item_info = daemon.app.env.traceability_all_items['SW_ONE']
+        assert item_info['content'] == 'Only line.'
+        assert item_content(item_info) == 'Only line.'
+        assert 'cannot load content' not in warning.getvalue()
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def test_parse_item_directives():
+    lines = ['Some text', '',
+             '.. item:: ID_1 A caption',
+             '          continued',
+             '   :trace: ID_2',
+             '           ID_3',
+             '',
+             '   Content', '',
+             '.. note:: Not an item']
+    items = harvest.parse_item_directives(lines, ['item'], lineno=10)
+    assert len(items) == 1
+    assert items[0]['id'] == 'ID_1'
+    assert items[0]['caption'] == 'A caption continued'
+    assert items[0]['options'] == [('trace', 'ID_2\nID_3')]
+    assert items[0]['content'] == ['Content']
+    assert items[0]['lineno'] == 12
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+
+from sphinx_testing import with_app
+
+from sphinxcontrib.traceability.links import (LinkFileError, load_link_files,
+                                              read_link_file)
+
+
+@with_app(buildername='html', srcdir='tests/docs/links/')
+def test_build_html(app, status, warning):
+    app.builder.build_all()
+    index = app.traceability_index
+    assert index.targets('REQ_1', ['validated_by']) == {'TST_1', 'TST_2'}
+    assert index.targets('REQ_2', ['validated_by']) == {'TST_2'}
+    assert index.targets('REQ_2', ['implemented_by']) == {'DES_1'}
+
+    warnings = warning.getvalue()
+    assert 'tests.csv:4: ERROR: TST_3 validates undefined item: TST_3' \
+        in warnings
+    assert 'reviews.jsonl:1: ERROR: REQ_2: unknown relationship ' \
+        'reviewed_by' in warnings
+
+    with open(os.path.join(app.outdir, 'index.html'),
+              encoding='utf-8') as html:
+        html = html.read()
+    assert html.count('href="#TST_2"') == 2
+
+
+def test_read_link_file():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmpdir, 'links.jsonl')
+        with open(path, 'w') as links:
+            links.write('{"source": "A", "relationship": "r", '
+                        '"target": ["B", "C"]}\n\n'
+                        '{"source": "A", "relationship": "r"}\n')
+        try:
+            read_link_file(path)
+        except LinkFileError as exc:
+            assert str(exc) == 'line 3: source, relationship, target expected'
+        else:
+            assert False, 'LinkFileError not raised'
+
+        with open(path, 'w') as links:
+            links.write('{"source": "A", "relationship": "r", '
+                        '"target": ["B", "C"]}\n')
+        cache = {}
+        (_, digest, records, error), = load_link_files([path], cache)
+        assert error is None
+        assert records == [('A', 'r', 'B', 1), ('A', 'r', 'C', 1)]
+
+        # Files just touched are not parsed again
+        os.utime(path, ns=(0, 0))
+        (_, touched, cached, _), = load_link_files([path], cache)
+        assert (touched, cached) == (digest, records)
+        assert cached is records
+
+        (_, _, records, error), = load_link_files(
+            [os.path.join(tmpdir, 'links.txt')], cache)
+        assert records == [] and error
+    finally:
+        shutil.rmtree(tmpdir)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+
+from sphinx_testing import with_app
+
+from .tables import table, table_rows
+
+
+@with_app(buildername='html', srcdir='tests/docs/basic/')
+def test_build_html(app, status, warning):
+    app.builder.build_all()
+    with open(os.path.join(app.outdir, 'index.html'),
+              encoding='utf-8') as html:
+        html = html.read()
+
+    # Grid with empty rows and columns hidden: SRS_0002 and SYS_0002 are
+    # not related to any item
+    grid = table(html, 'SRS to SSS grid')
+    assert 'SRS_0001' in grid and 'SYS_0001' in grid
+    assert 'SRS_0002' not in grid and 'SYS_0002' not in grid
+    cells = re.findall(r'<td>(.*?)</td>', grid, re.S)
+    assert [re.sub('<.*?>', '', cell).strip() for cell in cells][-1] == 'x'
+
+    # One column per relationship, and coverage of relationships
+    assert table_rows(html, 'By relationship') == [
+        ['Source', 'trace', 'traced_by', 'Coverage'],
+        ['SRS_0001, Software saying hello', 'SYS_0001, Saying hello', '',
+         '1/2'],
+        ['SRS_0002, Software saying goodbye', '', '', '0/2'],
+        ['SYS_0001, Saying hello', '', 'SRS_0001, Software saying hello',
+         '1/2'],
+        ['SYS_0002, Saying goodbye', '', '', '0/2'],
+    ]
+
+    # Gaps: only the items missing relationships are listed
+    assert table_rows(html, 'SRS without SYS') == [
+        ['Source without Target'], ['SRS_0002, Software saying goodbye']]
+    assert table_rows(html, 'SYS not traced') == [
+        ['Target not referenced'], ['SYS_0002, Saying goodbye']]
+    assert table_rows(html, 'Unrelated requirements') == [
+        ['Source without relationships'],
+        ['SRS_0002, Software saying goodbye'], ['SYS_0002, Saying goodbye']]
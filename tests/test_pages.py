@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+from sphinx_testing import with_app
+
+from sphinxcontrib.traceability.pages import split_pages
+
+
+@with_app(buildername='html', srcdir='tests/docs/basic/')
+def test_build_html(app, status, warning):
+    app.builder.build_all()
+    for page in range(1, 5):
+        assert os.path.exists(os.path.join(
+            app.outdir, 'index-item-list-5-page-%d.html' % page))
+    with open(os.path.join(app.outdir, 'index-item-list-5-page-4.html'),
+              encoding='utf-8') as page:
+        content = page.read()
+    assert 'href="index-item-list-5-page-3.html">Previous' in content
+    assert 'href="r007' not in content and 'index.html#r007' in content
+
+
+@with_app(buildername='singlehtml', srcdir='tests/docs/basic/')
+def test_build_singlehtml(app, status, warning):
+    app.builder.build_all()
+    assert not [name for name in os.listdir(app.outdir) if '-page-' in name]
+
+
+def test_split_pages():
+    ids = ['A1', 'A2', 'A3', 'B1', 'C10', 'C11']
+    assert split_pages(ids, 4) == [['A1', 'A2', 'A3', 'B1'], ['C10', 'C11']]
+    assert split_pages(ids, 2, 'prefix') == [['A1', 'A2'], ['A3'], ['B1'],
+                                             ['C10', 'C11']]
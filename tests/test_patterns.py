@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+
+from sphinx_testing import with_app
+
+from sphinxcontrib.traceability.filters import target_pattern
+from sphinxcontrib.traceability.index import RelationshipIndex
+
+from .tables import table_rows
+
+
+@with_app(buildername='html', srcdir='tests/docs/patterns/')
+def test_build_html(app, status, warning):
+    app.builder.build_all()
+    index = app.traceability_index
+    items = app.env.traceability_all_items
+    # Patterns are stored as written, and expanded once each
+    assert items['TST_1']['validates'] == ['REQ-CAN-*', 'REQ_0010..REQ_0100']
+    assert index.expansions['REQ_0010..REQ_0100'] == ['REQ_0010', 'REQ_0050']
+    assert index.targets('TST_1') == {'REQ-CAN-1', 'REQ-CAN-2', 'REQ-CAN-10',
+                                      'REQ_0010', 'REQ_0050'}
+    assert index.targets('REQ_0050') == {'TST_1', 'TST_2'}
+
+    warnings = warning.getvalue()
+    assert 'TST_3 validates matches no item: REQ-LIN-*' in warnings
+    assert 'undefined item' not in warnings
+
+    with open(os.path.join(app.outdir, 'index.html'),
+              encoding='utf-8') as html:
+        html = html.read()
+    assert table_rows(html, 'Validation')[-1] == ['REQ_0200, Power budget',
+                                                  '']
+
+
+@with_app(buildername='html', srcdir='tests/docs/patterns/',
+          confoverrides={'traceability_backlinks': True})
+def test_backlinks(app, status, warning):
+    app.builder.build_all()
+    with open(os.path.join(app.outdir, 'index.html'),
+              encoding='utf-8') as html:
+        html = re.sub('<.*?>', '', html.read())
+    assert 'validated_by: TST_1, CAN and timing tests, TST_2, Timing tests' \
+        in html
+    # Items matched by patterns of the item itself are not repeated
+    assert 'validates: ' not in html
+
+
+def test_target_pattern():
+    assert target_pattern('REQ-CAN-*') == 'glob:REQ-CAN-*'
+    assert target_pattern('REQ_0010..REQ_0100') == 'range:REQ_0010..REQ_0100'
+    assert target_pattern('REQ_0010..SRS_0100') is None
+    assert target_pattern('REQ_0010') is None
+
+
+def test_index_updates():
+    relationships = {'validates': 'validated_by',
+                     'validated_by': 'validates'}
+    items = {
+        'R1': {'id': 'R1', 'validates': []},
+        'T1': {'id': 'T1', 'validates': ['R*']},
+        'T2': {'id': 'T2', 'validates': ['R*']},
+    }
+    index = RelationshipIndex(items, relationships)
+    assert index.targets('R1') == {'T1', 'T2'}
+
+    # Items added and removed are matched when patterns are expanded again
+    items['R2'] = {'id': 'R2', 'validates': []}
+    index.add_item(items['R2'])
+    index.expand_patterns(sorted(items))
+    assert index.targets('R2') == {'T1', 'T2'}
+
+    index.remove_item(items.pop('T1'))
+    assert index.targets('R1') == {'T2'}
+    index.remove_item(items.pop('T2'))
+    assert index.pattern_links == {} and index.expansions == {}
+    assert index.targets('R1') == set()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+from sphinx_testing import with_app
+
+from sphinxcontrib.traceability.index import RelationshipIndex
+from sphinxcontrib.traceability.pivot import ItemColumns
+
+from .tables import table_rows
+
+
+@with_app(buildername='html', srcdir='tests/docs/pivot/')
+def test_build_html(app, status, warning):
+    app.builder.build_all()
+    with open(os.path.join(app.outdir, 'index.html'),
+              encoding='utf-8') as html:
+        html = html.read()
+    assert 'Any IDs not assigned' not in warning.getvalue()
+    assert 'id="item-pivot-1"' in html
+
+    assert table_rows(html, 'Requirements by status') == [
+        ['status', '(none)', 'yes', 'Total'],
+        ['approved', '1', '1', '2'],
+        ['draft', '1', '0', '1'],
+        ['Total', '2', '1', '3'],
+    ]
+    assert table_rows(html, 'Validations by status') == [
+        ['status', 'Total'],
+        ['approved', '2'],
+        ['draft', '1'],
+        ['Total', '3'],
+    ]
+
+
+def test_item_columns():
+    relationships = {'trace': 'traced_by', 'traced_by': 'trace'}
+    items = {
+        'A_1': {'id': 'A_1', 'type': 'item', 'trace': ['B_1', 'B_2']},
+        'A_2': {'id': 'A_2', 'type': 'item', 'trace': ['B_3']},
+        'B_1': {'id': 'B_1', 'type': 'test', 'trace': []},
+        'B_2': {'id': 'B_2', 'type': 'test', 'trace': []},
+    }
+    columns = ItemColumns(RelationshipIndex(items, relationships))
+    assert columns.pivot('type') == {('item', None): 2, ('test', None): 2}
+    # Links to undefined items are not counted
+    assert columns.pivot('type', filter='A', relationships=['trace']) == \
+        {('item', None): 2}
+    assert columns.pivot('type', 'trace', 'B') == {('test', '(none)'): 2}
+    # Columns are built once
+    type_column = columns.column('type')
+    columns.pivot('type', filter='B')
+    assert columns.column('type') is type_column
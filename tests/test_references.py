@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+from docutils import nodes
+from sphinx_testing import with_app
+
+from sphinxcontrib.traceability.references import item_reference
+
+
+def item_list(text, title):
+    return text.split(title)[1].split('List all')[0]
+
+
+@with_app(buildername='html', srcdir='tests/docs/basic/')
+def test_build_html(app, status, warning):
+    app.builder.build_all()
+    with open(os.path.join(app.outdir, 'index.html'),
+              encoding='utf-8') as html:
+        html = html.read()
+    # Same markup as references made of standard nodes, in compact lists
+    assert (
+        '<ul class="simple">\n'
+        '<li><p><a class="reference external" href="SSS.html#SYS_0001">'
+        '<em>SYS_0001, Saying hello</em></a></p></li>\n'
+        '<li><p><a class="reference external" href="SSS.html#SYS_0002">'
+        '<em>SYS_0002, Saying goodbye</em></a></p></li>\n'
+        '</ul>\n') in item_list(html, 'List system requirements')
+
+    doctree = app.env.get_and_resolve_doctree('index', app.builder)
+    references = list(doctree.traverse(item_reference))
+    assert references
+    assert all(isinstance(node.parent, nodes.paragraph) and
+               len(node.parent) == 1 and len(node) == 1
+               for node in references)
+
+
+@with_app(buildername='latex', srcdir='tests/docs/basic/')
+def test_build_latex(app, status, warning):
+    app.builder.build_all()
+    with open(os.path.join(app.outdir, 'Example.tex'),
+              encoding='utf-8') as tex:
+        tex = tex.read()
+    assert (r'{\hyperref[\detokenize{SSS:SYS_0001}]{\sphinxcrossref{'
+            r'\sphinxstyleemphasis{SYS\_0001, Saying hello}}}}') in \
+        item_list(tex, 'List system requirements')
+
+
+@with_app(buildername='text', srcdir='tests/docs/basic/')
+def test_build_text(app, status, warning):
+    app.builder.build_all()
+    with open(os.path.join(app.outdir, 'index.txt'), encoding='utf-8') as text:
+        text = text.read()
+    assert '* *SYS_0001, Saying hello*\n\n* *SYS_0002, Saying goodbye*' in \
+        item_list(text, 'List system requirements')
+
+
+@with_app(buildername='man', srcdir='tests/docs/basic/')
+def test_build_man(app, status, warning):
+    # Other builders get references made of standard nodes
+    app.builder.build_all()
+    with open(os.path.join(app.outdir, 'example.1'), encoding='utf-8') as man:
+        assert 'SYS_0001, Saying hello' in man.read()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import shutil
+import tempfile
+
+from sphinx_testing import with_app
+
+from sphinxcontrib.traceability.results import (load_test_results,
+                                                read_junit_report)
+
+from .tables import table_rows
+
+REPORT = 'tests/docs/results/reports/junit.xml'
+
+
+@with_app(buildername='html', srcdir='tests/docs/results/')
+def test_build_html(app, status, warning):
+    app.builder.build_all()
+    items = app.env.traceability_all_items
+    assert items['TST_1']['result'] == 'passed'
+    assert items['TST_2']['result'] == 'failed'
+    assert 'result' not in items['TST_4']
+
+    with open(os.path.join(app.outdir, 'index.html'),
+              encoding='utf-8') as html:
+        html = html.read()
+    assert 'Third test (skipped)' in html
+    assert 'Fourth test (not run)' in html
+
+    failed = html.split('Failed tests:')[1].split('</ul>')[0]
+    assert re.findall(r'href="#(\w+)"', failed) == ['TST_2']
+    assert table_rows(html, 'Not passed') == [
+        ['Source', 'Target'],
+        ['REQ_1, First requirement', 'TST_2, Second test'],
+        ['REQ_2, Second requirement',
+         'TST_3, Third test\nTST_4, Fourth test'],
+    ]
+    assert table_rows(html, 'Results') == [
+        ['result', 'Total'],
+        ['(none)', '1'],
+        ['failed', '1'],
+        ['passed', '1'],
+        ['skipped', '1'],
+        ['Total', '4'],
+    ]
+
+
+def test_read_junit_report():
+    assert read_junit_report(REPORT) == {
+        'test_nominal': 'passed', 'test_limits': 'skipped',
+        'test_TST_2': 'failed', 'test_TST_3': 'skipped'}
+    assert read_junit_report(REPORT, re.compile(r'TST_\d+')) == {
+        'TST_1': 'passed', 'TST_2': 'failed', 'TST_3': 'skipped'}
+
+
+def test_load_test_results():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmpdir, 'junit.xml')
+        shutil.copyfile(REPORT, path)
+        cache = {}
+        (_, digest, results, error), = load_test_results([path], cache)
+        assert error is None and results['test_TST_2'] == 'failed'
+
+        # Reports just touched are not parsed again
+        os.utime(path, ns=(0, 0))
+        (_, touched, cached, _), = load_test_results([path], cache)
+        assert touched == digest and cached is results
+
+        with open(path, 'a') as report:
+            report.write('<trailing/>')
+        (_, digest, results, error), = load_test_results([path], cache)
+        assert digest is None and results == {} and error
+        assert cache == {}
+    finally:
+        shutil.rmtree(tmpdir)
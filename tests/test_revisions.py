@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+
+from sphinxcontrib.traceability.revisions import (ExtractionCache, main,
+                                                  read_configuration,
+                                                  revision_items)
+from sphinxcontrib.traceability.snapshot import Snapshot
+
+CONF = b"""
+from docutils.parsers.rst import directives
+traceability_relationships = {'validated_by': 'validates'}
+traceability_data = {'status': directives.unchanged}
+"""
+
+REQUIREMENTS = """
+.. item:: REQ_1 First requirement
+   :status: draft
+   :validated_by: TST_1
+
+.. item:: REQ_2 Second requirement
+"""
+
+TESTS = """
+.. item:: TST_1 First test
+"""
+
+
+def commit(repository, files, tag):
+    for name, text in files.items():
+        path = os.path.join(repository, 'docs', name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as source:
+            source.write(text)
+    subprocess.run(['git', '-C', repository, 'add', '-A'], check=True)
+    subprocess.run(['git', '-C', repository, '-c', 'user.name=Test',
+                    '-c', 'user.email=test@example.com', 'commit', '-q',
+                    '-m', tag], check=True)
+    subprocess.run(['git', '-C', repository, 'tag', tag], check=True)
+
+
+def test_revisions():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        repository = os.path.join(tmpdir, 'repository')
+        subprocess.run(['git', 'init', '-q', repository], check=True)
+        commit(repository, {'conf.py': CONF.decode(),
+                            'requirements.rst': REQUIREMENTS,
+                            'tests.rst': TESTS}, 'v1')
+        commit(repository, {'requirements.rst': REQUIREMENTS.replace(
+            'draft', 'approved') + '   :validated_by: TST_1\n'}, 'v2')
+
+        cache = ExtractionCache(os.path.join(tmpdir, 'cache'), ['item'])
+        items, relationships, data_names = revision_items(
+            repository, 'v1', 'docs', cache)
+        assert sorted(items) == ['REQ_1', 'REQ_2', 'TST_1']
+        assert items['REQ_1']['validated_by'] == ['TST_1']
+        assert items['REQ_1']['status'] == 'draft'
+        assert items['REQ_1']['source'] == 'docs/requirements.rst'
+        assert (cache.misses, cache.hits) == (2, 0)
+
+        # Only the changed file is parsed again
+        revision_items(repository, 'v2', 'docs', cache)
+        assert (cache.misses, cache.hits) == (3, 1)
+
+        output = io.StringIO()
+        main(['-C', repository, '-s', 'docs', '--cache',
+              os.path.join(tmpdir, 'cache'), 'diff', 'v1', 'v2'], output)
+        assert output.getvalue() == (
+            "~ REQ_1 status: 'draft' -> 'approved'\n"
+            "~ REQ_2 validated_by +TST_1\n")
+
+        main(['-C', repository, '-s', 'docs', '--cache',
+              os.path.join(tmpdir, 'cache'), 'snapshot', 'v2', '-o',
+              os.path.join(tmpdir, 'snapshots')], io.StringIO())
+        with Snapshot(os.path.join(tmpdir, 'snapshots',
+                                   'v2.snapshot')) as snapshot:
+            assert snapshot.related('TST_1') == {
+                'validates': ['REQ_1', 'REQ_2']}
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def test_read_configuration():
+    assert read_configuration(CONF) == (
+        {'validated_by': 'validates', 'validates': 'validated_by'},
+        ['status'])
+
+    # Invalid relationships are reported and ignored
+    for value in (b"['validated_by']", b"'validated_by'", b"{'a': 1}"):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            assert read_configuration(
+                b'traceability_relationships = ' + value) == ({}, [])
+        assert 'traceability_relationships is not a dictionary' in \
+            stderr.getvalue()
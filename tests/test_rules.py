@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+from sphinx_testing import with_app
+
+from sphinxcontrib.traceability.index import RelationshipIndex
+from sphinxcontrib.traceability.rules import Rule
+
+RULES = [
+    {'name': 'srs-traced', 'filter': '^SRS', 'relationship': 'trace',
+     'min': 1},
+    {'name': 'trace-to-sys', 'relationship': 'trace', 'filter': '^SRS',
+     'target_filter': '^SYS'},
+    {'name': 'single-parent', 'type': 'item', 'relationship': 'traced_by',
+     'max': 2, 'severity': 'error'},
+]
+
+
+@with_app(buildername='html', srcdir='tests/docs/basic/',
+          confoverrides={'traceability_rules': RULES})
+def test_rules(app, status, warning):
+    app.builder.build_all()
+    warnings = warning.getvalue()
+    assert 'SRS_0002 violates rule srs-traced: trace has 0 items' in warnings
+    assert 'SRS_0001 violates rule srs-traced' not in warnings
+    assert 'violates rule trace-to-sys' not in warnings
+    assert ('r002 violates rule single-parent: traced_by has 4 items, '
+            'at most 2 allowed') in warnings
+
+
+def test_attributes():
+    items = {
+        'A': {'id': 'A', 'type': 'item', 'functional': None,
+              'status': 'draft'},
+        'B': {'id': 'B', 'type': 'item', 'status': 'approved'},
+    }
+    index = RelationshipIndex(items, {})
+    rule = Rule({'attributes': {'functional': '', 'status': 'approved'}}, 1,
+                {})
+    # Flags are present, with no value to match
+    assert rule.check(items['A'], index) == [
+        "attribute status = 'draft' does not match 'approved'"]
+    assert rule.check(items['B'], index) == ['attribute functional is missing']
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import shutil
+import tempfile
+
+from sphinx_testing import with_app
+
+from sphinxcontrib.traceability.search import (SEARCH_DIR, shard_file,
+                                               write_search_index)
+
+
+def read_script(path):
+    with open(path, encoding='utf-8') as script:
+        script = script.read()
+    arguments = script[script.index('(') + 1:script.rindex(')')]
+    return json.loads('[%s]' % arguments)
+
+
+@with_app(buildername='html', srcdir='tests/docs/search/')
+def test_build_html(app, status, warning):
+    app.build(force_all=True)
+    directory = os.path.join(app.outdir, SEARCH_DIR)
+    assert os.path.exists(os.path.join(directory, 'search.js'))
+
+    manifest, = read_script(os.path.join(directory, 'index.js'))
+    assert manifest == {'length': 2, 'shards': {
+        're': shard_file('re'), 'sy': shard_file('sy'),
+        'ts': shard_file('ts')}}
+
+    key, entries = read_script(os.path.join(directory, shard_file('re')))
+    assert key == 're'
+    assert entries == [
+        ['REQ_1', 'First requirement', 'item', 'index.html#REQ_1',
+         {'validated_by': 2}],
+        ['req_2', 'Second requirement', 'item', 'index.html#req_2', {}],
+    ]
+    key, entries = read_script(os.path.join(directory, shard_file('ts')))
+    assert entries[0] == ['TST_1', 'First test', 'item', 'tests.html#TST_1',
+                          {'validates': 1}]
+
+    with open(os.path.join(app.outdir, 'index.html'),
+              encoding='utf-8') as html:
+        html = html.read()
+    assert '<div class="item-search">' in html
+    assert '<script src="_traceability/search/search.js"></script>' in html
+
+
+def test_write_search_index():
+    outdir = tempfile.mkdtemp()
+    try:
+        entries = [('a1', '', 'item', 'a.html#a1', {}),
+                   ('B2', '', 'item', 'b.html#B2', {}),
+                   ('b3', '', 'item', 'b.html#b3', {})]
+        assert write_search_index(outdir, iter(entries), 1) == 2
+        # Shards of previous builds are removed
+        assert write_search_index(outdir, iter(entries[1:]), 1) == 1
+        assert sorted(os.listdir(os.path.join(outdir, SEARCH_DIR))) == [
+            'index.js', 'search.js', shard_file('b')]
+    finally:
+        shutil.rmtree(outdir)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+import io
+import json
+import os
+import subprocess
+import sys
+
+from sphinx_testing import with_app
+
+from sphinxcontrib.traceability.__main__ import main
+from sphinxcontrib.traceability.snapshot import Snapshot
+
+
+@with_app(buildername='html', srcdir='tests/docs/basic/',
+          confoverrides={'traceability_snapshot': 'traceability.snapshot'})
+def test_build_html(app, status, warning):
+    # Snapshot is written upon build-finished, emitted by app.build only
+    app.build(force_all=True)
+    path = os.path.join(app.outdir, 'traceability.snapshot')
+
+    with Snapshot(path) as snapshot:
+        record = snapshot.get('SRS_0001')
+        assert record['caption'] == 'Software saying hello'
+        assert record['docname'] == 'SRS'
+        assert record['uri'] == 'SRS.html#SRS_0001'
+        assert record['relationships'] == {'trace': ['SYS_0001']}
+        assert snapshot.get('SYS_0003') is None
+        assert snapshot.related('SYS_0001') == {'traced_by': ['SRS_0001']}
+        assert [record['id'] for record in snapshot.items('SYS')] == \
+            ['SYS_0001', 'SYS_0002']
+        assert snapshot.coverage(['traced_by'], '^SYS') == \
+            (['SYS_0001'], ['SYS_0002'])
+
+    output = io.StringIO()
+    assert main(['-s', path, 'related', 'SYS_0001'], output) == 0
+    assert output.getvalue() == 'traced_by SRS_0001\n'
+
+    output = io.StringIO()
+    assert main(['-s', path, '--json', 'coverage', '-f', 'SYS',
+                 '-r', 'traced_by', '--min', '75'], output) == 1
+    assert json.loads(output.getvalue())['percentage'] == 50.0
+
+    # The command line tool imports neither Sphinx nor Jinja: it even runs
+    # without site packages
+    script = ('import sys; from sphinxcontrib.traceability.__main__ import '
+              'main; main(["-s", %r, "show", "r003"]); '
+              'assert not {"sphinx", "jinja2", "docutils"} & set(sys.modules)'
+              % path)
+    result = subprocess.run([sys.executable, '-S', '-c', script], check=True,
+                            stdout=subprocess.PIPE, universal_newlines=True,
+                            cwd=os.path.dirname(os.path.dirname(
+                                os.path.abspath(__file__))))
+    assert result.stdout.startswith('r003 The great\n')
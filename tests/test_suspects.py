@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from sphinxcontrib.traceability.daemon import TraceDaemon
+from sphinxcontrib.traceability.index import RelationshipIndex
+from sphinxcontrib.traceability.suspects import SuspectLinks
+
+from .test_daemon import edit
+
+
+def read(path):
+    with open(path, encoding='utf-8') as page:
+        return page.read()
+
+
+def test_incremental_builds():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        srcdir = os.path.join(tmpdir, 'src')
+        outdir = os.path.join(tmpdir, 'out')
+        shutil.copytree('tests/docs/suspects', srcdir)
+        daemon = TraceDaemon(srcdir, outdir, status=io.StringIO(),
+                             warning=io.StringIO())
+        assert daemon.poll()
+        app = daemon.app
+        assert not app.traceability_suspects.suspects
+        store = os.path.join(outdir, '.doctrees', 'traceability_suspects.json')
+        assert json.loads(read(store))['links'] == {
+            'DES_1': {'implements': {
+                'REQ_1': app.env.traceability_all_items['REQ_1']['digest']}},
+            'DES_2': {'implements': {
+                'REQ_2': app.env.traceability_all_items['REQ_2']['digest']}},
+        }
+
+        # Changing a target flags the links to it, in the templates of
+        # their sources (read again), item lists and snapshots
+        edit(os.path.join(srcdir, 'requirements.rst'), 'shall start',
+             'shall start quickly')
+        assert daemon.poll()
+        assert app.traceability_suspects.get('DES_1') == {
+            'implements': ['REQ_1']}
+        assert 'DES_2' not in app.traceability_suspects
+        assert '(suspect implements: REQ_1)' in read(
+            os.path.join(outdir, 'design.html'))
+        suspect = read(os.path.join(outdir, 'index.html')).split(
+            'id="suspect"')[1]
+        assert 'DES_1' in suspect and 'DES_2' not in suspect
+
+        # Flags are kept by the store for new applications
+        daemon = TraceDaemon(srcdir, outdir, status=io.StringIO(),
+                             warning=io.StringIO())
+        daemon.poll()
+        assert daemon.app.traceability_suspects.get('DES_1') == {
+            'implements': ['REQ_1']}
+
+        # Changing the source confirms its links
+        edit(os.path.join(srcdir, 'design.rst'), 'Start button',
+             'Start button, reviewed')
+        assert daemon.poll()
+        assert not daemon.app.traceability_suspects.suspects
+        assert '(suspect' not in read(os.path.join(outdir, 'design.html'))
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def test_suspect_links():
+    relationships = {'implements': 'implemented_by',
+                     'implemented_by': 'implements'}
+    items = {
+        'A': {'id': 'A', 'implements': ['B', 'C'], 'digest': 'a'},
+        'B': {'id': 'B', 'implements': [], 'digest': 'b'},
+        'C': {'id': 'C', 'implements': [], 'digest': 'c'},
+    }
+    index = RelationshipIndex(items, relationships)
+    suspects = SuspectLinks()
+    assert suspects.update(items, index, ['implements']) == set()
+    assert suspects.confirmed['A'] == {'implements': {'B': 'b', 'C': 'c'}}
+
+    items['B']['digest'] = 'b2'
+    assert suspects.update(items, index, ['implements']) == {'A'}
+    assert suspects.get('A') == {'implements': ['B']}
+
+    # Only items whose digest changed are checked again
+    assert suspects.update(items, index, ['implements']) == set()
+
+    # Removed targets are not suspect anymore
+    index.remove_item(items['A'])
+    items['A']['implements'] = ['C']
+    index.add_item(items['A'])
+    assert suspects.update(items, index, ['implements']) == {'A'}
+    assert 'A' not in suspects
+
+    # Stores are loaded with their suspect links
+    items['C']['digest'] = 'c2'
+    suspects.update(items, index, ['implements'])
+    tmpdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmpdir, 'suspects.json')
+        suspects.write(path, index, ['implements'])
+        assert SuspectLinks.load(path).get('A') == {'implements': ['C']}
+    finally:
+        shutil.rmtree(tmpdir)
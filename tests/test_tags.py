@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import shutil
+import tempfile
+
+from sphinx_testing import with_app
+
+from sphinxcontrib.traceability import harvest, tags
+from sphinxcontrib.traceability.daemon import TraceDaemon
+
+
+@with_app(buildername='html', srcdir='tests/docs/tags/')
+def test_build_html(app, status, warning):
+    app.builder.build_all()
+    items = app.env.traceability_all_items
+    assert items['SW_PARSER']['implements'] == ['REQ_1', 'REQ_2']
+    assert items['SW_PARSER']['lineno'] == 3
+    assert items['SW_PARSER']['source'].endswith('parser.c')
+    assert items['SW_ERRORS']['implements'] == ['REQ_2']
+    assert items['CODE:src/lib/test_parser.py']['validates'] == [
+        'REQ_1', 'REQ_2']
+    assert app.traceability_index.targets('REQ_2') == {
+        'SW_PARSER', 'SW_ERRORS', 'CODE:src/lib/test_parser.py'}
+    assert 'cannot scan' not in warning.getvalue()
+    assert 'undefined item' not in warning.getvalue()
+
+
+def test_new_source_files():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        srcdir = os.path.join(tmpdir, 'src')
+        shutil.copytree('tests/docs/tags', srcdir)
+        daemon = TraceDaemon(srcdir, os.path.join(tmpdir, 'out'),
+                             status=io.StringIO(), warning=io.StringIO())
+        assert daemon.poll()
+
+        # Files added to scanned directories make documents be read again
+        with open(os.path.join(srcdir, 'src', 'new.c'), 'w') as code:
+            code.write('/* @item SW_NEW New module */\n')
+        assert daemon.poll()
+        assert daemon.app.traceability_read_docs == ['index']
+        assert 'SW_NEW' in daemon.app.env.traceability_all_items
+        assert not daemon.poll()
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def test_scan_tags():
+    names = tags.tag_names(['implements'])
+    text = ('x = 1  # @implements A B\n'
+            '/* @item ID A caption */\n'
+            '-- @implements C\n'
+            'mail = "me@example.com"  // @unknown D\n'
+            '@implements E\n')
+    found = tags.scan_tags(text, names)
+    assert found == [(1, 'implements', 'A B'), (2, 'item', 'ID A caption'),
+                     (3, 'implements', 'C')]
+    items = tags.tagged_items(found, 'FILE', 'file.py')
+    assert [(item['id'], item['caption'], item['options'], item['lineno'])
+            for item in items] == [
+        ('FILE', 'file.py', [('implements', 'A B')], 1),
+        ('ID', 'A caption', [('implements', 'C')], 2)]
+
+
+def test_parallel_scan():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        for number in range(harvest.PARALLEL_THRESHOLD):
+            with open(os.path.join(tmpdir, 'file%d.c' % number), 'w') as f:
+                f.write('int x;  // @implements REQ_%d\n' % number)
+        files = harvest.find_source_files([tmpdir], '*.c')
+        names = tags.tag_names(['implements'])
+        cache = {}
+        results = harvest.harvest_items(files, names, cache, 2,
+                                        tags.scan_file)
+        assert sorted(found for path, found, error in results) == sorted(
+            [(1, 'implements', 'REQ_%d' % number)]
+            for number in range(harvest.PARALLEL_THRESHOLD))
+        assert len(cache) == harvest.PARALLEL_THRESHOLD
+    finally:
+        shutil.rmtree(tmpdir)
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from sphinx_testing import with_app
+
+from sphinxcontrib.traceability.daemon import TraceDaemon
+from sphinxcontrib.traceability.unresolved import UnresolvedReferences
+
+from .test_daemon import edit
+
+
+@with_app(buildername='html', srcdir='tests/docs/basic/',
+          confoverrides={'traceability_unresolved_warnings': 1,
+                         'traceability_unresolved_report':
+                             'traceability/unresolved.json'})
+def test_build_html(app, status, warning):
+    # Report is written upon build-finished, emitted by app.build only
+    app.build(force_all=True)
+    warnings = warning.getvalue()
+    assert warnings.count('undefined item: <<') == 1
+    assert ('3 unresolved item references to 3 undefined items '
+            '(2 not reported individually)') in warnings
+
+    with open(os.path.join(app.outdir, 'traceability', 'unresolved.json'),
+              encoding='utf-8') as report:
+        report = json.load(report)
+    assert report['total'] == 3
+    assert report['missing']['<<covers>>'] == {
+        'count': 1, 'kinds': ['relationship'], 'documents': {'index': 1}}
+
+
+def test_incremental_builds():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        srcdir = os.path.join(tmpdir, 'src')
+        outdir = os.path.join(tmpdir, 'out')
+        shutil.copytree('tests/docs/daemon', srcdir)
+        with open(os.path.join(srcdir, 'requirements.rst'), 'a') as rst:
+            rst.write('\n   See :item:`REQ_9`.\n')
+        warning = io.StringIO()
+        daemon = TraceDaemon(srcdir, outdir, confoverrides={
+            'traceability_unresolved_report': 'unresolved.json'},
+            status=io.StringIO(), warning=warning)
+        daemon.poll()
+        assert 'requirements.rst:8: WARNING: undefined item: REQ_9' in \
+            warning.getvalue()
+
+        # References of documents not read again are still reported
+        edit(os.path.join(srcdir, 'design.rst'), 'First', 'Only')
+        assert daemon.poll()
+        assert daemon.app.traceability_read_docs == ['design']
+        with open(os.path.join(outdir, 'unresolved.json'),
+                  encoding='utf-8') as report:
+            report = json.load(report)
+        assert report['missing'] == {'REQ_9': {
+            'count': 1, 'kinds': ['role'], 'documents': {'requirements': 1}}}
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def test_limit_by_undefined_item():
+    unresolved = UnresolvedReferences(2)
+    # References to an item already reported do not use up the limit
+    assert [unresolved.add(target, 'index', 'role') for target in
+            ('A', 'A', 'A', 'B', 'C', 'B')] == \
+        [True, False, False, True, False, False]
+    assert unresolved.summary().startswith(
+        '6 unresolved item references to 3 undefined items '
+        '(4 not reported individually)')
+
+    unresolved = UnresolvedReferences()
+    assert all(unresolved.add('A', 'index', 'role') for _ in range(3))